@@ -0,0 +1,78 @@
+"""
+Micro-benchmark de la capa de conexiones de TemplateManager.
+
+Compara la latencia por llamada de get_template abriendo una conexión nueva
+en cada llamada (comportamiento anterior) frente a la conexión persistente
+de ConnectionManager.
+
+Uso:
+    python -m benchmarks.bench_connection --templates 20000 --calls 2000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from models.template_manager import TemplateManager
+
+GET_TEMPLATE_SQL = '''
+    SELECT t.*, GROUP_CONCAT(tt.tag) as tags
+    FROM templates t
+    LEFT JOIN template_tags tt ON t.id = tt.template_id
+    WHERE t.id = ?
+    GROUP BY t.id
+'''
+
+def populate(manager, count):
+    """Rellena la base de datos con plantillas sintéticas"""
+    with manager.db.transaction():
+        for i in range(count):
+            manager.add_template(
+                f"template_{i}",
+                f"def create_window(root):\n    pass  # {i}\n" * 5,
+                f"Plantilla sintética {i}",
+                f"category_{i % 25}",
+                [f"tag_{(i + k) % 200}" for k in range(3)]
+            )
+
+def per_call_connect(db_file, ids):
+    for template_id in ids:
+        with sqlite3.connect(db_file) as conn:
+            conn.execute(GET_TEMPLATE_SQL, (template_id,)).fetchone()
+
+def pooled(manager, ids):
+    for template_id in ids:
+        manager.get_template(template_id)
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=20000)
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'templates.db')
+        manager = TemplateManager(db_file)
+        populate(manager, args.templates)
+
+        ids = [random.randint(1, args.templates) for _ in range(args.calls)]
+        pooled(manager, ids[:50])
+
+        before = measure(per_call_connect, db_file, ids)
+        after = measure(pooled, manager, ids)
+        manager.close()
+
+    print(f"Plantillas: {args.templates}, llamadas: {args.calls}")
+    print(f"Conexión por llamada: {before / args.calls * 1e6:9.1f} µs/llamada")
+    print(f"Conexión persistente: {after / args.calls * 1e6:9.1f} µs/llamada")
+    print(f"Aceleración:          {before / after:9.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark del resaltado de sintaxis incremental del editor.
+
+Carga un fichero sintético de --lines líneas en un Text oculto, espera al
+resaltado inicial y mide cuánto tarda en resaltarse cada pulsación simulada
+(inserción de un carácter seguida del volcado de la zona visible). Sin
+display disponible sólo mide tokenize_line.
+
+Uso:
+    python -m benchmarks.bench_highlighter --lines 5000 --keystrokes 500
+"""
+import argparse
+import random
+import statistics
+import time
+import tkinter as tk
+
+from views.highlighter import SyntaxHighlighter, tokenize_line
+
+def synthetic_source(lines):
+    block = [
+        'def create_window_{n}(root):',
+        '    """Ventana sintética {n}"""',
+        '    frame = ttk.Frame(root, padding=10)  # contenedor',
+        '    for i in range({n}):',
+        '        ttk.Label(frame, text=f"Etiqueta {{i}}").grid(row=i, column=0)',
+        '    return frame',
+        ''
+    ]
+    source = []
+    n = 0
+    while len(source) < lines:
+        source.extend(line.format(n=n) for line in block)
+        n += 1
+    return '\n'.join(source[:lines])
+
+def bench_tokenize(source):
+    lines = source.splitlines()
+    state = None
+    start = time.perf_counter()
+    for line in lines:
+        _, state = tokenize_line(line, state)
+    elapsed = time.perf_counter() - start
+    print(f"tokenize_line: {elapsed / len(lines) * 1e6:.1f} µs/línea ({len(lines)} líneas)")
+
+def bench_keystrokes(root, source, keystrokes):
+    text = tk.Text(root, width=100, height=40)
+    text.pack()
+    highlighter = SyntaxHighlighter(text)
+    text.insert('1.0', source)
+
+    start = time.perf_counter()
+    highlighter.flush()
+    print(f"Resaltado inicial: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    line_count = int(text.index('end-1c').split('.')[0])
+    timings = []
+    for _ in range(keystrokes):
+        line = random.randint(1, line_count)
+        text.see(f'{line}.0')
+        root.update_idletasks()
+        start = time.perf_counter()
+        text.insert(f'{line}.end', 'x')
+        highlighter.flush_visible()
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"Pulsaciones: {keystrokes}")
+    print(f"  media {statistics.mean(timings) * 1e3:.3f} ms · "
+          f"p50 {statistics.median(timings) * 1e3:.3f} ms · p99 {p99 * 1e3:.3f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=5000)
+    parser.add_argument('--keystrokes', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    source = synthetic_source(args.lines)
+    bench_tokenize(source)
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Sin display ({e}); se omite la medición por pulsación")
+        return
+    root.withdraw()
+    try:
+        bench_keystrokes(root, source, args.keystrokes)
+    finally:
+        root.destroy()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark de TemplateManager.search frente a filtrar get_all_templates()
+en Python.
+
+Uso:
+    python -m benchmarks.bench_search --templates 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from models.template_manager import TemplateManager
+from benchmarks.bench_connection import populate
+
+QUERIES = ['tag_17', 'template_123', 'sintética 4242', 'create_window']
+
+def python_filter(manager, text):
+    text = text.lower()
+    return [
+        t for t in manager.get_all_templates()
+        if any(text in (field or '').lower() for field in (t[1], t[2], t[3], t[7]))
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--templates', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = TemplateManager(os.path.join(tmp, 'templates.db'))
+        populate(manager, args.templates)
+
+        print(f"Plantillas: {args.templates}")
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                manager.search(query, limit=50)
+            fts = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            python_filter(manager, query)
+            scan = time.perf_counter() - start
+
+            print(f"{query!r:20} search: {fts * 1e3:8.2f} ms   filtro Python: {scan * 1e3:8.2f} ms")
+        manager.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+"""
+Suite de benchmarks reproducible de TemplateManager, ConfigManager, los
+diagnósticos del editor, run_code y el cambio de tema.
+
+Genera bases de datos sintéticas con el tamaño de cada --sizes (con una
+semilla fija, así que dos ejecuciones miden exactamente los mismos datos),
+mide cada operación al estilo de pyperf (una muestra de calentamiento y
+--samples muestras de varias llamadas cada una) y guarda los resultados en
+JSON. Con --baseline compara las medianas con una ejecución anterior y
+termina con código 1 si alguna operación es más lenta que --max-slowdown.
+
+Uso:
+    python -m benchmarks.suite --output actual.json
+    python -m benchmarks.suite --sizes 1000 10000 --baseline base.json --max-slowdown 0.2
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from controllers.diagnostics import DiagnosticsService
+from models.config_manager import ConfigManager
+from models.template_manager import TemplateManager
+
+RESULTS_FORMAT = 'tkinterlab-bench'
+RESULTS_VERSION = 1
+
+CATEGORIES = 25
+TAG_VOCABULARY = 400
+
+# Probabilidad de que una plantilla tenga 0, 1, 2... tags
+TAG_COUNT_WEIGHTS = (10, 25, 30, 20, 10, 3, 2)
+
+# El tag más frecuente de synthetic_records(), el peor caso de get_templates_by_tag
+POPULAR_TAG = 'tag_0'
+
+# Funciones del archivo sintético de los benchmarks de diagnósticos
+DIAGNOSTICS_FUNCTIONS = 300
+
+# Widgets abiertos en la ventana de prueba al medir el cambio de tema
+THEME_WIDGETS = 2000
+
+WIDGETS = ('Label', 'Button', 'Entry', 'Checkbutton', 'Combobox', 'Spinbox', 'Scale')
+
+def synthetic_code(rng, n):
+    """Código de create_window con un número variable de filas de widgets"""
+    lines = [
+        'import tkinter as tk',
+        'from tkinter import ttk',
+        '',
+        'def create_window(root):',
+        f'    """Plantilla sintética {n}"""',
+        '    frame = ttk.Frame(root, padding=10)',
+        '    frame.pack(fill=tk.BOTH, expand=True)'
+    ]
+    for row in range(rng.randint(3, 40)):
+        widget = rng.choice(WIDGETS)
+        lines.append(f'    ttk.{widget}(frame, text="{widget} {row}").grid(row={row}, column=0, sticky="w")')
+    lines.append('    return frame')
+    return '\n'.join(lines) + '\n'
+
+def synthetic_records(count, seed):
+    """
+    Plantillas sintéticas con tags repartidos como en una biblioteca real:
+    la mayoría tiene entre 1 y 3, y unos pocos tags son muy frecuentes.
+    """
+    rng = random.Random(seed)
+    tags = [f"tag_{i}" for i in range(TAG_VOCABULARY)]
+    tag_weights = [1 / (rank + 1) for rank in range(TAG_VOCABULARY)]
+    for n in range(count):
+        tag_count = rng.choices(range(len(TAG_COUNT_WEIGHTS)), TAG_COUNT_WEIGHTS)[0]
+        yield {
+            'name': f"template_{n}",
+            'description': f"Plantilla sintética {n}",
+            'code': synthetic_code(rng, n),
+            'category': f"category_{rng.randrange(CATEGORIES)}",
+            'tags': sorted(set(rng.choices(tags, tag_weights, k=tag_count)))
+        }
+
+def synthetic_db(cache_dir, size, seed):
+    """Devuelve la ruta de la base de datos de size plantillas, creándola si no existe"""
+    db_file = os.path.join(cache_dir, f"templates-{size}-s{seed}.db")
+    if not os.path.exists(db_file):
+        tmp_file = f"{db_file}.tmp"
+        for path in (tmp_file, f"{tmp_file}-wal", f"{tmp_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        start = time.perf_counter()
+        manager = TemplateManager(tmp_file)
+        manager.import_templates(synthetic_records(size, seed))
+        manager.close()
+        os.replace(tmp_file, db_file)
+        print(f"  base de datos de {size} plantillas generada en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return db_file
+
+def measure(func, samples, min_time):
+    """
+    Mide func al estilo de pyperf: calibra cuántas llamadas caben en
+    min_time segundos, descarta una muestra de calentamiento y toma samples
+    muestras.
+
+    Returns:
+        dict: 'loops' (llamadas por muestra) y 'samples' (segundos por llamada).
+    """
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    loops = max(1, int(min_time / first)) if first > 0 else 1000
+
+    timings = []
+    for _ in range(samples + 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+    return {'loops': loops, 'samples': timings[1:]}
+
+def template_benchmarks(manager, size, seed):
+    """Operaciones de TemplateManager sobre una base de datos de size plantillas"""
+    rng = random.Random(seed)
+    tags = manager.get_all_tags()
+    names = itertools.count()
+    edits = itertools.count()
+
+    def add_template():
+        n = next(names)
+        manager.add_template(f"bench_{n}", synthetic_code(rng, n), "Nueva", "bench", ["bench", rng.choice(tags)])
+
+    def update_template():
+        n = next(edits)
+        manager.update_template(rng.randint(1, size), code=synthetic_code(rng, n) + f"# edición {n}\n")
+
+    # Primero las lecturas, para que no midan lo que añaden las escrituras
+    return [
+        ('get_all_templates', manager.get_all_templates),
+        ('get_templates_by_tag', lambda: manager.get_templates_by_tag(POPULAR_TAG)),
+        ('get_all_tags', manager.get_all_tags),
+        ('add_template', add_template),
+        ('update_template', update_template)
+    ]
+
+def config_benchmarks(deferred, immediate):
+    counter = itertools.count()
+    return [
+        ('ConfigManager.set', lambda: deferred.set('bench', next(counter))),
+        ('ConfigManager.set[write_delay=None]', lambda: immediate.set('bench', next(counter)))
+    ]
+
+def diagnostics_benchmarks(seed):
+    """
+    Análisis completo de un archivo grande del editor sin caché y tras
+    editar una sola de sus funciones.
+    """
+    rng = random.Random(seed)
+    parts = [
+        synthetic_code(rng, n).replace('def create_window(', f'def build_{n}(')
+        for n in range(DIAGNOSTICS_FUNCTIONS)
+    ]
+    parts.append(synthetic_code(rng, DIAGNOSTICS_FUNCTIONS))
+    source = '\n'.join(parts)
+    service = DiagnosticsService()
+    service.analyze(source)
+    edits = itertools.count()
+
+    def edit():
+        n = next(edits)
+        edited = list(parts)
+        edited[n % len(parts)] += f"    # edición {n}\n"
+        service.analyze('\n'.join(edited))
+
+    return [
+        ('DiagnosticsService.analyze[cold]', lambda: DiagnosticsService().analyze(source)),
+        ('DiagnosticsService.analyze[edit]', edit)
+    ]
+
+def gui_benchmarks(tmp, manager):
+    """
+    run_code_in_process de extremo a extremo (compilar, ejecutar, construir la
+    ventana de prueba y procesar los eventos pendientes) y toggle_theme con THEME_WIDGETS
+    widgets en la ventana de prueba, con la ventana principal oculta.
+
+    Returns:
+        tuple: (lista de (nombre, preparación), cierre) o None si no hay
+            display. Cada preparación devuelve la función a medir; se llaman
+            en orden, justo antes de medir cada una.
+    """
+    import tkinter as tk
+    from tkinter import ttk
+    from controllers import MainController
+    from views import MainWindow
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Sin display ({e}); se omiten run_code y el cambio de tema", file=sys.stderr)
+        return None
+    root.withdraw()
+    config = ConfigManager(os.path.join(tmp, 'config.json'))
+    config.set('auto_save', False)
+    controller = MainController(MainWindow(root), config, manager)
+    controller.view.code_editor.delete('1.0', tk.END)
+    controller.view.code_editor.insert('1.0', synthetic_code(random.Random(0), 0))
+
+    def run_code():
+        controller.run_code_in_process()
+        root.update()
+
+    def toggle_theme():
+        controller.toggle_theme()
+        root.update()
+
+    def open_widgets():
+        # Mitad ttk (siguen el tema) y mitad clásicos (no se recorren al cambiarlo)
+        controller.run_code_in_process()
+        frame = tk.Frame(controller.test_window)
+        frame.pack()
+        for n in range(THEME_WIDGETS):
+            widget = ttk.Label(frame, text=str(n)) if n % 2 else tk.Label(frame, text=str(n))
+            widget.grid(row=n // 40, column=n % 40)
+        root.update()
+        return toggle_theme
+
+    def close():
+        controller.on_closing()
+        config.close()
+        if root.winfo_exists():
+            root.destroy()
+    return [('run_code', lambda: run_code), (f'toggle_theme[{THEME_WIDGETS} widgets]', open_widgets)], close
+
+def stats(samples):
+    return {
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples)
+    }
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+def run_suite(args, tmp):
+    cache_dir = args.cache_dir or tmp
+    os.makedirs(cache_dir, exist_ok=True)
+    results = {}
+
+    def record(name, size, func):
+        key = f"{name}@{size}" if size is not None else name
+        result = measure(func, args.samples, args.min_time)
+        result.update(name=name, size=size, **stats(result['samples']))
+        results[key] = result
+        print(f"{key:45} {format_time(result['median']):>10} ± {format_time(result['stdev']):>10}"
+              f"  ({result['loops']} llamadas/muestra)", file=sys.stderr)
+
+    for size in args.sizes:
+        source = synthetic_db(cache_dir, size, args.seed)
+        db_file = os.path.join(tmp, f"work-{size}.db")
+        shutil.copyfile(source, db_file)
+        manager = TemplateManager(db_file)
+        for name, func in template_benchmarks(manager, size, args.seed):
+            record(name, size, func)
+        manager.close()
+
+    deferred = ConfigManager(os.path.join(tmp, 'config-deferred.json'))
+    immediate = ConfigManager(os.path.join(tmp, 'config-immediate.json'), write_delay=None)
+    for name, func in config_benchmarks(deferred, immediate):
+        record(name, None, func)
+    deferred.close()
+    immediate.close()
+
+    for name, func in diagnostics_benchmarks(args.seed):
+        record(name, None, func)
+
+    if not args.skip_gui:
+        manager = TemplateManager(os.path.join(tmp, 'gui.db'))
+        bench = gui_benchmarks(tmp, manager)
+        if bench is not None:
+            benchmarks, close = bench
+            try:
+                for name, setup in benchmarks:
+                    record(name, None, setup())
+            finally:
+                close()
+        manager.close()
+    return results
+
+def metadata(args):
+    return {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'sizes': args.sizes,
+        'samples': args.samples,
+        'min_time': args.min_time
+    }
+
+def compare(baseline, results, max_slowdown, statistic='median'):
+    """
+    Compara cada operación con la misma de una ejecución anterior.
+
+    Args:
+        statistic (str): 'median' o 'min'; el mínimo es más estable en
+            máquinas con ruido, la mediana refleja mejor el caso típico.
+
+    Returns:
+        list: Claves de las operaciones más lentas que la base en más de
+            max_slowdown (0.2 = 20 %).
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get('benchmarks', {}).get(key)
+        if previous is None:
+            continue
+        ratio = result[statistic] / previous[statistic]
+        slower = ratio > 1 + max_slowdown
+        if slower:
+            regressions.append(key)
+        print(f"{'❌' if slower else '  '} {key:45} {format_time(previous[statistic]):>10} -> "
+              f"{format_time(result[statistic]):>10} ({(ratio - 1) * 100:+.1f} %)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--samples', type=int, default=10)
+    parser.add_argument('--min-time', type=float, default=0.05, help='Segundos mínimos por muestra')
+    parser.add_argument('--cache-dir', help='Directorio donde conservar las bases de datos sintéticas entre ejecuciones')
+    parser.add_argument('--skip-gui', action='store_true', help='No mide run_code ni el cambio de tema')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--baseline', help='Resultados JSON anteriores con los que comparar')
+    parser.add_argument('--max-slowdown', type=float, default=0.25,
+                        help='Ralentización máxima admitida respecto a --baseline (0.25 = 25 %%)')
+    parser.add_argument('--statistic', choices=('median', 'min'), default='median',
+                        help='Estadístico que se compara con --baseline')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(args, tmp)
+
+    report = {
+        'format': RESULTS_FORMAT,
+        'version': RESULTS_VERSION,
+        'metadata': metadata(args),
+        'benchmarks': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('format') != RESULTS_FORMAT:
+            print(f"{args.baseline} no es un archivo de resultados de la suite", file=sys.stderr)
+            return 2
+        regressions = compare(baseline, results, args.max_slowdown, args.statistic)
+        if regressions:
+            print(f"❌ {len(regressions)} operaciones más lentas que la base: {', '.join(regressions)}")
+            return 1
+        print("✅ Sin regresiones respecto a la base")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Ejecución por lotes de plantillas sin interfaz, para validarlas en CI.
+
+Cada proceso del pool crea una sola raíz Tk oculta y, por cada plantilla,
+construye su create_window en un Toplevel desechable, fuerza el layout con
+update_idletasks() y lo destruye. No se entra en mainloop: lo que se mide es
+la construcción de la interfaz.
+"""
+import fnmatch
+import io
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_OUTPUT = 2000
+
+_root = None
+_root_error = None
+_code_cache = None
+_timeout = None
+
+class TemplateTimeout(Exception):
+    pass
+
+def _on_timeout(signum, frame):
+    raise TemplateTimeout(f"La plantilla superó {_timeout:g} s")
+
+def _init_worker(timeout):
+    global _root, _root_error, _code_cache, _timeout
+    import tkinter as tk
+    from .code_cache import CodeCache
+    _code_cache = CodeCache(maxsize=8)
+    _timeout = timeout
+    if timeout and hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _on_timeout)
+    try:
+        _root = tk.Tk()
+        _root.withdraw()
+    except tk.TclError as e:
+        _root_error = str(e)
+
+def _count_widgets(window):
+    stack = list(window.winfo_children())
+    count = 0
+    while stack:
+        count += 1
+        stack.extend(stack.pop().winfo_children())
+    return count
+
+def run_template(job):
+    """
+    Construye una plantilla en el proceso trabajador.
+
+    Args:
+        job (tuple): (id, name, category, code).
+
+    Returns:
+        dict: id, name, category, status ('passed', 'failed' o 'error'),
+            error_type, message, trace, elapsed (s), peak_memory_kb (pico de
+            memoria de Python durante la construcción), widgets y output.
+    """
+    import tkinter as tk
+    template_id, name, category, code = job
+    result = {
+        'id': template_id,
+        'name': name,
+        'category': category,
+        'status': 'passed',
+        'error_type': None,
+        'message': None,
+        'trace': [],
+        'elapsed': 0.0,
+        'peak_memory_kb': 0,
+        'widgets': 0,
+        'output': ''
+    }
+    if _root is None:
+        result.update(status='error', error_type='TclError', message=_root_error)
+        return result
+
+    window = None
+    captured = io.StringIO()
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = captured
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if _timeout and hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_REAL, _timeout)
+        compiled, _ = _code_cache.compile(code)
+        window = tk.Toplevel(_root)
+        window.withdraw()
+        namespace = {}
+        exec(compiled, namespace)
+        namespace['create_window'](window)
+        window.update_idletasks()
+        result['widgets'] = _count_widgets(window)
+    except Exception as e:
+        result.update(
+            status='failed',
+            error_type=type(e).__name__,
+            message=str(e),
+            trace=[
+                (line, text)
+                for filename, line, func, text in traceback.extract_tb(e.__traceback__)
+                if filename.startswith('<editor-')
+            ]
+        )
+        if isinstance(e, SyntaxError) and e.lineno:
+            result['trace'].append((e.lineno, (e.text or '').strip()))
+    finally:
+        if _timeout and hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        result['elapsed'] = time.perf_counter() - start
+        result['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        result['output'] = captured.getvalue()[-MAX_OUTPUT:]
+        for child in _root.winfo_children():
+            try:
+                child.destroy()
+            except tk.TclError:
+                pass
+    return result
+
+def select_templates(template_manager, category=None, tag=None, name=None, page_size=1000):
+    """
+    Recorre las plantillas que cumplen los filtros.
+
+    Los filtros se resuelven antes de leer el código: categoría y tag con el
+    índice en memoria, y el nombre con list_templates_page(), que no lo
+    carga. Después sólo se leen y descomprimen las plantillas elegidas.
+
+    Args:
+        category (str, optional): Categoría exacta.
+        tag (str, optional): Tag que deben tener.
+        name (str, optional): Patrón de nombre estilo shell ('login*'),
+            sin distinguir mayúsculas.
+        page_size (int): Filas por consulta al filtrar por nombre.
+
+    Returns:
+        iterator: Plantillas de iter_templates() con su id.
+    """
+    ids = None
+    if category is not None or tag is not None:
+        ids = template_manager.find_template_ids([tag] if tag is not None else (), category=category)
+    if name:
+        pattern = name.lower()
+        matching = set()
+        after = None
+        while True:
+            rows = template_manager.list_templates_page(after=after, limit=page_size, ids=ids)
+            matching.update(row[0] for row in rows if fnmatch.fnmatchcase(row[1].lower(), pattern))
+            if len(rows) < page_size:
+                break
+            after = (rows[-1][3], rows[-1][0])
+        ids = matching
+    return template_manager.iter_templates(include_id=True, ids=ids)
+
+def run_batch(templates, workers=None, timeout=10.0):
+    """
+    Ejecuta las plantillas en un pool de procesos.
+
+    Sólo se mantienen en vuelo unas pocas plantillas por proceso, de modo
+    que la biblioteca se va leyendo de la base de datos según avanza. Si un
+    proceso muere, el pool se vuelve a crear y las plantillas que estaban en
+    curso se repiten al final, cada una en su propio proceso, para que sólo
+    la culpable se informe como 'error'.
+
+    Args:
+        templates (iterable): Diccionarios con id, name, category y code.
+        workers (int, optional): Procesos; por defecto, uno por núcleo.
+        timeout (float): Segundos máximos por plantilla (0 para no limitar).
+
+    Yields:
+        dict: Resultado de run_template() de cada plantilla, en el orden en
+            que terminan.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(templates)
+    pending = {}
+    suspects = []
+    pool = _new_pool(workers, timeout)
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers * 4:
+                template = next(jobs, None)
+                if template is None:
+                    exhausted = True
+                    break
+                job = (template['id'], template['name'], template.get('category'), template['code'])
+                pending[pool.submit(run_template, job)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    suspects.append(job)
+            if broken:
+                suspects.extend(pending.values())
+                pending.clear()
+                pool.shutdown(wait=False)
+                pool = _new_pool(workers, timeout)
+    finally:
+        # Si se deja de consumir el generador, no se esperan las pendientes
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+    for job in suspects:
+        yield _run_isolated(job, timeout)
+
+def _new_pool(workers, timeout):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(timeout,))
+
+def _run_isolated(job, timeout):
+    """Repite una plantilla en un proceso propio para saber si es ella la que lo mata"""
+    with _new_pool(1, timeout) as pool:
+        try:
+            return pool.submit(run_template, job).result()
+        except BrokenProcessPool:
+            return {
+                'id': job[0], 'name': job[1], 'category': job[2],
+                'status': 'error', 'error_type': 'WorkerCrash',
+                'message': "El proceso trabajador terminó de forma inesperada",
+                'trace': [], 'elapsed': 0.0, 'peak_memory_kb': 0, 'widgets': 0, 'output': ''
+            }
+
+def summarize(results, elapsed):
+    return {
+        'total': len(results),
+        'passed': sum(1 for result in results if result['status'] == 'passed'),
+        'failed': sum(1 for result in results if result['status'] == 'failed'),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+        'elapsed': elapsed
+    }
+
+def to_json(results, summary):
+    return json.dumps({'summary': summary, 'results': results}, ensure_ascii=False, indent=2)
+
+def to_junit(results, summary):
+    """Informe JUnit XML: una testsuite con un testcase por plantilla"""
+    import xml.etree.ElementTree as ET
+    suites = ET.Element('testsuites')
+    suite = ET.SubElement(suites, 'testsuite', {
+        'name': 'templates',
+        'tests': str(summary['total']),
+        'failures': str(summary['failed']),
+        'errors': str(summary['errors']),
+        'time': f"{summary['elapsed']:.3f}"
+    })
+    for result in results:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': f"templates.{result['category'] or 'general'}",
+            'name': result['name'],
+            'time': f"{result['elapsed']:.3f}"
+        })
+        ET.SubElement(case, 'properties')
+        for key in ('id', 'peak_memory_kb', 'widgets'):
+            ET.SubElement(case[0], 'property', {'name': key, 'value': str(result[key])})
+        if result['status'] != 'passed':
+            failure = ET.SubElement(case, 'failure' if result['status'] == 'failed' else 'error', {
+                'type': result['error_type'] or '',
+                'message': result['message'] or ''
+            })
+            failure.text = '\n'.join(f"Línea {line}: {text}" for line, text in result['trace'])
+        if result['output']:
+            ET.SubElement(case, 'system-out').text = result['output']
+    return ET.tostring(suites, encoding='unicode')
@@ -0,0 +1,183 @@
+import ast
+import hashlib
+import importlib.util
+import linecache
+import marshal
+import os
+from models.cache import LRUCache
+
+def validate_create_window(tree):
+    """
+    Comprueba que el módulo define create_window con un único parámetro.
+
+    Args:
+        tree (ast.Module): Árbol del código del editor.
+
+    Raises:
+        SyntaxError: Si falta la función o no admite exactamente un argumento.
+    """
+    function = None
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == 'create_window':
+            function = node
+
+    if function is None:
+        raise SyntaxError("El código debe contener una función llamada 'create_window'")
+
+    args = function.args
+    positional = args.posonlyargs + args.args
+    required = len(positional) - len(args.defaults)
+    required_kwonly = [
+        arg for arg, default in zip(args.kwonlyargs, args.kw_defaults) if default is None
+    ]
+    accepts_one = (len(positional) >= 1 or args.vararg is not None) and required <= 1
+    if isinstance(function, ast.AsyncFunctionDef) or not accepts_one or required_kwonly:
+        error = SyntaxError("La función create_window debe tener un parámetro (normalmente llamado 'root')")
+        error.lineno = function.lineno
+        raise error
+
+class CodeCache:
+    """
+    Caché de objetos código compilados, indexada por el hash del fuente.
+
+    Un acierto evita tanto el análisis y la validación del AST como la
+    compilación. Opcionalmente los objetos código se guardan en disco con
+    marshal para sobrevivir entre sesiones del IDE.
+
+    Las líneas de cada fuente se registran en linecache para que las trazas
+    las muestren, y se retiran cuando su entrada sale de la caché en memoria.
+
+    Args:
+        maxsize (int): Entradas máximas en memoria.
+        cache_dir (str, optional): Directorio donde persistir la caché.
+        max_disk_entries (int): Archivos máximos en cache_dir; al superarse
+            se borran los usados hace más tiempo.
+    """
+
+    def __init__(self, maxsize=64, cache_dir=None, max_disk_entries=256):
+        self.memory = LRUCache(maxsize, on_evict=self._evicted)
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.disk_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._prune()
+
+    @staticmethod
+    def key(source):
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def filename(key):
+        return f'<editor-{key[:12]}>'
+
+    @property
+    def hits(self):
+        return self.memory.hits + self.disk_hits
+
+    @property
+    def misses(self):
+        return self.memory.misses - self.disk_hits
+
+    def compile(self, source):
+        """
+        Devuelve el objeto código del fuente, validando create_window.
+
+        Returns:
+            tuple: (code, origen) donde origen es 'memoria', 'disco' o None
+                si hubo que compilar.
+        """
+        key = self.key(source)
+        filename = self.filename(key)
+
+        code = self.memory.get(key)
+        if code is not None:
+            self._register_lines(filename, source)
+            return code, 'memoria'
+
+        code = self._load(key)
+        if code is not None:
+            self.disk_hits += 1
+            origin = 'disco'
+        else:
+            tree = ast.parse(source, filename)
+            validate_create_window(tree)
+            code = compile(tree, filename, 'exec')
+            self._store(key, code)
+            origin = None
+        self._register_lines(filename, source)
+        self.memory.put(key, code)
+        return code, origin
+
+    @staticmethod
+    def _register_lines(filename, source):
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    def _evicted(self, key, code):
+        linecache.cache.pop(self.filename(key), None)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.bin')
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # La fecha de modificación marca el último uso al podar
+            os.utime(path)
+        except OSError:
+            return None
+        magic = importlib.util.MAGIC_NUMBER
+        if not data.startswith(magic):
+            return None
+        try:
+            return marshal.loads(data[len(magic):])
+        except (ValueError, EOFError, TypeError):
+            return None
+
+    def _store(self, key, code):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(importlib.util.MAGIC_NUMBER + marshal.dumps(code))
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._prune()
+
+    def _prune(self):
+        """Borra los archivos usados hace más tiempo por encima de max_disk_entries"""
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith('.bin')]
+        except OSError:
+            return
+        if len(names) <= self.max_disk_entries:
+            return
+        entries = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for key in self.memory.keys():
+            linecache.cache.pop(self.filename(key), None)
+        self.memory.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.bin'):
+                    os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,546 @@
+import ast
+import builtins
+import re
+import threading
+import time
+from models.cache import LRUCache
+from .code_cache import validate_create_window
+
+# Nombres disponibles sin definirlos: exec() sólo añade __builtins__
+KNOWN_NAMES = frozenset(dir(builtins)) | {'__builtins__', '__class__'}
+
+# Lo que interesa para partir el código en sentencias: comentarios, cadenas
+# (completas o con triple comilla sin cerrar), paréntesis y saltos de línea.
+# El prefijo de las cadenas no importa: ni en las r'' cierra una comilla escapada
+_LEXEME = re.compile(r'''
+    \#[^\n]*
+  | \'\'\'(?:\\.|[^\\])*?\'\'\' | """(?:\\.|[^\\])*?"""
+  | (?P<unclosed>\'\'\'|""")
+  | '(?:\\.|[^\\'\n])*' | "(?:\\.|[^\\"\n])*"
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+  | \\\n
+  | (?P<newline>\n)
+''', re.VERBOSE | re.DOTALL)
+
+# Líneas sin indentar que pueden empezar una sentencia
+_STATEMENT_START = re.compile(r'^(?![\s#)\]}\\]|(?:else|elif|except|finally)\b)', re.MULTILINE)
+
+def split_statements(source):
+    """
+    Divide el código en sus sentencias de primer nivel sin analizarlo.
+
+    Una sentencia empieza en cada línea sin indentar, salvo las que
+    continúan la anterior (else, elif, except, finally o lo que sigue a un
+    decorador). Los comentarios y líneas en blanco se quedan en la sentencia
+    anterior. Es una división rápida que no mira cadenas ni paréntesis: si
+    una sentencia no compila, statement_end() dice dónde acaba de verdad.
+
+    Returns:
+        list: Tuplas (primera línea, inicio, fin) con las posiciones en source.
+    """
+    starts = [0]
+    previous_decorator = source.startswith('@')
+    for match in _STATEMENT_START.finditer(source, 1):
+        start = match.start()
+        if start == len(source):
+            break
+        if not previous_decorator:
+            starts.append(start)
+        previous_decorator = source.startswith('@', start)
+
+    statements = []
+    line = 1
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(source)
+        statements.append((line, start, end))
+        line += source.count('\n', start, end)
+    return statements
+
+def statement_end(source, start):
+    """
+    Posición donde empieza la sentencia siguiente a la que empieza en
+    start, teniendo en cuenta cadenas, paréntesis y continuaciones con \\.
+    Si queda una cadena de triple comilla sin cerrar, el fin del código.
+    """
+    depth = 0
+    previous_decorator = source.startswith('@', start)
+    for match in _LEXEME.finditer(source, start):
+        kind = match.lastgroup
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            depth = max(depth - 1, 0)
+        elif kind == 'unclosed':
+            break
+        elif kind == 'newline' and depth == 0:
+            following = match.end()
+            if following < len(source) and _STATEMENT_START.match(source, following):
+                if not previous_decorator:
+                    return following
+                previous_decorator = source.startswith('@', following)
+    return len(source)
+
+def _chars(line, offset):
+    """Convierte un desplazamiento en bytes UTF-8 de ast en columna de carácter"""
+    if line.isascii():
+        return offset
+    return len(line.encode('utf-8')[:offset].decode('utf-8', 'ignore'))
+
+def _span(lines, node):
+    line, end_line = node.lineno, node.end_lineno
+    return (
+        line, _chars(lines[line - 1], node.col_offset),
+        end_line, _chars(lines[end_line - 1], node.end_col_offset)
+    )
+
+def _diagnostic(severity, message, span):
+    line, col, end_line, end_col = span
+    return {
+        'severity': severity,
+        'message': message,
+        'line': line,
+        'col': col,
+        'end_line': end_line,
+        'end_col': end_col
+    }
+
+def _syntax_error(e, lines):
+    """Diagnóstico de un SyntaxError, subrayando hasta el final de la línea si no hay fin"""
+    line = min(e.lineno or 1, len(lines))
+    while line > 1 and not lines[line - 1].strip():
+        line -= 1
+    text = lines[line - 1]
+    col = min(max((e.offset or 1) - 1, 0), max(len(text) - 1, 0))
+    end_col = len(text)
+    end_offset = getattr(e, 'end_offset', None)
+    if getattr(e, 'end_lineno', None) == e.lineno == line and end_offset and end_offset - 1 > col:
+        end_col = min(end_offset - 1, len(text))
+    return _diagnostic('error', e.msg, (line, col, line, end_col))
+
+class _Scope:
+    def __init__(self, kind, parent=None):
+        self.kind = kind
+        self.parent = parent
+        self.bound = set()
+        self.declared_global = set()
+        self.loads = []
+        self.imports = []
+        self.used = set()
+        self.children = []
+
+class _ScopeVisitor(ast.NodeVisitor):
+    """
+    Recorre una sentencia anotando qué nombres liga y lee cada ámbito. Las
+    lecturas se resuelven al final, así que el orden no importa (como en
+    las funciones, que se ejecutan cuando ya está todo definido).
+    """
+
+    def __init__(self):
+        self.module = self.scope = _Scope('module')
+        self.star_import = False
+
+    def _target(self, name, scope=None):
+        scope = scope or self.scope
+        return self.module if name in scope.declared_global else scope
+
+    def _bind(self, name, scope=None):
+        self._target(name, scope).bound.add(name)
+
+    def _enter(self, kind):
+        scope = _Scope(kind, self.scope)
+        self.scope.children.append(scope)
+        self.scope = scope
+
+    def _leave(self):
+        self.scope = self.scope.parent
+
+    @staticmethod
+    def _arguments(args):
+        arguments = getattr(args, 'posonlyargs', []) + args.args + args.kwonlyargs
+        return arguments + [arg for arg in (args.vararg, args.kwarg) if arg is not None]
+
+    def _visit_signature(self, args):
+        """Valores por defecto y anotaciones, que se evalúan en el ámbito exterior"""
+        for default in args.defaults + [default for default in args.kw_defaults if default is not None]:
+            self.visit(default)
+        for arg in self._arguments(args):
+            if arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.scope.loads.append((node.id, node))
+        else:
+            self._bind(node.id)
+
+    def visit_Global(self, node):
+        self.scope.declared_global.update(node.names)
+
+    def visit_FunctionDef(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for param in getattr(node, 'type_params', ()):
+            self.visit(param)
+        self._visit_signature(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._bind(node.name)
+        self._enter('function')
+        for arg in self._arguments(node.args):
+            self._bind(arg.arg)
+        for statement in node.body:
+            self.visit(statement)
+        self._leave()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_signature(node.args)
+        self._enter('function')
+        for arg in self._arguments(node.args):
+            self._bind(arg.arg)
+        self.visit(node.body)
+        self._leave()
+
+    def visit_ClassDef(self, node):
+        for child in node.decorator_list + list(getattr(node, 'type_params', ())) + node.bases + node.keywords:
+            self.visit(child)
+        self._bind(node.name)
+        self._enter('class')
+        for statement in node.body:
+            self.visit(statement)
+        self._leave()
+
+    def _visit_comprehension(self, node, *elements):
+        # El primer iterable se evalúa fuera; el resto, dentro de su ámbito
+        self.visit(node.generators[0].iter)
+        self._enter('comprehension')
+        for index, generator in enumerate(node.generators):
+            if index:
+                self.visit(generator.iter)
+            self.visit(generator.target)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for element in elements:
+            self.visit(element)
+        self._leave()
+
+    def visit_ListComp(self, node):
+        self._visit_comprehension(node, node.elt)
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node):
+        self._visit_comprehension(node, node.key, node.value)
+
+    def visit_NamedExpr(self, node):
+        self.visit(node.value)
+        scope = self.scope
+        while scope.kind == 'comprehension':
+            scope = scope.parent
+        self._bind(node.target.id, scope)
+
+    def _import(self, name, node):
+        target = self._target(name)
+        target.bound.add(name)
+        target.imports.append((name, node))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._import(alias.asname or alias.name.partition('.')[0], alias if hasattr(alias, 'lineno') else node)
+
+    def visit_ImportFrom(self, node):
+        if node.module == '__future__':
+            return
+        for alias in node.names:
+            if alias.name == '*':
+                self.star_import = True
+                continue
+            self._import(alias.asname or alias.name, alias if hasattr(alias, 'lineno') else node)
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self._bind(node.name)
+        self.generic_visit(node)
+
+    def _visit_named(self, node):
+        # Patrones de match (3.10+) y parámetros de tipo (3.12+)
+        if getattr(node, 'name', None):
+            self._bind(node.name)
+        self.generic_visit(node)
+
+    visit_MatchAs = visit_MatchStar = visit_TypeVar = visit_ParamSpec = visit_TypeVarTuple = _visit_named
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self._bind(node.rest)
+        self.generic_visit(node)
+
+    def resolve(self, scope=None, uses=None):
+        """
+        Resuelve las lecturas de cada ámbito, marcando en used los nombres
+        que se leen de él.
+
+        Returns:
+            list: Pares (nombre, nodo) de las lecturas que llegan al módulo.
+        """
+        scope = scope or self.module
+        uses = [] if uses is None else uses
+        for name, node in scope.loads:
+            target = self._target(name, scope)
+            while target.kind != 'module' and not (
+                name in target.bound and (target is scope or target.kind != 'class')
+            ):
+                target = target.parent
+            target.used.add(name)
+            if target.kind == 'module':
+                uses.append((name, node))
+        for child in scope.children:
+            self.resolve(child, uses)
+        return uses
+
+    def local_scopes(self, scope=None):
+        scope = scope or self.module
+        for child in scope.children:
+            yield child
+            yield from self.local_scopes(child)
+
+def analyze_statement(source):
+    """
+    Analiza una sentencia de primer nivel por separado. Las líneas son
+    relativas a su primera línea, así que el resultado sirve aunque la
+    sentencia se mueva por el archivo.
+
+    Returns:
+        dict: 'diagnostics' (los que no dependen del resto del código),
+            'syntax_error', 'bindings' (nombres que liga en el módulo),
+            'uses' y 'imports' (pares (nombre, tramo) de las lecturas que
+            llegan al módulo y de los imports de primer nivel),
+            'star_import' y 'create_window' (False si no la define, True
+            si es válida o el diagnóstico de sus parámetros).
+    """
+    lines = source.splitlines() or ['']
+    summary = {
+        'diagnostics': [],
+        'syntax_error': False,
+        'bindings': frozenset(),
+        'uses': (),
+        'imports': (),
+        'star_import': False,
+        'create_window': False
+    }
+    try:
+        tree = ast.parse(source)
+        compile(tree, '<diagnostics>', 'exec')
+    except SyntaxError as e:
+        summary['syntax_error'] = True
+        summary['diagnostics'].append(_syntax_error(e, lines))
+        return summary
+    except ValueError as e:
+        summary['syntax_error'] = True
+        summary['diagnostics'].append(_diagnostic('error', str(e), (1, 0, 1, len(lines[0]))))
+        return summary
+
+    visitor = _ScopeVisitor()
+    for statement in tree.body:
+        visitor.visit(statement)
+    uses = visitor.resolve()
+    for scope in visitor.local_scopes():
+        for name, node in scope.imports:
+            if name not in scope.used:
+                summary['diagnostics'].append(
+                    _diagnostic('warning', f"'{name}' se importa pero no se usa", _span(lines, node))
+                )
+
+    functions = [
+        node for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == 'create_window'
+    ]
+    if functions:
+        summary['create_window'] = True
+        try:
+            validate_create_window(tree)
+        except SyntaxError as e:
+            function = functions[-1]
+            line = function.lineno
+            summary['create_window'] = _diagnostic(
+                'error', e.msg, (line, function.col_offset, line, len(lines[line - 1]))
+            )
+
+    summary.update(
+        bindings=frozenset(visitor.module.bound),
+        uses=tuple((name, _span(lines, node)) for name, node in uses),
+        imports=tuple((name, _span(lines, node)) for name, node in visitor.module.imports),
+        star_import=visitor.star_import
+    )
+    return summary
+
+def _shift(diagnostic, offset):
+    if diagnostic['line'] is None or not offset:
+        return diagnostic
+    return dict(diagnostic, line=diagnostic['line'] + offset, end_line=diagnostic['end_line'] + offset)
+
+class DiagnosticsService:
+    """
+    Diagnósticos estáticos del código del editor en un hilo de fondo.
+
+    Detecta errores de sintaxis y de compilación, nombres no definidos,
+    create_window ausente o con parámetros incorrectos e imports sin usar.
+    El análisis de cada sentencia de primer nivel se guarda en una caché
+    indexada por su texto, de modo que tras una edición sólo se vuelven a
+    analizar las sentencias que cambiaron; combinar los resultados para
+    los nombres e imports del módulo es barato.
+
+    submit() sólo deja el código pendiente; si llega otro antes de que el
+    hilo lo recoja, el anterior se descarta. poll() devuelve el resultado
+    del último código enviado, nunca uno obsoleto.
+
+    Args:
+        cache_size (int): Sentencias analizadas que se conservan.
+    """
+
+    def __init__(self, cache_size=4096):
+        self.cache = LRUCache(cache_size)
+        self.last_duration = 0.0
+        self.last_statements = 0
+        self.last_analyzed = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = None
+        self._result = None
+        self._working = False
+        self._closed = False
+        self._thread = None
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._working or self._pending is not None or self._result is not None
+
+    def submit(self, source, tag=None):
+        """Encola source para analizarlo; tag se devuelve con su resultado"""
+        with self._lock:
+            self._pending = (source, tag)
+            self._result = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='diagnostics', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def poll(self):
+        """
+        Returns:
+            tuple: (tag, diagnósticos) del último código enviado, o None si
+                aún no está listo o ya se entregó.
+        """
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+            with self._lock:
+                job, self._pending = self._pending, None
+                self._working = job is not None
+            if job is None:
+                continue
+            source, tag = job
+            try:
+                diagnostics = self.analyze(source)
+            except Exception as e:
+                diagnostics = [_diagnostic('error', f"Error interno del análisis: {e}", (None, 0, None, 0))]
+            with self._lock:
+                self._working = False
+                if self._pending is None:
+                    self._result = (tag, diagnostics)
+
+    def analyze(self, source):
+        """
+        Analiza el código completo en el hilo actual.
+
+        Returns:
+            list: Diagnósticos ordenados por posición, como diccionarios con
+                severity ('error' o 'warning'), message, line, col,
+                end_line y end_col (columnas en caracteres, como los índices
+                de Tk). Los que no tienen posición llevan line None.
+        """
+        started = time.perf_counter()
+        statements = split_statements(source)
+        summaries = []
+        self.last_analyzed = 0
+        index = 0
+        while index < len(statements):
+            line, start, end = statements[index]
+            summary = self._summary(source[start:end])
+            index += 1
+            if summary['syntax_error'] and index < len(statements):
+                # Quizá la división rápida cortó una cadena o unos paréntesis
+                end = statement_end(source, start)
+                if end > statements[index][1]:
+                    while index < len(statements) and statements[index][1] < end:
+                        index += 1
+                    summary = self._summary(source[start:end])
+            summaries.append((line - 1, summary))
+
+        diagnostics = [
+            _shift(diagnostic, offset)
+            for offset, summary in summaries
+            for diagnostic in summary['diagnostics']
+        ]
+        # Con errores de sintaxis el código no se ejecutaría: no se buscan más problemas
+        if not any(summary['syntax_error'] for _, summary in summaries):
+            diagnostics.extend(self._module_diagnostics(summaries))
+
+        self.last_duration = time.perf_counter() - started
+        self.last_statements = len(summaries)
+        diagnostics.sort(key=lambda d: (d['line'] is not None, d['line'] or 0, d['col']))
+        return diagnostics
+
+    def _summary(self, text):
+        summary = self.cache.get(text)
+        if summary is None:
+            summary = analyze_statement(text)
+            self.cache.put(text, summary)
+            self.last_analyzed += 1
+        return summary
+
+    @staticmethod
+    def _module_diagnostics(summaries):
+        """Problemas que dependen de todo el módulo: nombres, imports y create_window"""
+        bindings = set(KNOWN_NAMES)
+        used = set()
+        star_import = False
+        for _, summary in summaries:
+            bindings |= summary['bindings']
+            used.update(name for name, _ in summary['uses'])
+            star_import = star_import or summary['star_import']
+
+        diagnostics = []
+        for offset, summary in summaries:
+            if not star_import:
+                for name, span in summary['uses']:
+                    if name not in bindings:
+                        diagnostics.append(_shift(_diagnostic('error', f"Nombre '{name}' no definido", span), offset))
+            for name, span in summary['imports']:
+                if name not in used:
+                    diagnostics.append(_shift(_diagnostic('warning', f"'{name}' se importa pero no se usa", span), offset))
+
+        # Como al ejecutar, cuenta la última definición de create_window
+        definitions = [(offset, summary['create_window']) for offset, summary in summaries if summary['create_window']]
+        if not definitions:
+            try:
+                validate_create_window(ast.Module(body=[], type_ignores=[]))
+            except SyntaxError as e:
+                diagnostics.append(_diagnostic('error', e.msg, (None, 0, None, 0)))
+        elif isinstance(definitions[-1][1], dict):
+            diagnostics.append(_shift(definitions[-1][1], definitions[-1][0]))
+        return diagnostics
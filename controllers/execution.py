@@ -0,0 +1,256 @@
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'execution_worker.py')
+
+class WorkerProcess:
+    """
+    Proceso trabajador con tkinter precargado.
+
+    Un hilo lector convierte cada línea JSON que emite el proceso en un
+    mensaje de la cola messages. Las líneas que no son JSON (por ejemplo,
+    errores del propio intérprete) se reciben como salida de stderr.
+
+    Args:
+        python (str, optional): Intérprete con el que lanzar el proceso.
+        on_message (callable, optional): Se llama desde el hilo lector tras
+            encolar cada mensaje.
+    """
+
+    def __init__(self, python=None, on_message=None):
+        self.messages = queue.Queue()
+        self.on_message = on_message
+        self.process = subprocess.Popen(
+            [python or sys.executable, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = {'type': 'stderr', 'data': line}
+            self._put(message)
+        self._put({'type': 'exit', 'returncode': self.process.wait()})
+
+    def _put(self, message):
+        self.messages.put(message)
+        if self.on_message is not None:
+            self.on_message()
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message) + '\n')
+            self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+
+    def interrupt(self):
+        """Pide al trabajador que interrumpa el código en curso"""
+        if os.name == 'posix' and self.is_alive():
+            self.process.send_signal(signal.SIGINT)
+            return True
+        return False
+
+    def kill(self):
+        if self.is_alive():
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+class ExecutionEngine:
+    """
+    Ejecuta snippets en procesos Python separados del IDE.
+
+    Mantiene un trabajador activo, que conserva la ventana de prueba de la
+    última ejecución, y warm_workers procesos de reserva ya arrancados para
+    sustituirlo cuando hay que matarlo. Todos los métodos se llaman desde
+    el hilo de Tk; poll() devuelve los eventos pendientes sin bloquear.
+
+    No arranca ningún proceso hasta la primera llamada a run() o start().
+    Entre ejecuciones, wake_fd() permite esperar los mensajes de la ventana
+    de prueba sin sondear.
+
+    Args:
+        warm_workers (int): Procesos de reserva que se mantienen arrancados.
+        timeout (float): Segundos que puede tardar create_window antes de
+            matar el proceso. None para no limitar.
+        cancel_grace (float): Segundos que se espera tras cancel() antes de
+            matar el proceso si el código no se ha interrumpido.
+        python (str, optional): Intérprete con el que lanzar los trabajadores.
+    """
+
+    def __init__(self, warm_workers=1, timeout=30.0, cancel_grace=1.0, python=None):
+        self.warm_workers = warm_workers
+        self.timeout = timeout
+        self.cancel_grace = cancel_grace
+        self.python = python
+        self.idle = []
+        self.active = None
+        self.run_id = 0
+        self.running = False
+        self.started_at = None
+        self.cancel_deadline = None
+        self._wake_fds = None
+        self._wake_pending = threading.Event()
+
+    def start(self):
+        """Arranca los procesos de reserva"""
+        self.idle = [worker for worker in self.idle if worker.is_alive()]
+        while len(self.idle) < self.warm_workers:
+            self.idle.append(WorkerProcess(self.python, self._wake))
+
+    def wake_fd(self):
+        """
+        Devuelve un descriptor que se vuelve legible cuando llegan mensajes
+        de los trabajadores, para vigilarlo por ejemplo con createfilehandler
+        de Tk. poll() lo vacía. Sólo en sistemas POSIX.
+        """
+        if self._wake_fds is None:
+            self._wake_fds = os.pipe()
+            os.set_blocking(self._wake_fds[0], False)
+        return self._wake_fds[0]
+
+    def _wake(self):
+        # Hilo lector: un solo byte por tanda de mensajes, hasta el próximo poll()
+        fds = self._wake_fds
+        if fds is None or self._wake_pending.is_set():
+            return
+        self._wake_pending.set()
+        try:
+            os.write(fds[1], b'.')
+        except OSError:
+            pass
+
+    def run(self, code):
+        """
+        Envía el código al trabajador activo.
+
+        Si el trabajador sigue ocupado con una ejecución anterior, se mata y
+        se sustituye por uno de reserva.
+
+        Returns:
+            int: Identificador de la ejecución.
+        """
+        if self.active is not None and (self.running or not self.active.is_alive()):
+            self._discard_active()
+
+        if self.active is None:
+            self.active = self._take_worker()
+
+        self.run_id += 1
+        self.running = True
+        self.started_at = time.monotonic()
+        self.cancel_deadline = None
+        if not self.active.send({'type': 'run', 'run_id': self.run_id, 'code': code}):
+            self._discard_active()
+            self.active = self._take_worker()
+            self.active.send({'type': 'run', 'run_id': self.run_id, 'code': code})
+
+        self.start()
+        return self.run_id
+
+    def _take_worker(self):
+        while self.idle:
+            worker = self.idle.pop(0)
+            if worker.is_alive():
+                return worker
+        return WorkerProcess(self.python, self._wake)
+
+    def _discard_active(self):
+        if self.active is not None:
+            self.active.kill()
+        self.active = None
+        self.running = False
+        self.cancel_deadline = None
+
+    def poll(self):
+        """
+        Recoge los mensajes del trabajador activo.
+
+        Returns:
+            list: Eventos en orden de llegada. Además de los del trabajador,
+                puede incluir 'timeout', 'killed' y 'exit'.
+        """
+        if self._wake_fds is not None:
+            self._wake_pending.clear()
+            try:
+                os.read(self._wake_fds[0], 4096)
+            except OSError:
+                pass
+        events = []
+        worker = self.active
+        while worker is not None:
+            try:
+                message = worker.messages.get_nowait()
+            except queue.Empty:
+                break
+            kind = message.get('type')
+            if kind == 'ready':
+                continue
+            if kind in ('done', 'error', 'cancelled') and message.get('run_id') == self.run_id:
+                self.running = False
+                self.cancel_deadline = None
+            if kind in ('exit', 'fatal'):
+                message['run_id'] = self.run_id if self.running else None
+                self._discard_active()
+                events.append(message)
+                break
+            events.append(message)
+
+        if self.running and self.cancel_deadline is not None and time.monotonic() > self.cancel_deadline:
+            events.append(self.kill())
+        elif self.running and self.timeout and time.monotonic() - self.started_at > self.timeout:
+            self._discard_active()
+            events.append({'type': 'timeout', 'run_id': self.run_id, 'elapsed': self.timeout})
+        return events
+
+    def cancel(self):
+        """Interrumpe la ejecución en curso, matando el proceso si no responde"""
+        if not self.running or self.active is None:
+            return
+        if self.active.interrupt():
+            self.cancel_deadline = time.monotonic() + self.cancel_grace
+        else:
+            self.cancel_deadline = time.monotonic()
+
+    def kill(self):
+        """Mata el trabajador activo, cerrando también su ventana de prueba"""
+        event = {'type': 'killed', 'run_id': self.run_id if self.running else None}
+        self._discard_active()
+        return event
+
+    def has_worker(self):
+        return self.active is not None
+
+    def shutdown(self):
+        """Termina todos los procesos"""
+        self._discard_active()
+        for worker in self.idle:
+            worker.kill()
+        self.idle = []
+        if self._wake_fds is not None:
+            for fd in self._wake_fds:
+                os.close(fd)
+            self._wake_fds = None
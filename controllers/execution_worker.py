@@ -0,0 +1,134 @@
+"""
+Proceso trabajador de ExecutionEngine.
+
+Se lanza como script independiente con tkinter ya importado y una raíz Tk
+oculta que se mantiene viva entre ejecuciones. Recibe trabajos como líneas
+JSON por stdin y responde por stdout, también en líneas JSON:
+
+    -> {"type": "run", "run_id": 1, "code": "..."}
+    <- {"type": "stdout" | "stderr", "data": "..."}
+    <- {"type": "done", "run_id": 1, "elapsed": 0.01}
+    <- {"type": "error", "run_id": 1, "error_type": "...", "message": "...", "trace": [[línea, texto], ...]}
+    <- {"type": "cancelled", "run_id": 1}
+"""
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+import tkinter as tk
+from tkinter import ttk
+
+PROTOCOL = sys.stdout
+_send_lock = threading.Lock()
+
+def send(message):
+    line = json.dumps(message)
+    with _send_lock:
+        PROTOCOL.write(line + '\n')
+        PROTOCOL.flush()
+
+class StreamWriter:
+    """Reenvía lo que el código del usuario escribe en stdout/stderr"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def write(self, data):
+        if data:
+            send({'type': self.name, 'data': data})
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+def read_jobs(jobs):
+    for line in sys.stdin:
+        try:
+            jobs.put(json.loads(line))
+        except ValueError:
+            continue
+    jobs.put(None)
+
+class Worker:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.test_window = None
+        self.jobs = queue.Queue()
+        threading.Thread(target=read_jobs, args=(self.jobs,), daemon=True).start()
+
+    def serve(self):
+        sys.stdout = StreamWriter('stdout')
+        sys.stderr = StreamWriter('stderr')
+        send({'type': 'ready'})
+        self.root.after(10, self.poll)
+        self.root.mainloop()
+
+    def poll(self):
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self.root.destroy()
+                return
+            if job.get('type') == 'run':
+                self.run(job)
+        self.root.after(10, self.poll)
+
+    def run(self, job):
+        run_id = job['run_id']
+        start = time.perf_counter()
+
+        if self.test_window is not None and self.test_window.winfo_exists():
+            self.test_window.destroy()
+
+        self.test_window = tk.Toplevel(self.root)
+        self.test_window.title("Ventana de Prueba")
+
+        try:
+            namespace = {}
+            exec(job['code'], namespace)
+            namespace['create_window'](self.test_window)
+        except KeyboardInterrupt:
+            self.destroy_test_window()
+            send({'type': 'cancelled', 'run_id': run_id})
+        except Exception as e:
+            trace = [
+                (line, text)
+                for filename, line, func, text in traceback.extract_tb(e.__traceback__)
+                if 'create_window' in func
+            ]
+            self.destroy_test_window()
+            send({
+                'type': 'error',
+                'run_id': run_id,
+                'error_type': type(e).__name__,
+                'message': str(e),
+                'trace': trace
+            })
+        else:
+            send({'type': 'done', 'run_id': run_id, 'elapsed': time.perf_counter() - start})
+
+    def destroy_test_window(self):
+        if self.test_window is not None and self.test_window.winfo_exists():
+            self.test_window.destroy()
+        self.test_window = None
+
+def main():
+    try:
+        worker = Worker()
+    except tk.TclError as e:
+        send({'type': 'fatal', 'error_type': type(e).__name__, 'message': str(e)})
+        return 1
+    worker.serve()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
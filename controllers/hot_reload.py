@@ -0,0 +1,68 @@
+import tkinter as tk
+
+def iter_widgets(window):
+    """Recorre en profundidad todos los descendientes de window"""
+    stack = list(window.winfo_children())
+    while stack:
+        widget = stack.pop()
+        yield widget
+        stack.extend(widget.winfo_children())
+
+def capture_state(window):
+    """
+    Guarda la geometría de la ventana y la posición de desplazamiento de
+    sus widgets, indexada por su ruta relativa a la ventana.
+
+    Los nombres automáticos de Tk (!frame, !text2...) dependen sólo del
+    orden de creación, así que tras reconstruir con un código parecido
+    los widgets equivalentes conservan la misma ruta.
+    """
+    prefix = str(window)
+    scroll = {}
+    for widget in iter_widgets(window):
+        views = {}
+        for axis in ('xview', 'yview'):
+            view = getattr(widget, axis, None)
+            if view is None:
+                continue
+            try:
+                views[axis] = view()[0]
+            except (tk.TclError, TypeError, IndexError):
+                pass
+        if views:
+            scroll[str(widget)[len(prefix):]] = views
+    return {'geometry': window.geometry(), 'scroll': scroll}
+
+def restore_state(window, state):
+    """Restaura la geometría y el desplazamiento guardados con capture_state()"""
+    window.geometry(state['geometry'])
+    window.update_idletasks()
+    prefix = str(window)
+    for widget in iter_widgets(window):
+        views = state['scroll'].get(str(widget)[len(prefix):])
+        if not views:
+            continue
+        for axis, first in views.items():
+            try:
+                getattr(widget, f'{axis}_moveto')(first)
+            except (tk.TclError, AttributeError):
+                pass
+
+def reset_window(window, title):
+    """
+    Destruye los hijos de la ventana y deshace la configuración que el código
+    de prueba suele aplicar al root recibido, para reconstruirla en el sitio.
+    """
+    for child in window.winfo_children():
+        child.destroy()
+    for sequence in window.bind():
+        window.unbind(sequence)
+    columns, rows = window.grid_size()
+    for index in range(columns):
+        window.columnconfigure(index, weight=0, minsize=0, pad=0, uniform='')
+    for index in range(rows):
+        window.rowconfigure(index, weight=0, minsize=0, pad=0, uniform='')
+    window.grid_propagate(True)
+    window.pack_propagate(True)
+    window.configure(menu='')
+    window.title(title)
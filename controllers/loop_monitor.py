@@ -0,0 +1,156 @@
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+# Límites superiores en ms de las cubetas del histograma: cada una es un 25 %
+# mayor que la anterior, de 0,1 ms a unos 10 s, más una de desbordamiento
+BUCKET_BOUNDS = tuple(0.1 * 1.25 ** k for k in range(52))
+
+class LatencyHistogram:
+    """
+    Histograma de latencias de tamaño fijo, con cubetas logarítmicas.
+
+    Los percentiles se devuelven como el límite superior de su cubeta, así
+    que sobrestiman como mucho un 25 %.
+    """
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, value_ms):
+        low, high = 0, len(self.bounds)
+        while low < high:
+            middle = (low + high) // 2
+            if value_ms <= self.bounds[middle]:
+                high = middle
+            else:
+                low = middle + 1
+        self.counts[low] += 1
+        self.count += 1
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, p):
+        """Latencia en ms por debajo de la que queda el p % de las muestras"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.max = 0.0
+
+class LoopMonitor:
+    """
+    Mide la latencia del bucle de eventos de Tk con un latido de after().
+
+    Cada latido se programa para dentro de interval_ms; el retraso con el
+    que llega es el tiempo que el bucle estuvo ocupado con otras cosas
+    (callbacks lentos, tormentas de after()...). Los retrasos de al menos
+    stall_ms cuentan como bloqueos. Con sample_stacks, un hilo vigilante
+    captura la pila del hilo de Tk mientras el bloqueo sigue en curso.
+
+    Args:
+        widget (tk.Misc): Cualquier widget del bucle a vigilar.
+        interval_ms (int): Periodo del latido.
+        stall_ms (float): Retraso a partir del cual se considera bloqueo.
+        on_stall (callable, optional): Recibe cada bloqueo, en el hilo de
+            Tk, como dict con 'delay_ms' y 'stack' (StackSummary o None).
+        sample_stacks (bool): Capturar la pila durante los bloqueos.
+    """
+
+    def __init__(self, widget, interval_ms=10, stall_ms=100, on_stall=None, sample_stacks=False):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.on_stall = on_stall
+        self.sample_stacks = sample_stacks
+        self.histogram = LatencyHistogram()
+        self.stalls = 0
+        self.recent_stalls = deque(maxlen=20)
+        self.running = False
+        self._after_id = None
+        self._due = None
+        self._sample = None
+        self._thread_id = None
+        self._generation = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._generation += 1
+        self._thread_id = threading.get_ident()
+        self._schedule()
+        threading.Thread(target=self._watch, args=(self._generation,), name='loop-monitor', daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def reset(self):
+        self.histogram.reset()
+        self.stalls = 0
+        self.recent_stalls.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'p50_ms', 'p99_ms', 'max_ms', 'beats' y 'stalls'.
+        """
+        return {
+            'p50_ms': self.histogram.percentile(50),
+            'p99_ms': self.histogram.percentile(99),
+            'max_ms': self.histogram.max,
+            'beats': self.histogram.count,
+            'stalls': self.stalls
+        }
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self.widget.after(self.interval_ms, self._beat)
+
+    def _beat(self):
+        self._after_id = None
+        if not self.running:
+            return
+        delay_ms = max(0.0, (time.perf_counter() - self._due) * 1000)
+        self.histogram.record(delay_ms)
+        sample, self._sample = self._sample, None
+        if delay_ms >= self.stall_ms:
+            self.stalls += 1
+            stall = {'delay_ms': delay_ms, 'stack': sample[1] if sample and sample[0] == self._due else None}
+            self.recent_stalls.append(stall)
+            if self.on_stall is not None:
+                self.on_stall(stall)
+        self._schedule()
+
+    def _watch(self, generation):
+        """Hilo vigilante: captura la pila del hilo de Tk si un latido se retrasa"""
+        sampled_due = None
+        while self.running and self._generation == generation:
+            time.sleep(self.stall_ms / 4000)
+            due = self._due
+            if not self.sample_stacks or due is None or due == sampled_due:
+                continue
+            if (time.perf_counter() - due) * 1000 >= self.stall_ms:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._sample = (due, traceback.extract_stack(frame))
+                sampled_due = due
@@ -1,9 +1,16 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from io import StringIO
+from tkinter import ttk, messagebox, scrolledtext
 import sys
-import traceback
 import re
+import os
+from views import OutputPipe
+from models.autosave import AutosaveJournal
+
+ARCHIVE_FILETYPES = [
+    ("JSON Lines comprimido", "*.jsonl.gz *.jsonl.zst"),
+    ("JSON Lines", "*.jsonl"),
+    ("Todos los archivos", "*.*")
+]
 
 class MainController:
     def __init__(self, view, config_manager, template_manager):
@@ -11,22 +18,121 @@ class MainController:
         self.config_manager = config_manager
         self.template_manager = template_manager
         self.test_window = None
+        self.polling_execution = False
+        self.output = OutputPipe(
+            self.view.output_area,
+            max_lines=self.config_manager.get('output_max_lines', 5000)
+        )
+        self._code_cache = None
+        self.autosave = None
+        if self.config_manager.get('auto_save', True):
+            self.autosave = AutosaveJournal(self.data_path('autosave.journal'))
+        self.autosave_after_id = None
+        self.hot_reload_after_id = None
+        self.hot_reload_key = None
+        self._diagnostics_service = None
+        self.diagnostics_after_id = None
+        self.diagnostics_version = 0
+        self.polling_diagnostics = False
+        self.diagnostics = []
+        self.build_timings = None
+        self._execution_engine = None
+        self.execution_wakeups = False
+        self.loop_monitor = None
+        self.last_stall_report = 0.0
         self.setup_callbacks()
+        self.setup_output_tags()
         self.load_initial_state()
+        self.output.start()
+        if self.config_manager.get('prewarm_execution', False):
+            self.view.root.after(500, lambda: self.execution_engine.start())
+
+    @property
+    def code_cache(self):
+        """Caché de compilación, creada al compilar por primera vez"""
+        if self._code_cache is None:
+            from .code_cache import CodeCache
+            self._code_cache = CodeCache(
+                maxsize=self.config_manager.get('code_cache_size', 64),
+                cache_dir=self.code_cache_dir()
+            )
+        return self._code_cache
+
+    @property
+    def execution_engine(self):
+        """Motor de ejecución aislada, creado en la primera ejecución aislada"""
+        if self._execution_engine is None:
+            from .execution import ExecutionEngine
+            engine = ExecutionEngine(
+                timeout=self.config_manager.get('execution_timeout', 30)
+            )
+            # Entre ejecuciones la ventana de prueba sigue escribiendo: Tk
+            # avisa cuando llegan mensajes en lugar de sondear (no en Windows)
+            tk_app = self.view.root.tk
+            if hasattr(tk_app, 'createfilehandler'):
+                tk_app.createfilehandler(engine.wake_fd(), tk.READABLE, self.on_execution_wake)
+                self.execution_wakeups = True
+            self._execution_engine = engine
+        return self._execution_engine
+
+    @property
+    def diagnostics_service(self):
+        """Análisis estático en segundo plano, creado con el primer diagnóstico"""
+        if self._diagnostics_service is None:
+            from .diagnostics import DiagnosticsService
+            self._diagnostics_service = DiagnosticsService(
+                cache_size=self.config_manager.get('diagnostics_cache_size', 4096)
+            )
+        return self._diagnostics_service
 
     def setup_callbacks(self):
         self.view.file_menu.add_command(label="Guardar como plantilla", command=self.save_template)
         self.view.file_menu.add_command(label="Cargar plantilla", command=self.load_template)
         self.view.file_menu.add_separator()
-        self.view.file_menu.add_command(label="Salir", command=self.view.root.quit)
+        self.view.file_menu.add_command(label="Exportar plantillas...", command=self.export_templates)
+        self.view.file_menu.add_command(label="Importar plantillas...", command=self.import_templates)
+        self.view.file_menu.add_separator()
+        self.view.file_menu.add_command(label="Salir", command=self.on_closing)
 
         self.view.run_button.configure(command=self.run_code)
+        self.view.profile_button.configure(command=self.run_code_profiled)
+        self.view.run_in_process_button.configure(command=self.run_code_in_process)
+        self.view.stop_button.configure(command=self.stop_execution)
         self.view.clear_output_button.configure(command=self.clear_output)
         self.view.clear_code_button.configure(command=self.clear_code)
         self.view.theme_button.configure(command=self.toggle_theme)
+        self.view.hot_reload_check.configure(command=self.toggle_hot_reload)
+        self.view.stack_sample_check.configure(command=self.toggle_stack_sampling)
+        self.view.inspect_button.configure(command=self.inspect_test_window)
+        for tag in ('diag_error', 'diag_warning'):
+            self.view.code_editor.tag_bind(tag, '<Enter>', self.show_diagnostic_at)
+            self.view.code_editor.tag_bind(tag, '<Leave>', lambda event: self.show_diagnostics_summary())
+        self.view.root.bind('<Control-s>', self.save_and_reload)
+        self.view.root.bind('<F5>', lambda event: self.run_code())
 
         self.view.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def data_path(self, name):
+        """Ruta dentro del directorio de datos, junto al fichero de configuración"""
+        data_dir = os.path.dirname(os.path.abspath(self.config_manager.config_file))
+        return os.path.join(data_dir, name)
+
+    def code_cache_dir(self):
+        """Directorio de la caché de compilación persistente, si está activada"""
+        if not self.config_manager.get('persist_code_cache', False):
+            return None
+        return self.data_path('code_cache')
+
+    def setup_output_tags(self):
+        output_area = self.view.output_area
+        output_area.tag_configure("success", foreground="green")
+        output_area.tag_configure("info", foreground="gray")
+        output_area.tag_configure("stderr", foreground="dark red")
+        output_area.tag_configure("trimmed", foreground="gray")
+        output_area.tag_configure("error_title", foreground="red")
+        output_area.tag_configure("error_msg", foreground="dark red")
+        output_area.tag_configure("error_trace", foreground="gray")
+
     def load_initial_state(self):
         window_size = self.config_manager.get('window_size')
         window_pos = self.config_manager.get('last_position')
@@ -46,76 +152,470 @@ def create_window(root):
     label = ttk.Label(root, text="¡Hola Mundo!")
     label.pack(padx=20, pady=20)
 '''
-        self.view.code_editor.insert('1.0', default_code)
+        # El diario de autoguardado es la única copia del código del editor
+        restored_code = self.autosave.restore() if self.autosave else None
+        self.view.code_editor.insert('1.0', default_code if restored_code is None else restored_code)
+        self.view.hot_reload_var.set(self.config_manager.get('hot_reload', False))
+        
+        if self.autosave:
+            self.autosave.start()
+        self.view.code_editor.edit_modified(False)
+        self.view.code_editor.bind('<<Modified>>', self.on_code_modified)
+        self.schedule_diagnostics()
+
+    def on_code_modified(self, event=None):
+        """Programa el autoguardado, la recarga en vivo y los diagnósticos tras una pausa en la edición"""
+        editor = self.view.code_editor
+        if not editor.edit_modified():
+            return
+        editor.edit_modified(False)
+        root = self.view.root
+        if self.autosave:
+            if self.autosave_after_id is not None:
+                root.after_cancel(self.autosave_after_id)
+            self.autosave_after_id = root.after(
+                self.config_manager.get('auto_save_delay', 500),
+                self.autosave_snapshot
+            )
+        if self.view.hot_reload_var.get():
+            if self.hot_reload_after_id is not None:
+                root.after_cancel(self.hot_reload_after_id)
+            self.hot_reload_after_id = root.after(
+                self.config_manager.get('hot_reload_delay', 800),
+                self.hot_reload
+            )
+        self.schedule_diagnostics()
+
+    def schedule_diagnostics(self):
+        if not self.config_manager.get('diagnostics', True):
+            return
+        root = self.view.root
+        self.diagnostics_version += 1
+        if self.diagnostics_after_id is not None:
+            root.after_cancel(self.diagnostics_after_id)
+        self.diagnostics_after_id = root.after(
+            self.config_manager.get('diagnostics_delay', 400),
+            self.run_diagnostics
+        )
+
+    def run_diagnostics(self):
+        """Envía el código al hilo de diagnósticos y espera su resultado"""
+        self.diagnostics_after_id = None
+        code = self.view.code_editor.get('1.0', 'end-1c')
+        self.diagnostics_service.submit(code, self.diagnostics_version)
+        if not self.polling_diagnostics:
+            self.polling_diagnostics = True
+            self.poll_diagnostics()
+
+    def poll_diagnostics(self):
+        result = self.diagnostics_service.poll()
+        # Si el código cambió desde que se envió, ya hay otro análisis programado
+        if result is not None and result[0] == self.diagnostics_version:
+            self.show_diagnostics(result[1])
+        if self.diagnostics_service.busy:
+            self.view.root.after(50, self.poll_diagnostics)
+        else:
+            self.polling_diagnostics = False
+
+    def show_diagnostics(self, diagnostics):
+        """Subraya los problemas en el editor y los resume en la barra de estado"""
+        editor = self.view.code_editor
+        self.diagnostics = diagnostics
+        for severity in ('error', 'warning'):
+            editor.tag_remove(f'diag_{severity}', '1.0', tk.END)
+        for diagnostic in diagnostics:
+            if diagnostic['line'] is not None:
+                editor.tag_add(
+                    f"diag_{diagnostic['severity']}",
+                    f"{diagnostic['line']}.{diagnostic['col']}",
+                    f"{diagnostic['end_line']}.{diagnostic['end_col']}"
+                )
+        self.show_diagnostics_summary()
+
+    def show_diagnostics_summary(self):
+        diagnostics = self.diagnostics
+        if not diagnostics:
+            self.view.diagnostics_status.configure(text="✔ Sin problemas")
+            return
+        errors = sum(1 for diagnostic in diagnostics if diagnostic['severity'] == 'error')
+        warnings = len(diagnostics) - errors
+        first = next((diagnostic for diagnostic in diagnostics if diagnostic['severity'] == 'error'), diagnostics[0])
+        where = f"línea {first['line']}: " if first['line'] is not None else ""
+        self.view.diagnostics_status.configure(
+            text=f"❌ {errors} · ⚠ {warnings} — {where}{first['message']}"
+        )
+
+    def show_diagnostic_at(self, event):
+        """Muestra en la barra de estado el diagnóstico bajo el ratón"""
+        line, col = map(int, self.view.code_editor.index(f'@{event.x},{event.y}').split('.'))
+        for diagnostic in self.diagnostics:
+            if diagnostic['line'] is None:
+                continue
+            if (diagnostic['line'], diagnostic['col']) <= (line, col) < (diagnostic['end_line'], diagnostic['end_col']):
+                icon = "❌" if diagnostic['severity'] == 'error' else "⚠"
+                self.view.diagnostics_status.configure(
+                    text=f"{icon} línea {diagnostic['line']}: {diagnostic['message']}"
+                )
+                return
+
+    def save_and_reload(self, event=None):
+        """Ctrl+S: guarda el contenido en el diario y, en modo en vivo, recarga"""
+        if self.autosave:
+            if self.autosave_after_id is not None:
+                self.view.root.after_cancel(self.autosave_after_id)
+            self.autosave_snapshot()
+        if self.view.hot_reload_var.get():
+            self.hot_reload()
+        return 'break'
+
+    def toggle_hot_reload(self):
+        enabled = self.view.hot_reload_var.get()
+        self.config_manager.set('hot_reload', enabled)
+        if enabled:
+            self.hot_reload()
+        elif self.hot_reload_after_id is not None:
+            self.view.root.after_cancel(self.hot_reload_after_id)
+            self.hot_reload_after_id = None
+
+    def autosave_snapshot(self):
+        self.autosave_after_id = None
+        self.autosave.submit(self.view.code_editor.get('1.0', 'end-1c'))
 
     def clear_output(self):
         """Limpia el área de salida"""
-        self.view.output_area.delete('1.0', tk.END)
+        self.output.clear()
     
     def clear_code(self):
         """Limpia el editor de código"""
         self.view.code_editor.delete('1.0', tk.END)
 
     def run_code(self):
-        """Ejecuta el código del editor"""
+        """
+        Ejecuta el código del editor en un proceso aparte, de modo que el IDE
+        sigue respondiendo mientras se construye la ventana. Con
+        run_in_process activado en la configuración se ejecuta en el IDE.
+        """
+        if self.config_manager.get('run_in_process', False):
+            self.run_code_in_process()
+        else:
+            self.run_code_isolated()
+
+    def run_code_in_process(self, profiler=None):
+        """
+        Ejecuta el código del editor en el hilo de Tk del IDE, que se bloquea
+        mientras dura. Lo necesitan el perfilador, la recarga en caliente y el
+        inspector de widgets, que trabajan sobre la ventana de prueba local.
+
+        Returns:
+            bool: True si la ventana de prueba se construyó sin errores.
+        """
         self.clear_output()
         
         try:
             code = self.view.code_editor.get('1.0', tk.END)
             
-            self.check_create_window(code)
+            compiled = self.compile_code(code)
             
             if self.test_window is not None and self.test_window.winfo_exists():
                 self.test_window.destroy()
             
             self.test_window = tk.Toplevel(self.view.root)
             self.test_window.title("Ventana de Prueba")
+            self.hot_reload_key = None
             
-            old_stdout = sys.stdout
-            redirected_output = StringIO()
-            sys.stdout = redirected_output
-            
-            namespace = {}
-            exec(code, namespace)
-            
-            namespace['create_window'](self.test_window)
-            
-            sys.stdout = old_stdout
-            output = redirected_output.getvalue()
-            if output:
-                self.view.output_area.insert(tk.END, "📝 Salida:\n" + output + "\n")
+            self.build_test_window(compiled, profiler)
                 
-            self.view.output_area.insert(tk.END, "✅ Código ejecutado correctamente\n", "success")
-            self.view.output_area.tag_configure("success", foreground="green")
+            self.output.write("✅ Código ejecutado correctamente\n", "success")
+            return True
                 
         except Exception as e:
-            error_type = type(e).__name__
-            error_msg = str(e)
-            
-            self.view.output_area.insert(tk.END, f"❌ Error: {error_type}\n", "error_title")
-            self.view.output_area.insert(tk.END, f"📌 {error_msg}\n\n", "error_msg")
-            
-            tb = traceback.extract_tb(sys.exc_info()[2])
-            for filename, line, func, text in tb:
-                if 'create_window' in func:
-                    self.view.output_area.insert(tk.END, f"📍 Línea {line}: {text}\n", "error_trace")
-            
-            self.view.output_area.tag_configure("error_title", foreground="red")
-            self.view.output_area.tag_configure("error_msg", foreground="dark red")
-            self.view.output_area.tag_configure("error_trace", foreground="gray")
+            self.show_exception(e)
             
             if self.test_window is not None and self.test_window.winfo_exists():
                 self.test_window.destroy()
+            return False
+
+    def run_code_profiled(self):
+        """Ejecuta el código con cProfile y tracemalloc y muestra el informe"""
+        from .run_profiler import RunProfiler
+        from views.profile_panel import ProfilePanel
+        profiler = RunProfiler()
+        if not self.run_code_in_process(profiler) and profiler.snapshot is None:
+            return
+
+        dialog = tk.Toplevel(self.view.root)
+        dialog.title("Perfil de Ejecución")
+        dialog.geometry("760x520")
+        panel = ProfilePanel(
+            dialog,
+            on_export_stats=lambda: self.export_profile(dialog, profiler.dump_stats, ".pstats", "Perfil de cProfile"),
+            on_export_snapshot=lambda: self.export_profile(dialog, profiler.dump_snapshot, ".snapshot", "Instantánea de tracemalloc")
+        )
+        panel.pack(fill=tk.BOTH, expand=True)
+        panel.show(profiler.report())
+
+    def export_profile(self, parent, dump, extension, description):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=parent,
+            title="Exportar perfil",
+            defaultextension=extension,
+            filetypes=[(description, f"*{extension}"), ("Todos los archivos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            dump(path)
+        except OSError as e:
+            tk.messagebox.showerror("Error", str(e), parent=parent)
+            return
+        self.output.write(f"💾 Perfil guardado en {os.path.basename(path)}\n", "info")
+
+    def build_test_window(self, compiled, profiler=None):
+        """
+        Ejecuta el código compilado y construye la interfaz en la ventana de
+        prueba, cronometrando la creación de cada widget y el layout para
+        el inspector.
+
+        Args:
+            profiler (RunProfiler, optional): Perfilador que envuelve el exec
+                y la llamada a create_window.
+        """
+        from .widget_inspector import ConstructorTimer
+        from contextlib import nullcontext
+        import time
+        old_stdout, old_stderr = sys.stdout, sys.stderr
+        sys.stdout = self.output.stream()
+        sys.stderr = self.output.stream("stderr")
+        self.build_timings = None
+        try:
+            with profiler or nullcontext():
+                namespace = {}
+                exec(compiled, namespace)
+                
+                with ConstructorTimer() as timer:
+                    namespace['create_window'](self.test_window)
+        finally:
+            sys.stdout, sys.stderr = old_stdout, old_stderr
+        start = time.perf_counter()
+        self.test_window.update_idletasks()
+        self.build_timings = (timer.times, time.perf_counter() - start)
+        self.start_loop_monitor()
+
+    def start_loop_monitor(self):
+        """
+        Empieza (o reinicia) a medir la latencia del bucle de eventos que
+        comparten el IDE y la ventana de prueba.
+        """
+        from .loop_monitor import LoopMonitor
+        if self.loop_monitor is None:
+            self.loop_monitor = LoopMonitor(
+                self.view.root,
+                interval_ms=self.config_manager.get('loop_monitor_interval_ms', 10),
+                stall_ms=self.config_manager.get('loop_stall_ms', 100),
+                on_stall=self.report_stall,
+                sample_stacks=self.view.stack_sample_var.get()
+            )
+        self.loop_monitor.reset()
+        self.last_stall_report = 0.0
+        if not self.loop_monitor.running:
+            self.loop_monitor.start()
+            self.refresh_loop_status()
+
+    def refresh_loop_status(self):
+        """Muestra la latencia en la barra de estado mientras exista la ventana de prueba"""
+        monitor = self.loop_monitor
+        if self.test_window is None or not self.test_window.winfo_exists():
+            monitor.stop()
+            self.view.loop_status.configure(text="")
+            return
+        stats = monitor.stats()
+        self.view.loop_status.configure(text=(
+            f"⏱ Bucle de eventos: p50 {stats['p50_ms']:.1f} ms · p99 {stats['p99_ms']:.1f} ms · "
+            f"máx {stats['max_ms']:.0f} ms · bloqueos {stats['stalls']}"
+        ))
+        self.view.root.after(500, self.refresh_loop_status)
+
+    def report_stall(self, stall):
+        """Avisa en la salida de un bloqueo del bucle, como mucho uno por segundo"""
+        import time
+        now = time.monotonic()
+        if now - self.last_stall_report < 1.0:
+            return
+        self.last_stall_report = now
+        self.output.write(f"🐢 El bucle de eventos estuvo bloqueado {stall['delay_ms']:.0f} ms\n", "error_title")
+        stack = stall['stack']
+        if stack is None:
+            return
+        user_frames = [frame for frame in stack if frame.filename.startswith('<editor-')]
+        for frame in user_frames or stack[-1:]:
+            self.output.write(f"📍 Línea {frame.lineno} ({frame.name}): {(frame.line or '').strip()}\n", "error_trace")
+
+    def toggle_stack_sampling(self):
+        if self.loop_monitor is not None:
+            self.loop_monitor.sample_stacks = self.view.stack_sample_var.get()
+
+    def inspect_test_window(self):
+        """Abre el inspector con el árbol de widgets de la ventana de prueba"""
+        from .widget_inspector import inspect_tree
+        from views.inspector_panel import InspectorPanel
+        if self.test_window is None or not self.test_window.winfo_exists():
+            tk.messagebox.showwarning("Inspector", "Ejecuta el código en el IDE (⧉) para crear la ventana de prueba")
+            return
+        creation_times, layout_time = self.build_timings or ({}, None)
+        report = inspect_tree(self.test_window, creation_times, layout_time)
+
+        dialog = tk.Toplevel(self.view.root)
+        dialog.title("Inspector de Widgets")
+        dialog.geometry("640x520")
+        panel = InspectorPanel(dialog)
+        panel.pack(fill=tk.BOTH, expand=True)
+        panel.show(report)
+
+    def show_exception(self, e):
+        """Muestra una excepción del código de prueba con las líneas de create_window"""
+        import traceback
+        tb = traceback.extract_tb(e.__traceback__)
+        trace = [(line, text) for filename, line, func, text in tb if 'create_window' in func]
+        if isinstance(e, SyntaxError) and e.lineno:
+            trace.append((e.lineno, (e.text or '').strip()))
+        self.show_error(type(e).__name__, str(e), trace)
+
+    def hot_reload(self):
+        """
+        Reconstruye la ventana de prueba en el sitio: conserva el Toplevel,
+        su geometría y el desplazamiento de sus widgets, y no hace nada si el
+        código no ha cambiado desde la última recarga.
+        """
+        from .hot_reload import capture_state, reset_window, restore_state
+        import time
+        self.hot_reload_after_id = None
+        code = self.view.code_editor.get('1.0', tk.END)
+        key = self.code_cache.key(code)
+        window = self.test_window
+        reuse = window is not None and window.winfo_exists()
+        if reuse and key == self.hot_reload_key:
+            return
+
+        start = time.perf_counter()
+        try:
+            compiled, _ = self.code_cache.compile(code)
+        except SyntaxError as e:
+            self.output.write(f"⚠ Recarga pendiente: {e.msg} (línea {e.lineno})\n", "info")
+            return
+
+        self.clear_output()
+        if reuse:
+            state = capture_state(window)
+            reset_window(window, "Ventana de Prueba")
+        else:
+            state = None
+            self.test_window = window = tk.Toplevel(self.view.root)
+            window.title("Ventana de Prueba")
+        self.hot_reload_key = key
 
-    def check_create_window(self, code):
-        """Verifica si el código contiene la función create_window correctamente definida"""
-        if 'create_window' not in code:
-            raise SyntaxError("El código debe contener una función llamada 'create_window'")
+        try:
+            self.build_test_window(compiled)
+        except Exception as e:
+            self.show_exception(e)
+            return
+        if state is not None:
+            restore_state(window, state)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.output.write(f"🔁 Ventana recargada en {elapsed:.1f} ms\n", "success")
+
+    def show_error(self, error_type, error_msg, trace=()):
+        """Muestra un error en el área de salida"""
+        self.output.write(f"❌ Error: {error_type}\n", "error_title")
+        self.output.write(f"📌 {error_msg}\n\n", "error_msg")
+        
+        for line, text in trace:
+            self.output.write(f"📍 Línea {line}: {text}\n", "error_trace")
+
+    def run_code_isolated(self):
+        """Ejecuta el código del editor en un proceso separado del IDE"""
+        self.clear_output()
+        code = self.view.code_editor.get('1.0', tk.END)
+        
+        try:
+            self.compile_code(code)
+        except SyntaxError as e:
+            self.show_error(type(e).__name__, str(e), [(e.lineno, (e.text or '').strip())] if e.lineno else ())
+            return
+        
+        self.execution_engine.run(code)
+        self.output.write("⏳ Ejecutando en proceso aislado...\n", "info")
+        self.view.stop_button.configure(state=tk.NORMAL)
+        if not self.polling_execution:
+            self.polling_execution = True
+            self.poll_execution()
+
+    def poll_execution(self):
+        """Vuelca en la salida los eventos del proceso aislado"""
+        output = self.output
+        for event in self.execution_engine.poll():
+            kind = event['type']
+            if kind == 'stdout':
+                output.write(event['data'])
+            elif kind == 'stderr':
+                output.write(event['data'], "stderr")
+            elif kind == 'done':
+                output.write(f"✅ Código ejecutado correctamente ({event['elapsed'] * 1000:.0f} ms)\n", "success")
+            elif kind in ('error', 'fatal'):
+                self.show_error(event['error_type'], event['message'], event.get('trace', ()))
+            elif kind == 'timeout':
+                self.show_error("Timeout", f"La ejecución superó {event['elapsed']:g} s y se detuvo el proceso")
+            elif kind == 'cancelled':
+                output.write("⛔ Ejecución cancelada\n", "error_title")
+            elif kind == 'killed':
+                output.write("⛔ Proceso detenido\n", "error_title")
+            elif kind == 'exit' and event.get('run_id') is not None:
+                self.show_error("WorkerExit", f"El proceso terminó con código {event['returncode']}")
         
-        pattern = r'def\s+create_window\s*\(\s*(\w+)\s*\)'
-        match = re.search(pattern, code)
-        if not match:
-            raise SyntaxError("La función create_window debe tener un parámetro (normalmente llamado 'root')")
+        engine = self.execution_engine
+        if engine.running:
+            self.view.root.after(30, self.poll_execution)
+        elif engine.has_worker() and not self.execution_wakeups:
+            # Sin createfilehandler, la ventana de prueba abierta se sondea despacio
+            self.view.root.after(250, self.poll_execution)
+        else:
+            self.polling_execution = False
+        if not engine.has_worker():
+            self.view.stop_button.configure(state=tk.DISABLED)
+
+    def on_execution_wake(self, fd, mask):
+        """Recoge los mensajes que llegan del proceso aislado entre ejecuciones"""
+        if not self.polling_execution:
+            self.poll_execution()
+
+    def stop_execution(self):
+        """
+        Cancela la ejecución aislada en curso. Si no hay ejecución en curso o
+        ya se pidió cancelarla, mata el proceso y su ventana de prueba.
+        """
+        engine = self.execution_engine
+        if engine.running and engine.cancel_deadline is None:
+            engine.cancel()
+            return
+        engine.kill()
+        self.output.write("⛔ Proceso detenido\n", "error_title")
+        self.view.stop_button.configure(state=tk.DISABLED)
+
+    def compile_code(self, code):
+        """
+        Valida y compila el código del editor usando la caché de compilación.
+
+        Raises:
+            SyntaxError: Si el código no compila o create_window no es válida.
+        """
+        compiled, origin = self.code_cache.compile(code)
+        status = f"acierto ({origin})" if origin else "fallo"
+        self.output.write(
+            f"⚡ Caché de compilación: {status} · "
+            f"{self.code_cache.hits} aciertos / {self.code_cache.misses} fallos\n",
+            "info"
+        )
+        return compiled
 
     def save_template(self):
         """Guarda el código actual como una plantilla"""
@@ -165,42 +665,273 @@ def create_window(root):
         """Carga una plantilla existente"""
         dialog = tk.Toplevel(self.view.root)
         dialog.title("Cargar Plantilla")
-        dialog.geometry("500x400")
+        dialog.geometry("700x500")
+        
+        search_var = tk.StringVar()
+        search_frame = ttk.Frame(dialog)
+        search_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        ttk.Label(search_frame, text="Buscar:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(search_frame, textvariable=search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.focus_set()
+        
+        filter_frame = ttk.Frame(dialog)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=5)
+        category_var = tk.StringVar()
+        tags_var = tk.StringVar()
+        match_var = tk.StringVar(value='all')
+        ttk.Label(filter_frame, text="Categoría:").pack(side=tk.LEFT)
+        category_box = ttk.Combobox(filter_frame, textvariable=category_var, state='readonly', width=18)
+        category_box.pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Tags:").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=tags_var, width=24).pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(filter_frame, text="Todos", variable=match_var, value='all').pack(side=tk.LEFT)
+        ttk.Radiobutton(filter_frame, text="Alguno", variable=match_var, value='any').pack(side=tk.LEFT)
+        
+        def refresh_categories():
+            categories = [category for category in self.template_manager.get_all_categories() if category]
+            category_box.configure(values=[''] + categories)
+            if category_var.get() not in categories:
+                category_var.set('')
+        
+        from views.template_dialogs import LazyTreeview
+        columns = ('name', 'category', 'updated_at', 'match')
+        browser = LazyTreeview(
+            dialog,
+            columns,
+            ('Nombre', 'Categoría', 'Última actualización', 'Coincidencia'),
+            selectmode='extended'
+        )
+        tree = browser.tree
+        
+        preview = scrolledtext.ScrolledText(dialog, height=8, font=('Consolas', 9))
+        
+        def filtered_ids():
+            tags = [tag.strip() for tag in tags_var.get().split(',') if tag.strip()]
+            category = category_var.get() or None
+            if not tags and category is None:
+                return None
+            return self.template_manager.find_template_ids(tags, match_var.get(), category)
+        
+        def fetch_listing(ids):
+            def fetch(cursor, limit):
+                rows = self.template_manager.list_templates_page(after=cursor, limit=limit, ids=ids)
+                items = [(row[0], (row[1], row[2], row[3], '')) for row in rows]
+                next_cursor = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+                return items, next_cursor
+            return fetch
         
-        columns = ('name', 'category', 'updated_at')
-        tree = ttk.Treeview(dialog, columns=columns, show='headings')
+        def fetch_search(query, ids):
+            def fetch(cursor, limit):
+                offset = cursor or 0
+                results = self.template_manager.search(query, limit=limit, offset=offset, ids=ids)
+                items = [
+                    (result[0], (result[1], result[2], result[3], ' '.join(result[4].split())))
+                    for result in results
+                ]
+                next_cursor = offset + limit if len(results) == limit else None
+                return items, next_cursor
+            return fetch
         
-        tree.heading('name', text='Nombre')
-        tree.heading('category', text='Categoría')
-        tree.heading('updated_at', text='Última actualización')
+        def populate():
+            pending_search[0] = None
+            query = search_var.get().strip()
+            ids = filtered_ids()
+            browser.load(fetch_search(query, ids) if query else fetch_listing(ids))
+            preview.delete('1.0', tk.END)
         
-        scrollbar = ttk.Scrollbar(dialog, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        pending_search = [None]
         
-        templates = self.template_manager.get_all_templates()
-        for template in templates:
-            tree.insert('', tk.END, values=(template[1], template[4], template[6]))
+        def on_search_changed(*args):
+            if pending_search[0] is not None:
+                dialog.after_cancel(pending_search[0])
+            pending_search[0] = dialog.after(150, populate)
+        
+        def selected_ids():
+            return [int(iid) for iid in tree.selection()]
+        
+        def selected_code():
+            selection = selected_ids()
+            if len(selection) != 1:
+                return None
+            return self.template_manager.get_template_code(selection[0])
+        
+        def show_preview(event=None):
+            count = len(tree.selection())
+            code = selected_code()
+            preview.delete('1.0', tk.END)
+            if code is not None:
+                preview.insert('1.0', code)
+            elif count > 1:
+                preview.insert('1.0', f"{count} plantillas seleccionadas")
         
         def load_selected():
-            selection = tree.selection()
-            if not selection:
-                return
-            
-            item = tree.item(selection[0])
-            template_name = item['values'][0]
-            
-            templates = self.template_manager.get_all_templates()
-            template = next((t for t in templates if t[1] == template_name), None)
-            
-            if template:
+            code = selected_code()
+            if code is not None:
                 self.view.code_editor.delete('1.0', tk.END)
-                self.view.code_editor.insert('1.0', template[3])
+                self.view.code_editor.insert('1.0', code)
                 dialog.destroy()
         
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        def delete_selected():
+            ids = selected_ids()
+            if not ids or not messagebox.askyesno(
+                "Eliminar", f"¿Eliminar {len(ids)} plantillas y su historial?", parent=dialog
+            ):
+                return
+            self.template_manager.delete_templates(ids)
+            apply_changes()
         
-        ttk.Button(dialog, text="Cargar", command=load_selected).pack(pady=10)
+        def retag_selected():
+            ids = selected_ids()
+            if not ids:
+                return
+            retag_dialog = tk.Toplevel(dialog)
+            retag_dialog.title("Editar tags")
+            retag_dialog.transient(dialog)
+            entries = {}
+            for key, label in (('add', "Añadir (separados por coma):"), ('remove', "Quitar (separados por coma):")):
+                ttk.Label(retag_dialog, text=label).pack(padx=10, pady=(5, 0), anchor=tk.W)
+                entries[key] = ttk.Entry(retag_dialog, width=40)
+                entries[key].pack(padx=10, pady=5)
+        
+            def apply():
+                tags = {
+                    key: [tag.strip() for tag in entry.get().split(',') if tag.strip()]
+                    for key, entry in entries.items()
+                }
+                retag_dialog.destroy()
+                self.template_manager.retag(ids, **tags)
+                apply_changes()
+        
+            ttk.Button(retag_dialog, text=f"Aplicar a {len(ids)} plantillas", command=apply).pack(pady=10)
+        
+        def recategorize_selected():
+            from tkinter import simpledialog
+            ids = selected_ids()
+            if not ids:
+                return
+            category = simpledialog.askstring(
+                "Cambiar categoría", f"Nueva categoría para {len(ids)} plantillas:", parent=dialog
+            )
+            if category:
+                self.template_manager.recategorize(ids, category.strip())
+                apply_changes()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(side=tk.BOTTOM, pady=10)
+        ttk.Button(button_frame, text="Cargar", command=load_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Tags...", command=retag_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Categoría...", command=recategorize_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Eliminar", command=delete_selected).pack(side=tk.LEFT, padx=5)
+        preview.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+        browser.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5)
+        
+        # Los avisos pueden llegar desde otro hilo (importaciones en segundo
+        # plano); se acumulan aquí y se aplican desde apply_changes()
+        changes = []
+        
+        def apply_changes():
+            events = changes[:]
+            del changes[:len(events)]
+            if any(event['reload'] or event['categories_added'] or event['categories_removed'] for event in events):
+                refresh_categories()
+            if any(event['reload'] or event['templates'] for event in events):
+                populate()
+        
+        def poll_changes():
+            self.template_manager.check_for_changes()
+            apply_changes()
+            poll_id[0] = dialog.after(500, poll_changes)
+        
+        def on_destroy(event):
+            if event.widget is dialog:
+                dialog.after_cancel(poll_id[0])
+                self.template_manager.unsubscribe(subscriber)
+        
+        tree.bind('<<TreeviewSelect>>', show_preview)
+        tree.bind('<Double-1>', lambda event: load_selected())
+        search_var.trace_add('write', on_search_changed)
+        for variable in (category_var, tags_var, match_var):
+            variable.trace_add('write', on_search_changed)
+        dialog.bind('<Destroy>', on_destroy)
+        subscriber = self.template_manager.subscribe(changes.append)
+        refresh_categories()
+        populate()
+        poll_id = [dialog.after(500, poll_changes)]
+
+    def export_templates(self):
+        """Exporta todas las plantillas a un archivo JSON Lines en segundo plano"""
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self.view.root,
+            title="Exportar plantillas",
+            defaultextension=".jsonl.gz",
+            filetypes=ARCHIVE_FILETYPES
+        )
+        if not path:
+            return
+
+        def export():
+            count = self.template_manager.export_templates(path)
+            return f"✅ {count} plantillas exportadas a {os.path.basename(path)}\n"
+
+        self.run_in_background("⏳ Exportando plantillas...\n", export)
+
+    def import_templates(self):
+        """Importa plantillas de un archivo JSON Lines en segundo plano"""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(
+            parent=self.view.root,
+            title="Importar plantillas",
+            filetypes=ARCHIVE_FILETYPES
+        )
+        if not path:
+            return
+
+        dialog = tk.Toplevel(self.view.root)
+        dialog.title("Importar Plantillas")
+        dialog.transient(self.view.root)
+
+        ttk.Label(dialog, text="Si ya existe una plantilla con el mismo nombre:").pack(padx=10, pady=5, anchor=tk.W)
+        policy = tk.StringVar(value='skip')
+        for value, label in (
+            ('skip', "Omitir la plantilla importada"),
+            ('upsert', "Sobrescribir la plantilla existente"),
+            ('rename', "Importarla con otro nombre")
+        ):
+            ttk.Radiobutton(dialog, text=label, variable=policy, value=value).pack(padx=20, anchor=tk.W)
+
+        def start():
+            on_conflict = policy.get()
+            dialog.destroy()
+
+            def load():
+                stats = self.template_manager.import_templates(path, on_conflict=on_conflict)
+                return (
+                    f"✅ Importación completada: {stats['added']} nuevas, {stats['updated']} actualizadas, "
+                    f"{stats['renamed']} renombradas, {stats['skipped']} omitidas\n"
+                )
+
+            self.run_in_background(f"⏳ Importando {os.path.basename(path)}...\n", load)
+
+        ttk.Button(dialog, text="Importar", command=start).pack(pady=10)
+
+    def run_in_background(self, message, task):
+        """Ejecuta task en un hilo y escribe en la salida el mensaje que devuelve"""
+        import threading
+        import time
+        self.output.write(message, "info")
+
+        def worker():
+            start = time.perf_counter()
+            try:
+                result = task()
+            except Exception as e:
+                self.output.write(f"❌ {type(e).__name__}: {e}\n", "error_title")
+                return
+            self.output.write(result.rstrip('\n') + f" ({time.perf_counter() - start:.1f} s)\n", "success")
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def toggle_theme(self):
         """Alterna entre tema claro y oscuro"""
@@ -208,6 +939,9 @@ def create_window(root):
         is_dark_mode = current_theme != 'dark'
         self.config_manager.set('theme', 'dark' if is_dark_mode else 'light')
         self.view.apply_theme(is_dark_mode)
+        # Los widgets clásicos que cree el código después ya usarán el tema nuevo
+        if self.test_window is not None and self.test_window.winfo_exists():
+            self.view.style_manager.style_widget(self.test_window)
 
     def on_closing(self):
         """Manejador para cuando se cierra la aplicación"""
@@ -215,6 +949,22 @@ def create_window(root):
         match = re.match(r'(\d+)x(\d+)\+(-?\d+)\+(-?\d+)', geometry)
         if match:
             width, height, x, y = map(int, match.groups())
-            self.config_manager.set('window_size', {'width': width, 'height': height})
-            self.config_manager.set('last_position', {'x': x, 'y': y})
+            with self.config_manager.transaction():
+                self.config_manager.set('window_size', {'width': width, 'height': height})
+                self.config_manager.set('last_position', {'x': x, 'y': y})
+        self.config_manager.close()
+        if self.autosave:
+            if self.autosave_after_id is not None:
+                self.view.root.after_cancel(self.autosave_after_id)
+            self.autosave_snapshot()
+            self.autosave.close()
+        if self.loop_monitor is not None:
+            self.loop_monitor.stop()
+        if self._diagnostics_service is not None:
+            self._diagnostics_service.close()
+        self.template_manager.close()
+        if self._execution_engine is not None:
+            if self.execution_wakeups:
+                self.view.root.tk.deletefilehandler(self._execution_engine.wake_fd())
+            self._execution_engine.shutdown()
         self.view.root.destroy()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import cProfile
+import linecache
+import os
+import pstats
+import tracemalloc
+
+USER_CODE_PREFIX = '<editor-'
+
+def is_user_code(filename):
+    """Indica si filename es código del editor compilado por CodeCache"""
+    return filename.startswith(USER_CODE_PREFIX)
+
+def _location(filename, line):
+    if is_user_code(filename):
+        return f"línea {line}"
+    if filename == '~':
+        return 'built-in'
+    parent, name = os.path.split(filename)
+    return f"{os.path.basename(parent)}/{name}:{line}"
+
+class RunProfiler:
+    """
+    Perfila con cProfile y tracemalloc lo que se ejecuta mientras está activo.
+
+    Los informes se reducen al código del editor: sus funciones, las
+    llamadas que hace directamente a otras funciones (con el tiempo de esas
+    llamadas) y las líneas en las que se reserva memoria.
+
+    Args:
+        frames (int): Marcos guardados por cada bloque de tracemalloc; deben
+            bastar para llegar desde tkinter hasta la línea del usuario.
+    """
+
+    def __init__(self, frames=25):
+        self.frames = frames
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.peak_memory = 0
+        self._started_tracing = False
+
+    def __enter__(self):
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(self.frames)
+        elif hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def functions(self, limit=50):
+        """
+        Funciones del código del editor y llamadas que hace a otras.
+
+        Returns:
+            list: Diccionarios con function, location, source, user (si la
+                función es del editor), calls, own_ms y cumulative_ms,
+                ordenados por tiempo acumulado.
+        """
+        rows = []
+        for (filename, line, name), (cc, nc, tt, ct, callers) in pstats.Stats(self.profile).stats.items():
+            if is_user_code(filename):
+                calls, own, cumulative = nc, tt, ct
+            else:
+                # Sólo el tiempo de las llamadas hechas desde el editor
+                from_user = [value for caller, value in callers.items() if is_user_code(caller[0])]
+                if not from_user:
+                    continue
+                calls = sum(value[0] for value in from_user)
+                own = sum(value[2] for value in from_user)
+                cumulative = sum(value[3] for value in from_user)
+            rows.append({
+                'function': name,
+                'location': _location(filename, line),
+                'source': linecache.getline(filename, line).strip() if is_user_code(filename) else '',
+                'user': is_user_code(filename),
+                'calls': calls,
+                'own_ms': own * 1000,
+                'cumulative_ms': cumulative * 1000
+            })
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return rows[:limit]
+
+    def allocations(self, limit=50):
+        """
+        Líneas del editor en las que se reservó la memoria que sigue viva,
+        atribuyendo cada bloque a la línea del editor más interna de su pila.
+
+        Returns:
+            list: Diccionarios con line, source, size_kb y blocks, ordenados
+                por tamaño.
+        """
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces([tracemalloc.Filter(True, f'{USER_CODE_PREFIX}*', all_frames=True)])
+        sites = {}
+        for stat in snapshot.statistics('traceback'):
+            frame = next((frame for frame in reversed(stat.traceback) if is_user_code(frame.filename)), None)
+            if frame is None or frame.lineno < 1:
+                continue
+            site = sites.setdefault((frame.filename, frame.lineno), [0, 0])
+            site[0] += stat.size
+            site[1] += stat.count
+        rows = [
+            {
+                'line': line,
+                'source': linecache.getline(filename, line).strip(),
+                'size_kb': size / 1024,
+                'blocks': blocks
+            }
+            for (filename, line), (size, blocks) in sites.items()
+        ]
+        rows.sort(key=lambda row: row['size_kb'], reverse=True)
+        return rows[:limit]
+
+    def report(self, limit=50):
+        """
+        Returns:
+            dict: 'functions' y 'allocations' (ver sus métodos),
+                'total_ms' (tiempo perfilado), 'peak_kb' (pico de memoria) y
+                'user_kb' (memoria viva reservada desde el editor).
+        """
+        allocations = self.allocations(limit=None)
+        return {
+            'functions': self.functions(limit),
+            'allocations': allocations[:limit],
+            'total_ms': pstats.Stats(self.profile).total_tt * 1000,
+            'peak_kb': self.peak_memory / 1024,
+            'user_kb': sum(row['size_kb'] for row in allocations)
+        }
+
+    def dump_stats(self, path):
+        """Guarda el perfil completo, sin filtrar, para abrirlo con pstats o snakeviz"""
+        self.profile.dump_stats(path)
+
+    def dump_snapshot(self, path):
+        """Guarda la instantánea completa de tracemalloc (tracemalloc.Snapshot.load)"""
+        self.snapshot.dump(path)
@@ -0,0 +1,99 @@
+import time
+import tkinter as tk
+from collections import Counter
+
+class ConstructorTimer:
+    """
+    Cronometra la creación de cada widget mientras está activo.
+
+    Sustituye temporalmente tkinter.BaseWidget.__init__, por el que pasan
+    todos los widgets de tkinter y ttk, y guarda el tiempo de cada uno por
+    su ruta de Tk.
+    """
+
+    def __init__(self):
+        self.times = {}
+        self._original = None
+
+    def __enter__(self):
+        original = self._original = tk.BaseWidget.__init__
+        times = self.times
+
+        def timed_init(widget, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                original(widget, *args, **kwargs)
+            finally:
+                path = getattr(widget, '_w', None)
+                if path:
+                    times[path] = time.perf_counter() - start
+
+        tk.BaseWidget.__init__ = timed_init
+        return self
+
+    def __exit__(self, *exc_info):
+        tk.BaseWidget.__init__ = self._original
+        return False
+
+def inspect_tree(window, creation_times=None, layout_time=None):
+    """
+    Recorre los descendientes de window y resume el árbol de widgets.
+
+    Args:
+        window (tk.Misc): Raíz del árbol (la ventana de prueba).
+        creation_times (dict, optional): Segundos de creación por ruta de
+            widget, de ConstructorTimer.
+        layout_time (float, optional): Segundos de update_idletasks().
+
+    Returns:
+        dict: 'total', 'by_class', 'by_depth' y 'managers' (contadores),
+            'max_depth', 'creation_ms', 'layout_ms' y 'nodes', que asocia la
+            ruta de cada widget con su clase, gestor de geometría, padre,
+            profundidad, número de hijos, tamaño del subárbol y milisegundos
+            de creación propios (own_ms) y del subárbol (subtree_ms).
+    """
+    creation_times = creation_times or {}
+    root_path = str(window)
+    nodes = {}
+    order = []
+    stack = [(child, root_path, 1) for child in reversed(window.winfo_children())]
+    while stack:
+        widget, parent, depth = stack.pop()
+        path = str(widget)
+        children = widget.winfo_children()
+        try:
+            manager = widget.winfo_manager()
+        except tk.TclError:
+            manager = ''
+        own_ms = creation_times.get(path, 0.0) * 1000
+        nodes[path] = {
+            'class': widget.winfo_class(),
+            'manager': manager or 'ninguno',
+            'parent': parent,
+            'depth': depth,
+            'children': len(children),
+            'subtree_count': 1,
+            'own_ms': own_ms,
+            'subtree_ms': own_ms
+        }
+        order.append(path)
+        stack.extend((child, path, depth + 1) for child in reversed(children))
+
+    for path in reversed(order):
+        node = nodes[path]
+        parent = nodes.get(node['parent'])
+        if parent is not None:
+            parent['subtree_count'] += node['subtree_count']
+            parent['subtree_ms'] += node['subtree_ms']
+
+    by_depth = Counter(node['depth'] for node in nodes.values())
+    return {
+        'total': len(nodes),
+        'by_class': Counter(node['class'] for node in nodes.values()),
+        'by_depth': by_depth,
+        'managers': Counter(node['manager'] for node in nodes.values()),
+        'max_depth': max(by_depth, default=0),
+        'creation_ms': sum(node['own_ms'] for node in nodes.values()),
+        'layout_ms': layout_time * 1000 if layout_time is not None else None,
+        'nodes': nodes
+    }
@@ -1,46 +1,198 @@
-import tkinter as tk
+import argparse
 import sys
 import os
-from models import ConfigManager, TemplateManager, DATA_DIR
-from views import MainWindow, get_style_config
-from controllers import MainController, DEFAULT_CODE
+from startup_profiler import StartupProfiler
 
 def setup_environment():
     """Configura el entorno de la aplicación"""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    
+    from models import initialize_data_directory
+    data_dir = initialize_data_directory()
+
     import logging
     logging.basicConfig(
-        filename=os.path.join(DATA_DIR, 'app.log'),
+        filename=os.path.join(data_dir, 'app.log'),
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
-    
+
     def handle_exception(exc_type, exc_value, exc_traceback):
         logging.error("Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback))
-    
+
     sys.excepthook = handle_exception
+    return data_dir
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='TkinterLab')
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Muestra en stderr el tiempo de cada fase del arranque y de sus imports'
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    export_parser = commands.add_parser('export', help='Exporta las plantillas sin abrir la interfaz')
+    export_parser.add_argument('path', help='Archivo JSON Lines de destino (.gz o .zst para comprimir)')
+    export_parser.add_argument('--db', help='Base de datos de plantillas (por defecto, la del directorio de datos)')
+
+    import_parser = commands.add_parser('import', help='Importa plantillas sin abrir la interfaz')
+    import_parser.add_argument('path', help='Archivo JSON Lines de origen (.gz o .zst si está comprimido)')
+    import_parser.add_argument('--db', help='Base de datos de plantillas (por defecto, la del directorio de datos)')
+    import_parser.add_argument(
+        '--on-conflict',
+        choices=('skip', 'upsert', 'rename'),
+        default='skip',
+        help='Qué hacer con las plantillas cuyo nombre ya existe (por defecto, skip)'
+    )
+
+    storage_parser = commands.add_parser('storage', help='Muestra el espacio que ahorra la deduplicación del código')
+    storage_parser.add_argument('--db', help='Base de datos de plantillas (por defecto, la del directorio de datos)')
+    storage_parser.add_argument('--vacuum', action='store_true', help='Reconstruye el fichero para liberar el espacio')
+
+    run_parser = commands.add_parser('run-templates', help='Construye las plantillas sin interfaz y genera un informe')
+    run_parser.add_argument('--db', help='Base de datos de plantillas (por defecto, la del directorio de datos)')
+    run_parser.add_argument('--category', help='Sólo las plantillas de esta categoría')
+    run_parser.add_argument('--tag', help='Sólo las plantillas con este tag')
+    run_parser.add_argument('--name', help="Patrón de nombre estilo shell, p. ej. 'login*'")
+    run_parser.add_argument('--workers', type=int, help='Procesos en paralelo (por defecto, uno por núcleo)')
+    run_parser.add_argument('--timeout', type=float, default=10.0, help='Segundos máximos por plantilla (por defecto, 10)')
+    run_parser.add_argument('--format', choices=('json', 'junit'), default='json', help='Formato del informe')
+    run_parser.add_argument('--output', help='Archivo del informe (por defecto, la salida estándar)')
+    run_parser.add_argument('--xvfb', action='store_true', help='Arranca un servidor X virtual (requiere xvfbwrapper)')
+    return parser.parse_args(argv)
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def run_templates(args, template_manager):
+    """Construye las plantillas seleccionadas y escribe el informe; devuelve el código de salida"""
+    import time
+    from controllers.batch_runner import run_batch, select_templates, summarize, to_json, to_junit
+
+    display = None
+    if args.xvfb:
+        try:
+            from xvfbwrapper import Xvfb
+        except ImportError:
+            raise ValueError("--xvfb requiere el paquete 'xvfbwrapper'")
+        display = Xvfb()
+        display.start()
+
+    try:
+        start = time.perf_counter()
+        templates = select_templates(template_manager, args.category, args.tag, args.name)
+        results = sorted(
+            run_batch(templates, workers=args.workers, timeout=args.timeout),
+            key=lambda result: result['id']
+        )
+        summary = summarize(results, time.perf_counter() - start)
+    finally:
+        if display is not None:
+            display.stop()
 
-def main():
-    setup_environment()
-    
-    root = tk.Tk()
-    root.title("TkinterLab")
-    
+    for result in results:
+        if result['status'] != 'passed':
+            print(f"[{result['status']}] {result['name']}: {result['error_type']}: {result['message']}", file=sys.stderr)
+    print(
+        f"{summary['total']} plantillas en {summary['elapsed']:.1f} s: {summary['passed']} correctas, "
+        f"{summary['failed']} fallidas, {summary['errors']} errores",
+        file=sys.stderr
+    )
+
+    report = to_junit(results, summary) if args.format == 'junit' else to_json(results, summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    else:
+        print(report)
+    return 0 if summary['passed'] == summary['total'] else 1
+
+def run_command(args, data_dir):
+    """Ejecuta una orden de línea de comandos sin crear la ventana"""
+    import time
+    from models import TemplateManager
+    template_manager = TemplateManager(args.db or os.path.join(data_dir, 'templates.db'))
+    start = time.perf_counter()
     try:
-        config_manager = ConfigManager(os.path.join(DATA_DIR, 'config.json'))
-        template_manager = TemplateManager(os.path.join(DATA_DIR, 'templates.db'))
-        
-        view = MainWindow(root)
-        
-        controller = MainController(view, config_manager, template_manager)
-        
+        if args.command == 'storage':
+            report = template_manager.storage_report()
+            ratio = report['saved_bytes'] / report['code_bytes'] * 100 if report['code_bytes'] else 0
+            print(f"{report['templates']} plantillas, {report['blobs']} códigos distintos "
+                  f"({report['compressed_blobs']} comprimidos)")
+            print(f"Código sin deduplicar: {format_size(report['code_bytes'])}")
+            print(f"Código almacenado:     {format_size(report['stored_bytes'])}")
+            print(f"Ahorro:                {format_size(report['saved_bytes'])} ({ratio:.1f} %)")
+            print(f"Historial:             {report['revisions']} revisiones, {format_size(report['history_bytes'])}")
+            if args.vacuum:
+                before, after = template_manager.compact()
+                print(f"Fichero: {format_size(before)} -> {format_size(after)}")
+        elif args.command == 'run-templates':
+            return run_templates(args, template_manager)
+        elif args.command == 'export':
+            count = template_manager.export_templates(args.path)
+            print(f"{count} plantillas exportadas a {args.path} en {time.perf_counter() - start:.1f} s")
+        else:
+            stats = template_manager.import_templates(args.path, on_conflict=args.on_conflict)
+            print(
+                f"Importación completada en {time.perf_counter() - start:.1f} s: "
+                f"{stats['added']} nuevas, {stats['updated']} actualizadas, "
+                f"{stats['renamed']} renombradas, {stats['skipped']} omitidas"
+            )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        template_manager.close()
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command:
+        return run_command(args, setup_environment())
+
+    profiler = StartupProfiler(enabled=args.profile_startup)
+
+    with profiler.phase('entorno'):
+        data_dir = setup_environment()
+
+    with profiler.phase('tkinter'):
+        import tkinter as tk
+        root = tk.Tk()
+        root.title("TkinterLab")
+
+    try:
+        with profiler.phase('configuración'):
+            from models import ConfigManager
+            config_manager = ConfigManager(os.path.join(data_dir, 'config.json'))
+
+        with profiler.phase('plantillas'):
+            from models import TemplateManager
+            template_manager = TemplateManager(os.path.join(data_dir, 'templates.db'))
+
+        with profiler.phase('vista'):
+            from views import MainWindow
+            view = MainWindow(root)
+
+        with profiler.phase('controlador'):
+            from controllers import MainController
+            controller = MainController(view, config_manager, template_manager)
+
+        if profiler.enabled:
+            def first_frame():
+                with profiler.phase('primer dibujado'):
+                    root.update_idletasks()
+                profiler.report()
+            root.after_idle(first_frame)
+
         root.mainloop()
-        
+
     except Exception as e:
         import logging
         logging.error(f"Error al iniciar la aplicación: {e}")
         raise
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
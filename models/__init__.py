@@ -1,23 +1,37 @@
-from .config_manager import ConfigManager
-from .template_manager import TemplateManager
+import os
 
 __version__ = '1.0.0'
 __author__ = 'naut54'
 
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.tkinter_tester')
+
+_LAZY_ATTRIBUTES = {
+    'ConfigManager': 'config_manager',
+    'TemplateManager': 'template_manager',
+    'AutosaveJournal': 'autosave'
+}
+
+def __getattr__(name):
+    """Importa los gestores bajo demanda para no retrasar el arranque"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = __import__(f'{__name__}.{module_name}', fromlist=[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
 def initialize_data_directory():
     """Inicializa el directorio de datos si no existe"""
-    import os
-    data_dir = os.path.join(os.path.expanduser('~'), '.tkinter_tester')
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-    return data_dir
-
-DATA_DIR = initialize_data_directory()
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return DATA_DIR
 
 __all__ = [
     'ConfigManager',
     'TemplateManager',
+    'AutosaveJournal',
     'DATA_DIR',
+    'initialize_data_directory',
     '__version__',
     '__author__'
-]
\ No newline at end of file
+]
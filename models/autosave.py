@@ -0,0 +1,203 @@
+import json
+import os
+import queue
+import threading
+
+def diff_text(old, new):
+    """
+    Calcula el cambio mínimo contiguo entre dos textos.
+
+    Returns:
+        tuple: (start, end, replacement) tal que
+            old[:start] + replacement + old[end:] == new, o None si son iguales.
+    """
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = low
+
+    low, high = 0, limit - prefix
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:] == new[len(new) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    suffix = low
+
+    return prefix, len(old) - suffix, new[prefix:len(new) - suffix]
+
+class AutosaveJournal:
+    """
+    Diario de autoguardado del contenido del editor.
+
+    submit() sólo encola el texto; un hilo de fondo calcula la diferencia
+    con lo último guardado y la añade al diario como una línea JSON. Cada
+    compact_every cambios, o cuando el diario crece mucho respecto al
+    texto, se reescribe de forma atómica como una única instantánea.
+    restore() reconstruye el texto ignorando una última línea truncada.
+
+    Args:
+        path (str): Ruta del fichero de diario.
+        compact_every (int): Cambios tras los que se compacta el diario.
+        fsync (bool): Forzar la escritura a disco tras cada cambio.
+    """
+
+    def __init__(self, path, compact_every=200, fsync=False):
+        self.path = path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.text = None
+        self.edits = 0
+        self.size = 0
+        self.needs_compaction = False
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+
+    def restore(self):
+        """
+        Reconstruye el último texto guardado.
+
+        Returns:
+            str: Texto recuperado, o None si no hay diario válido.
+        """
+        text = None
+        edits = 0
+        truncated = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        truncated = True
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        truncated = True
+                        break
+                    if entry.get('op') == 'snapshot':
+                        text = entry['text']
+                        edits = 0
+                    elif entry.get('op') == 'edit' and text is not None:
+                        start, end = entry['start'], entry['end']
+                        if not 0 <= start <= end <= len(text):
+                            truncated = True
+                            break
+                        text = text[:start] + entry['text'] + text[end:]
+                        edits += 1
+            self.size = os.path.getsize(self.path)
+        except OSError:
+            return None
+        self.text = text
+        self.edits = edits
+        self.needs_compaction = truncated
+        return text
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+            self._thread.start()
+
+    def submit(self, text):
+        """Encola el contenido actual del editor para guardarlo"""
+        self._queue.put(('text', text))
+
+    def flush(self, timeout=5.0):
+        """Espera a que se guarde todo lo encolado"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Guarda lo pendiente, compacta el diario y detiene el hilo"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(('close', done))
+        done.wait(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            latest = None
+            for kind, value in items:
+                if kind == 'text':
+                    latest = value
+            if latest is not None:
+                self._save(latest)
+
+            for kind, value in items:
+                if kind == 'close':
+                    try:
+                        if self.text is not None and self.edits:
+                            self._compact(self.text)
+                    except OSError as e:
+                        print(f"Error saving autosave journal: {e}")
+                    self._close_file()
+                    value.set()
+                    return
+                if kind == 'flush':
+                    value.set()
+
+    def _save(self, text):
+        try:
+            if self.text is None or self.needs_compaction:
+                self._compact(text)
+                return
+            change = diff_text(self.text, text)
+            if change is None:
+                return
+            start, end, replacement = change
+            self._append({'op': 'edit', 'start': start, 'end': end, 'text': replacement})
+            self.text = text
+            self.edits += 1
+            if self.edits >= self.compact_every or self.size > 4 * len(text) + 65536:
+                self._compact(text)
+        except OSError as e:
+            print(f"Error saving autosave journal: {e}")
+
+    def _append(self, entry):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.size += len(line.encode('utf-8'))
+
+    def _compact(self, text):
+        self._close_file()
+        tmp_path = f'{self.path}.tmp'
+        line = json.dumps({'op': 'snapshot', 'text': text}, ensure_ascii=False) + '\n'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.text = text
+        self.edits = 0
+        self.needs_compaction = False
+        self.size = len(line.encode('utf-8'))
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,57 @@
+import hashlib
+import zlib
+
+# Los códigos de al menos este tamaño en bytes se guardan comprimidos con zlib
+COMPRESS_THRESHOLD = 1024
+
+COMPRESSION_LEVEL = 6
+
+INFLATE_FUNCTION = 'tl_inflate'
+
+# Expresión que devuelve el código de la plantilla t a partir de su hash
+CODE_COLUMN = f'''(
+    SELECT {INFLATE_FUNCTION}(b.data, b.compressed) FROM code_blobs b WHERE b.hash = t.code_hash
+)'''
+
+STORE_BLOB_SQL = '''
+    INSERT OR IGNORE INTO code_blobs (hash, size, compressed, data)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Borra los blobs indicados si ninguna plantilla ni revisión los referencia ya
+RELEASE_BLOB_SQL = '''
+    DELETE FROM code_blobs
+    WHERE hash = ?
+      AND NOT EXISTS (SELECT 1 FROM templates WHERE code_hash = code_blobs.hash)
+      AND NOT EXISTS (SELECT 1 FROM template_revisions WHERE code_hash = code_blobs.hash)
+'''
+
+def code_hash(code):
+    """Devuelve el hash SHA-256 del código, que lo identifica en code_blobs"""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+def pack_code(code, threshold=COMPRESS_THRESHOLD):
+    """
+    Prepara un código para guardarlo en code_blobs.
+
+    Returns:
+        tuple: (hash, size, compressed, data), donde size es el tamaño sin
+            comprimir y data los bytes a guardar.
+    """
+    raw = code.encode('utf-8')
+    data, compressed = raw, 0
+    if threshold is not None and len(raw) >= threshold:
+        packed = zlib.compress(raw, COMPRESSION_LEVEL)
+        if len(packed) < len(raw):
+            data, compressed = packed, 1
+    return hashlib.sha256(raw).hexdigest(), len(raw), compressed, data
+
+def inflate(data, compressed):
+    """Recupera el texto de un blob; se registra en SQLite como tl_inflate()"""
+    if data is None:
+        return None
+    if compressed:
+        data = zlib.decompress(data)
+    return bytes(data).decode('utf-8')
+
+SQL_FUNCTIONS = {INFLATE_FUNCTION: (2, inflate)}
@@ -1,9 +1,39 @@
+import atexit
 import json
 import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+# Gestores abiertos, para escribir sus cambios pendientes al salir sin
+# mantenerlos vivos durante todo el proceso
+_open_managers = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_managers():
+    for manager in list(_open_managers):
+        manager.flush()
+
+_MISSING = object()
 
 class ConfigManager:
-    def __init__(self, config_file='config.json'):
+    """
+    Configuración persistente en JSON con escritura diferida.
+
+    set() sólo marca la configuración como modificada; los cambios se
+    escriben juntos write_delay segundos después del primero, con flush() o
+    al salir de transaction(). Cada escritura es atómica: se vuelca a un
+    fichero temporal del mismo directorio y se renombra sobre el original.
+
+    Args:
+        config_file (str): Ruta del fichero de configuración.
+        write_delay (float, optional): Segundos de agrupación de escrituras.
+            None para escribir en cada set().
+    """
+
+    def __init__(self, config_file='config.json', write_delay=1.0):
         self.config_file = config_file
+        self.write_delay = write_delay
         self.default_config = {
             'theme': 'light',
             'font_size': 10,
@@ -12,7 +42,15 @@ class ConfigManager:
             'recent_files': [],
             'auto_save': True
         }
+        self.dirty = False
+        self.writes = 0
+        self._lock = threading.RLock()
+        self._timer = None
+        self._transaction_depth = 0
         self.config = self.load_config()
+        # Copia de lo último leído o escrito, con la que se comparan los set()
+        self._saved = json.loads(json.dumps(self.config))
+        _open_managers.add(self)
 
     def load_config(self):
         try:
@@ -20,20 +58,94 @@ class ConfigManager:
                 with open(self.config_file, 'r') as f:
                     return json.load(f)
             return self.default_config.copy()
+        except ValueError as e:
+            print(f"Error loading config: {e}")
+            self._preserve_corrupt_file()
+            return self.default_config.copy()
         except Exception as e:
             print(f"Error loading config: {e}")
             return self.default_config.copy()
 
+    def _preserve_corrupt_file(self):
+        """Aparta un fichero ilegible para que la próxima escritura no lo pise"""
+        try:
+            os.replace(self.config_file, f'{self.config_file}.corrupt')
+        except OSError:
+            pass
+
     def save_config(self):
+        import tempfile
+        with self._lock:
+            self._cancel_timer()
+            data = json.dumps(self.config, indent=4)
+            self.dirty = False
+            self._saved = json.loads(data)
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        tmp_path = None
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.config-', suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+            self.writes += 1
         except Exception as e:
             print(f"Error saving config: {e}")
+            with self._lock:
+                self.dirty = True
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def get(self, key, default=None):
         return self.config.get(key, default)
 
     def set(self, key, value):
-        self.config[key] = value
-        self.save_config()
\ No newline at end of file
+        with self._lock:
+            self.config[key] = value
+            # Se compara con la copia guardada y no con self.config: si el
+            # llamador modificó el dict o la lista que le devolvió get() y lo
+            # pasa de nuevo, los dos son el mismo objeto
+            if not self.dirty and self._saved.get(key, _MISSING) == value:
+                return
+            self.dirty = True
+            if self._transaction_depth:
+                return
+            if self.write_delay is None:
+                self.save_config()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Escribe inmediatamente los cambios pendientes"""
+        with self._lock:
+            self._cancel_timer()
+            if not self.dirty:
+                return
+        self.save_config()
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa varios set() en una única escritura al salir del bloque"""
+        with self._lock:
+            self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._transaction_depth -= 1
+                outermost = self._transaction_depth == 0
+            if outermost:
+                self.flush()
+
+    def close(self):
+        """Escribe los cambios pendientes y deja de vigilar el gestor al salir"""
+        self.flush()
+        _open_managers.discard(self)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
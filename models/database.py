@@ -0,0 +1,163 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY'
+}
+
+class ConnectionManager:
+    """
+    Mantiene una conexión SQLite persistente por hilo.
+
+    Las conexiones se abren en modo autocommit y las transacciones se
+    gestionan explícitamente con transaction(), que admite anidamiento
+    mediante SAVEPOINT. El módulo sqlite3 reutiliza las sentencias ya
+    preparadas de cada conexión (cached_statements), por lo que las
+    consultas repetidas no se vuelven a compilar.
+
+    Args:
+        db_file (str): Ruta de la base de datos.
+        pragmas (dict, optional): PRAGMAs que sustituyen a DEFAULT_PRAGMAS
+            (cache_size, mmap_size, synchronous, journal_mode...).
+        cached_statements (int): Tamaño de la caché de sentencias por conexión.
+        initializer (callable, optional): Función que recibe el gestor y se
+            ejecuta una sola vez, al abrir la primera conexión (por ejemplo,
+            para crear o migrar el esquema).
+        functions (dict, optional): Funciones SQL deterministas que se
+            registran en cada conexión, como {nombre: (num_args, función)}.
+    """
+
+    def __init__(self, db_file, pragmas=None, cached_statements=256, initializer=None, functions=None):
+        self.db_file = db_file
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.cached_statements = cached_statements
+        self.initializer = initializer
+        self.functions = dict(functions or {})
+        self._initialized = initializer is None
+        self._initializing = False
+        self._init_lock = threading.RLock()
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._watch = None
+
+    def connection(self):
+        """Devuelve la conexión del hilo actual, abriéndola si es necesario"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        if not self._initialized:
+            self._initialize()
+        return conn
+
+    def _initialize(self):
+        with self._init_lock:
+            if self._initialized or self._initializing:
+                return
+            self._initializing = True
+            try:
+                self.initializer(self)
+                self._initialized = True
+            finally:
+                self._initializing = False
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_file,
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        for name, (num_args, function) in self.functions.items():
+            conn.create_function(name, num_args, function, deterministic=True)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Agrupa las sentencias del bloque en una transacción.
+
+        Si ya hay una transacción abierta en el hilo, el bloque se ejecuta
+        dentro de un SAVEPOINT y sólo la transacción externa hace COMMIT.
+
+        Args:
+            immediate (bool): Empezar con BEGIN IMMEDIATE, que espera a los
+                otros escritores según el timeout de la conexión. Con BEGIN
+                diferido, en modo WAL, leer y luego escribir falla con
+                SQLITE_BUSY sin esperar si otra conexión escribió entre medias.
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        if depth == 0:
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        else:
+            conn.execute(f'SAVEPOINT sp_{depth}')
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                conn.execute('ROLLBACK')
+            else:
+                conn.execute(f'ROLLBACK TO sp_{depth}')
+                conn.execute(f'RELEASE sp_{depth}')
+            raise
+        else:
+            self._local.depth = depth
+            if depth == 0:
+                conn.execute('COMMIT')
+            else:
+                conn.execute(f'RELEASE sp_{depth}')
+
+    def data_version(self):
+        """
+        Devuelve PRAGMA data_version leído desde una conexión propia, que no
+        escribe nunca: el valor cambia cada vez que cualquier otra conexión,
+        de este proceso o de otro, confirma cambios.
+        """
+        with self._lock:
+            if self._watch is None:
+                self._watch = self._connect()
+            return self._watch.execute('PRAGMA data_version').fetchone()[0]
+
+    def in_transaction(self):
+        """Indica si el hilo actual tiene una transacción abierta"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def close(self):
+        """Cierra la conexión del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+            self._local.conn = None
+
+    def close_all(self):
+        """Cierra todas las conexiones abiertas por cualquier hilo"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            if self._watch is not None:
+                connections.append(self._watch)
+                self._watch = None
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
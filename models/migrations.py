@@ -0,0 +1,250 @@
+"""
+Migraciones versionadas del esquema de templates.db.
+
+La versión aplicada se guarda en PRAGMA user_version. Cada migración es una
+tupla (versión, descripción, pasos), donde cada paso es una sentencia SQL o
+una función que recibe la conexión. Las migraciones pendientes se aplican en
+orden, cada una en su propia transacción, de modo que una base de datos
+existente se actualiza en el sitio al abrirla.
+"""
+from .code_store import CODE_COLUMN, STORE_BLOB_SQL, pack_code
+
+TEMPLATE_DOCUMENTS_VIEW = f'''
+    CREATE VIEW IF NOT EXISTS template_documents AS
+    SELECT t.id, t.name, t.description, {CODE_COLUMN} AS code,
+           (SELECT GROUP_CONCAT(tag, ' ') FROM template_tags WHERE template_id = t.id) AS tags
+    FROM templates t
+'''
+
+def _fts_document(action, rowid):
+    """Sentencia que indexa (o retira del índice) el documento actual de una plantilla"""
+    command = "'delete', " if action == 'delete' else ''
+    target = 'templates_fts, ' if action == 'delete' else ''
+    return f'''
+        INSERT INTO templates_fts ({target}rowid, name, description, code, tags)
+        SELECT {command}id, name, description, code, tags FROM template_documents WHERE id = {rowid};
+    '''
+
+def deduplicate_code(conn):
+    """
+    Mueve el código de cada plantilla a code_blobs, una sola vez por
+    contenido, y reconstruye templates para que sólo guarde su hash.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS code_blobs (
+            hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            compressed INTEGER NOT NULL DEFAULT 0,
+            data BLOB NOT NULL
+        )
+    ''')
+    hashes = []
+    for template_id, code in conn.execute('SELECT id, code FROM templates'):
+        blob = pack_code(code)
+        conn.execute(STORE_BLOB_SQL, blob)
+        hashes.append((blob[0], template_id))
+
+    for trigger in ('templates_fts_insert', 'templates_fts_update', 'templates_fts_delete',
+                    'template_tags_fts_insert', 'template_tags_fts_delete'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS templates_fts')
+
+    conn.execute('''
+        CREATE TABLE templates_v3 (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            code_hash TEXT NOT NULL REFERENCES code_blobs (hash),
+            category TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO templates_v3 (id, name, description, code_hash, category, created_at, updated_at)
+        SELECT id, name, description, '', category, created_at, updated_at FROM templates
+    ''')
+    conn.executemany('UPDATE templates_v3 SET code_hash = ? WHERE id = ?', hashes)
+    conn.execute('DROP TABLE templates')
+    conn.execute('ALTER TABLE templates_v3 RENAME TO templates')
+
+MIGRATIONS = [
+    (1, 'Índices secundarios por tag, categoría y fecha de actualización', [
+        'CREATE INDEX IF NOT EXISTS idx_template_tags_tag ON template_tags (tag)',
+        'CREATE INDEX IF NOT EXISTS idx_templates_category ON templates (category, updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_templates_updated_at ON templates (updated_at)'
+    ]),
+    (2, 'Índice de texto completo FTS5 sincronizado por triggers', [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5(
+            name, description, code, tags,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_insert AFTER INSERT ON templates BEGIN
+            INSERT INTO templates_fts (rowid, name, description, code, tags)
+            VALUES (
+                new.id, new.name, new.description, new.code,
+                (SELECT GROUP_CONCAT(tag, ' ') FROM template_tags WHERE template_id = new.id)
+            );
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_update
+        AFTER UPDATE OF name, description, code ON templates BEGIN
+            UPDATE templates_fts
+            SET name = new.name, description = new.description, code = new.code
+            WHERE rowid = new.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_delete AFTER DELETE ON templates BEGIN
+            DELETE FROM templates_fts WHERE rowid = old.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_insert AFTER INSERT ON template_tags BEGIN
+            UPDATE templates_fts
+            SET tags = (SELECT GROUP_CONCAT(tag, ' ') FROM template_tags WHERE template_id = new.template_id)
+            WHERE rowid = new.template_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_delete AFTER DELETE ON template_tags BEGIN
+            UPDATE templates_fts
+            SET tags = (SELECT GROUP_CONCAT(tag, ' ') FROM template_tags WHERE template_id = old.template_id)
+            WHERE rowid = old.template_id;
+        END
+        ''',
+        '''
+        INSERT INTO templates_fts (rowid, name, description, code, tags)
+        SELECT t.id, t.name, t.description, t.code,
+               (SELECT GROUP_CONCAT(tag, ' ') FROM template_tags WHERE template_id = t.id)
+        FROM templates t
+        '''
+    ]),
+    # El índice de texto completo pasa a leer el contenido de la vista
+    # template_documents en lugar de guardar otra copia del código. Con
+    # contenido externo, FTS5 exige retirar cada documento con sus valores
+    # antiguos, por eso cada cambio tiene un trigger BEFORE que lo retira y
+    # otro AFTER que lo vuelve a indexar. Los triggers de tags no hacen nada
+    # si la plantilla aún no existe; no se debe usar INSERT OR IGNORE sobre
+    # template_tags, porque el trigger BEFORE se ejecutaría sin su AFTER.
+    (3, 'Código deduplicado y comprimido en code_blobs', [
+        deduplicate_code,
+        'CREATE INDEX IF NOT EXISTS idx_templates_category ON templates (category, updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_templates_updated_at ON templates (updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_templates_code_hash ON templates (code_hash)',
+        TEMPLATE_DOCUMENTS_VIEW,
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5(
+            name, description, code, tags,
+            content = 'template_documents',
+            content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_insert AFTER INSERT ON templates BEGIN
+            {_fts_document('insert', 'new.id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_before_update
+        BEFORE UPDATE OF name, description, code_hash ON templates BEGIN
+            {_fts_document('delete', 'old.id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_update
+        AFTER UPDATE OF name, description, code_hash ON templates BEGIN
+            {_fts_document('insert', 'new.id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS templates_fts_delete BEFORE DELETE ON templates BEGIN
+            {_fts_document('delete', 'old.id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_before_insert BEFORE INSERT ON template_tags BEGIN
+            {_fts_document('delete', 'new.template_id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_insert AFTER INSERT ON template_tags BEGIN
+            {_fts_document('insert', 'new.template_id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_before_delete BEFORE DELETE ON template_tags BEGIN
+            {_fts_document('delete', 'old.template_id')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS template_tags_fts_delete AFTER DELETE ON template_tags BEGIN
+            {_fts_document('insert', 'old.template_id')}
+        END
+        ''',
+        "INSERT INTO templates_fts (templates_fts) VALUES ('rebuild')"
+    ]),
+    # Cada revisión es una instantánea (code_hash) o un delta comprimido
+    # respecto a la revisión anterior (delta). La revisión 1 de las
+    # plantillas existentes es una instantánea de su código actual.
+    (4, 'Historial de revisiones del código', [
+        '''
+        CREATE TABLE IF NOT EXISTS template_revisions (
+            template_id INTEGER NOT NULL REFERENCES templates (id),
+            revision INTEGER NOT NULL,
+            code_hash TEXT REFERENCES code_blobs (hash),
+            delta BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (template_id, revision)
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_template_revisions_code_hash
+        ON template_revisions (code_hash) WHERE code_hash IS NOT NULL
+        ''',
+        '''
+        INSERT INTO template_revisions (template_id, revision, code_hash, created_at)
+        SELECT id, 1, code_hash, updated_at FROM templates
+        '''
+    ])
+]
+
+def get_schema_version(conn):
+    """Devuelve la versión del esquema guardada en user_version"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def latest_version(migrations=MIGRATIONS):
+    """Devuelve la versión más alta definida"""
+    return max((version for version, _, _ in migrations), default=0)
+
+def migrate(db, migrations=MIGRATIONS):
+    """
+    Aplica las migraciones pendientes.
+
+    Args:
+        db (ConnectionManager): Gestor de conexiones de la base de datos.
+        migrations (list, optional): Lista de migraciones a considerar.
+
+    Returns:
+        list: Versiones aplicadas en esta llamada.
+    """
+    applied = []
+    current = get_schema_version(db.connection())
+    for version, _description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        with db.transaction() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+        applied.append(version)
+        current = version
+    return applied
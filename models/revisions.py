@@ -0,0 +1,49 @@
+import difflib
+import json
+import zlib
+
+# Como mucho SNAPSHOT_INTERVAL - 1 deltas separan una revisión de su instantánea
+SNAPSHOT_INTERVAL = 20
+
+def make_delta(old, new):
+    """
+    Calcula las operaciones por líneas que transforman old en new.
+
+    Returns:
+        list: Operaciones n (copiar n líneas de old), -n (saltar n
+            líneas de old) o "texto" (insertar), en orden.
+    """
+    old_lines = old.splitlines(True)
+    new_lines = new.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+def apply_delta(old, ops):
+    """Aplica a old las operaciones de make_delta()"""
+    old_lines = old.splitlines(True)
+    position = 0
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op >= 0:
+            parts.extend(old_lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+def encode_delta(ops):
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def decode_delta(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
@@ -0,0 +1,185 @@
+_KEEP = object()
+
+MATCH_MODES = ('all', 'any')
+
+def new_event(reload=False):
+    """
+    Evento de cambio que reciben los suscriptores de TemplateManager.
+
+    Returns:
+        dict: 'reload' (el índice se reconstruyó entero, normalmente por un
+            cambio de otro proceso o una importación), 'templates' (ids
+            modificados), 'tags' y 'categories' (los que ganaron o perdieron
+            plantillas) y 'tags_added', 'tags_removed', 'categories_added' y
+            'categories_removed' (los que aparecieron o desaparecieron).
+    """
+    return {
+        'reload': reload,
+        'templates': set(),
+        'tags': set(),
+        'categories': set(),
+        'tags_added': set(),
+        'tags_removed': set(),
+        'categories_added': set(),
+        'categories_removed': set()
+    }
+
+def _sort_key(value):
+    # Igual que ORDER BY en SQLite: NULL primero y luego por código de carácter
+    return (value is not None, value or '')
+
+class TagIndex:
+    """
+    Índice en memoria de tag -> ids y categoría -> ids de las plantillas.
+
+    No tiene cerrojo propio: TemplateManager lo protege con el suyo y se
+    encarga de mantenerlo al día.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.version = None
+        self.by_tag = {}
+        self.by_category = {}
+        self._template_tags = {}
+        self._template_category = {}
+        self._sorted_tags = None
+        self._sorted_categories = None
+
+    def __contains__(self, template_id):
+        return template_id in self._template_category
+
+    def load(self, categories, tag_rows, version):
+        """
+        Reconstruye el índice.
+
+        Args:
+            categories (iterable): Pares (id, categoría) de todas las plantillas.
+            tag_rows (iterable): Pares (id, tag).
+            version (int): data_version leído antes de las consultas.
+        """
+        self.clear()
+        for template_id, category in categories:
+            self._template_category[template_id] = category
+            self.by_category.setdefault(category, set()).add(template_id)
+            self._template_tags[template_id] = set()
+        for template_id, tag in tag_rows:
+            tags = self._template_tags.get(template_id)
+            if tags is None:
+                continue
+            tags.add(tag)
+            self.by_tag.setdefault(tag, set()).add(template_id)
+        self.loaded = True
+        self.version = version
+
+    def clear(self):
+        self.loaded = False
+        self.version = None
+        self.by_tag.clear()
+        self.by_category.clear()
+        self._template_tags.clear()
+        self._template_category.clear()
+        self._sorted_tags = self._sorted_categories = None
+
+    def update(self, template_id, event, category=_KEEP, tags=_KEEP):
+        """Fija la categoría y/o los tags de una plantilla, anotando en event lo que cambia"""
+        event['templates'].add(template_id)
+        if template_id not in self._template_category:
+            self._template_category[template_id] = _KEEP
+            self._template_tags[template_id] = set()
+        if category is not _KEEP:
+            self._set_category(template_id, category, event)
+        if tags is not _KEEP:
+            self._set_tags(template_id, set(tags), event)
+
+    def change_tags(self, template_id, event, add=(), remove=()):
+        """Quita y luego añade tags a una plantilla ya indexada"""
+        tags = self._template_tags.get(template_id)
+        if tags is None:
+            return
+        self.update(template_id, event, tags=(tags - set(remove)) | set(add))
+
+    def remove(self, template_id, event):
+        """Quita una plantilla del índice"""
+        if template_id not in self._template_category:
+            return
+        event['templates'].add(template_id)
+        self._set_tags(template_id, set(), event)
+        self._set_category(template_id, _KEEP, event)
+        del self._template_category[template_id]
+        del self._template_tags[template_id]
+
+    def _set_category(self, template_id, category, event):
+        old = self._template_category[template_id]
+        if old == category:
+            return
+        if old is not _KEEP:
+            members = self.by_category[old]
+            members.discard(template_id)
+            event['categories'].add(old)
+            if not members:
+                del self.by_category[old]
+                event['categories_removed'].add(old)
+                self._sorted_categories = None
+        self._template_category[template_id] = category
+        if category is not _KEEP:
+            members = self.by_category.setdefault(category, set())
+            if not members:
+                event['categories_added'].add(category)
+                self._sorted_categories = None
+            members.add(template_id)
+            event['categories'].add(category)
+
+    def _set_tags(self, template_id, tags, event):
+        old = self._template_tags[template_id]
+        for tag in old - tags:
+            members = self.by_tag[tag]
+            members.discard(template_id)
+            event['tags'].add(tag)
+            if not members:
+                del self.by_tag[tag]
+                event['tags_removed'].add(tag)
+                self._sorted_tags = None
+        for tag in tags - old:
+            members = self.by_tag.setdefault(tag, set())
+            if not members:
+                event['tags_added'].add(tag)
+                self._sorted_tags = None
+            members.add(template_id)
+            event['tags'].add(tag)
+        self._template_tags[template_id] = tags
+
+    def tags(self):
+        if self._sorted_tags is None:
+            self._sorted_tags = sorted(self.by_tag)
+        return list(self._sorted_tags)
+
+    def categories(self):
+        if self._sorted_categories is None:
+            self._sorted_categories = sorted(self.by_category, key=_sort_key)
+        return list(self._sorted_categories)
+
+    def query(self, tags=(), match='all', category=_KEEP):
+        """
+        Ids de las plantillas con todos los tags (match='all') o con alguno
+        (match='any'), opcionalmente sólo de una categoría.
+
+        Returns:
+            set: Ids encontrados. Sin tags ni categoría, todas las plantillas.
+        """
+        if match not in MATCH_MODES:
+            raise ValueError(f"Modo de búsqueda desconocido: {match}")
+        if tags:
+            groups = sorted((self.by_tag.get(tag, set()) for tag in set(tags)), key=len)
+            if match == 'all':
+                result = set(groups[0]).intersection(*groups[1:])
+            else:
+                result = set().union(*groups)
+        else:
+            result = None
+        if category is not _KEEP:
+            members = self.by_category.get(category, set())
+            result = set(members) if result is None else result & members
+        if result is None:
+            result = set(self._template_category)
+        return result
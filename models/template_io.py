@@ -0,0 +1,111 @@
+import io
+import json
+
+ARCHIVE_FORMAT = 'tkinterlab-templates'
+ARCHIVE_VERSION = 1
+
+RECORD_FIELDS = ('name', 'description', 'code', 'category', 'tags', 'created_at', 'updated_at')
+
+CONFLICT_POLICIES = ('skip', 'upsert', 'rename')
+
+def compression_for(path):
+    """Deduce la compresión del archivo por su extensión: 'gzip', 'zstd' o None"""
+    lowered = path.lower()
+    if lowered.endswith('.gz'):
+        return 'gzip'
+    if lowered.endswith(('.zst', '.zstd')):
+        return 'zstd'
+    return None
+
+def open_archive(path, mode='r', compression=None):
+    """
+    Abre un archivo JSON Lines, comprimido o no, en modo texto.
+
+    Args:
+        path (str): Ruta del archivo.
+        mode (str): 'r' para leer o 'w' para escribir.
+        compression (str, optional): 'gzip', 'zstd' o None. Si no se indica,
+            se deduce de la extensión.
+
+    Raises:
+        ValueError: Si se pide zstd y el paquete zstandard no está instalado.
+    """
+    compression = compression or compression_for(path)
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='\n')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("La compresión zstd requiere el paquete 'zstandard'")
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='\n')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+def check_record(record, number):
+    """
+    Comprueba que un registro tiene los campos mínimos de una plantilla.
+
+    Raises:
+        ValueError: Si no es un objeto, le falta name o code, o tags no es
+            un texto separado por comas ni una lista de textos.
+    """
+    if not isinstance(record, dict) or not isinstance(record.get('name'), str) or not record['name'] \
+            or not isinstance(record.get('code'), str):
+        raise ValueError(f"Plantilla {number}: debe tener name y code")
+    tags = record.get('tags')
+    if tags is not None and not isinstance(tags, str) and (
+        not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags)
+    ):
+        raise ValueError(f"Plantilla {number}: tags debe ser una lista de textos")
+    return record
+
+def write_records(path, records, compression=None):
+    """
+    Escribe las plantillas en un archivo JSON Lines precedido de una cabecera.
+
+    Args:
+        records (iterable): Diccionarios con los campos de RECORD_FIELDS.
+
+    Returns:
+        int: Número de plantillas escritas.
+    """
+    count = 0
+    with open_archive(path, 'w', compression) as f:
+        header = {'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION}
+        f.write(json.dumps(header) + '\n')
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+def read_records(path, compression=None):
+    """
+    Lee las plantillas de un archivo JSON Lines de una en una.
+
+    Yields:
+        dict: Plantilla con los campos de RECORD_FIELDS (name y code obligatorios).
+
+    Raises:
+        ValueError: Si una línea no es JSON válido o le falta name o code.
+    """
+    with open_archive(path, 'r', compression) as f:
+        number = 0
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Línea {line_number} no válida: {e}")
+            if isinstance(record, dict) and 'format' in record and 'name' not in record:
+                if record.get('format') != ARCHIVE_FORMAT or record.get('version', 1) > ARCHIVE_VERSION:
+                    raise ValueError("Formato de archivo de plantillas no soportado")
+                continue
+            number += 1
+            yield check_record(record, number)
@@ -1,13 +1,122 @@
 import sqlite3
+import re
+import json
+import difflib
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+from .cache import LRUCache
+from .code_store import CODE_COLUMN, INFLATE_FUNCTION, RELEASE_BLOB_SQL, SQL_FUNCTIONS, STORE_BLOB_SQL, pack_code
+from .database import ConnectionManager
+from .migrations import migrate
+from .revisions import SNAPSHOT_INTERVAL, apply_delta, decode_delta, encode_delta, make_delta
+from .tag_index import TagIndex, new_event
+from .template_io import CONFLICT_POLICIES, check_record, read_records, write_records
+
+TEMPLATE_COLUMNS = f'''
+    t.id, t.name, t.description, {CODE_COLUMN} AS code, t.category, t.created_at, t.updated_at,
+    (SELECT GROUP_CONCAT(tt.tag) FROM template_tags tt WHERE tt.template_id = t.id) AS tags
+'''
+
+ALL_TEMPLATES_SQL = f'''
+    SELECT {TEMPLATE_COLUMNS}
+    FROM templates t
+    ORDER BY t.updated_at DESC
+'''
+
+TEMPLATES_BY_CATEGORY_SQL = f'''
+    SELECT {TEMPLATE_COLUMNS}
+    FROM templates t
+    WHERE t.category = ?
+    ORDER BY t.updated_at DESC
+'''
+
+TEMPLATES_BY_TAG_SQL = f'''
+    SELECT {TEMPLATE_COLUMNS}
+    FROM template_tags tag_filter
+    INNER JOIN templates t ON t.id = tag_filter.template_id
+    WHERE tag_filter.tag = ?
+    ORDER BY t.updated_at DESC
+'''
+
+INDEX_CATEGORIES_SQL = 'SELECT id, category FROM templates'
+
+INDEX_TAGS_SQL = 'SELECT template_id, tag FROM template_tags'
+
+PAGE_COLUMNS = 't.id, t.name, t.category, t.updated_at'
+
+# Pesos BM25 por columna de templates_fts: name, description, code, tags
+SEARCH_WEIGHTS = (10.0, 4.0, 1.0, 6.0)
+
+SEARCH_SQL = f'''
+    SELECT t.id, t.name, t.category, t.updated_at,
+           snippet(templates_fts, -1, ?, ?, '…', 12) AS snippet,
+           bm25(templates_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS rank
+    FROM templates_fts
+    INNER JOIN templates t ON t.id = templates_fts.rowid
+    WHERE templates_fts MATCH ?{{ids_filter}}
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+'''
+
+EXPORT_SQL = f'''
+    SELECT {TEMPLATE_COLUMNS}
+    FROM templates t
+    WHERE t.id > ?
+    ORDER BY t.id
+    LIMIT ?
+'''
+
+EXPORT_IDS_SQL = f'''
+    SELECT {TEMPLATE_COLUMNS}
+    FROM templates t
+    WHERE t.id IN (SELECT value FROM json_each(?))
+    ORDER BY t.id
+'''
+
+# Los tags de las plantillas nuevas se insertan antes que la plantilla, con
+# el id ya asignado, para que el trigger FTS indexe cada fila una sola vez.
+IMPORT_INSERT_SQL = '''
+    INSERT INTO templates (id, name, description, code_hash, category, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+'''
+
+# Lista de ids pasada como un único parámetro JSON
+IDS_SQL = 'SELECT value FROM json_each(?)'
+
+# Sin INSERT OR IGNORE: el trigger BEFORE INSERT del índice FTS se
+# dispararía aunque la fila se ignorase, sin su AFTER INSERT
+ADD_TAG_SQL = '''
+    INSERT INTO template_tags (template_id, tag)
+    SELECT t.id, ? FROM templates t
+    WHERE t.id = ?
+      AND NOT EXISTS (SELECT 1 FROM template_tags WHERE template_id = t.id AND tag = ?)
+'''
+
+IMPORT_UPDATE_SQL = '''
+    UPDATE templates
+    SET description = ?, code_hash = ?, category = ?, updated_at = COALESCE(?, CURRENT_TIMESTAMP)
+    WHERE id = ?
+'''
 
 class TemplateManager:
-    def __init__(self, db_file='templates.db'):
+    def __init__(self, db_file='templates.db', pragmas=None, code_cache_size=32):
         self.db_file = db_file
-        self.init_db()
+        self.db = ConnectionManager(
+            db_file, pragmas,
+            initializer=lambda db: self.init_db(),
+            functions=SQL_FUNCTIONS
+        )
+        self.code_cache = LRUCache(code_cache_size)
+        self._code_cache_version = None
+        self.tag_index = TagIndex()
+        self._index_lock = threading.RLock()
+        self._subscribers = []
+        self._batch = threading.local()
 
     def init_db(self):
-        with sqlite3.connect(self.db_file) as conn:
+        with self.db.transaction() as conn:
             c = conn.cursor()
             c.execute('''
                 CREATE TABLE IF NOT EXISTS templates (
@@ -28,41 +137,71 @@ class TemplateManager:
                     PRIMARY KEY (template_id, tag)
                 )
             ''')
-            conn.commit()
+        migrate(self.db)
 
     def add_template(self, name, code, description="", category="general", tags=None):
+        version = self._index_version()
         try:
-            with sqlite3.connect(self.db_file) as conn:
+            with self.db.transaction() as conn:
                 c = conn.cursor()
+                code_hash = self._store_code(c, code)
                 c.execute('''
-                    INSERT INTO templates (name, description, code, category, updated_at)
+                    INSERT INTO templates (name, description, code_hash, category, updated_at)
                     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ''', (name, description, code, category))
+                ''', (name, description, code_hash, category))
                 
                 template_id = c.lastrowid
+                self._record_revision(c, template_id, code_hash)
                 
                 if tags:
                     c.executemany('''
                         INSERT INTO template_tags (template_id, tag)
                         VALUES (?, ?)
                     ''', [(template_id, tag) for tag in tags])
-                
-                conn.commit()
-                return template_id
         except sqlite3.IntegrityError:
             raise ValueError("Una plantilla con ese nombre ya existe")
+        self._publish(version, lambda index, event: index.update(
+            template_id, event, category=category, tags=tags or ()
+        ))
+        return template_id
 
     def get_template(self, template_id):
-        with sqlite3.connect(self.db_file) as conn:
-            c = conn.cursor()
-            c.execute('''
-                SELECT t.*, GROUP_CONCAT(tt.tag) as tags
-                FROM templates t
-                LEFT JOIN template_tags tt ON t.id = tt.template_id
-                WHERE t.id = ?
-                GROUP BY t.id
-            ''', (template_id,))
-            return c.fetchone()
+        conn = self.db.connection()
+        c = conn.cursor()
+        c.execute(f'''
+            SELECT {TEMPLATE_COLUMNS}
+            FROM templates t
+            WHERE t.id = ?
+        ''', (template_id,))
+        return c.fetchone()
+
+    def get_template_code(self, template_id):
+        """
+        Obtiene sólo el código de una plantilla por su id.
+
+        El código se descomprime de code_blobs si hace falta. Los códigos
+        cargados recientemente se sirven desde una caché LRU que se invalida
+        al modificar o borrar la plantilla, y entera cuando cambia
+        data_version porque otra conexión (u otro proceso) ha escrito.
+
+        Returns:
+            str: Código de la plantilla, o None si no existe.
+        """
+        # La versión se lee antes que el código: lo que se guarde en la caché
+        # nunca es más antiguo que la versión con la que se compara
+        version = self.db.data_version()
+        if version != self._code_cache_version:
+            self.code_cache.clear()
+            self._code_cache_version = version
+        code = self.code_cache.get(template_id)
+        if code is not None:
+            return code
+        conn = self.db.connection()
+        row = conn.execute(f"SELECT {CODE_COLUMN} FROM templates t WHERE t.id = ?", (template_id,)).fetchone()
+        if row is None:
+            return None
+        self.code_cache.put(template_id, row[0])
+        return row[0]
 
     def get_all_templates(self, category=None):
         """
@@ -75,30 +214,15 @@ class TemplateManager:
             list: Lista de tuplas con la información de las plantillas.
                 Cada tupla contiene: (id, name, description, code, category, created_at, updated_at, tags)
         """
-        with sqlite3.connect(self.db_file) as conn:
-            c = conn.cursor()
-            
-            if category:
-                query = '''
-                    SELECT t.*, GROUP_CONCAT(tt.tag) as tags
-                    FROM templates t
-                    LEFT JOIN template_tags tt ON t.id = tt.template_id
-                    WHERE t.category = ?
-                    GROUP BY t.id
-                    ORDER BY t.updated_at DESC
-                '''
-                c.execute(query, (category,))
-            else:
-                query = '''
-                    SELECT t.*, GROUP_CONCAT(tt.tag) as tags
-                    FROM templates t
-                    LEFT JOIN template_tags tt ON t.id = tt.template_id
-                    GROUP BY t.id
-                    ORDER BY t.updated_at DESC
-                '''
-                c.execute(query)
-            
-            return c.fetchall()
+        conn = self.db.connection()
+        c = conn.cursor()
+        
+        if category:
+            c.execute(TEMPLATES_BY_CATEGORY_SQL, (category,))
+        else:
+            c.execute(ALL_TEMPLATES_SQL)
+        
+        return c.fetchall()
 
     def get_templates_by_tag(self, tag):
         """
@@ -110,31 +234,33 @@ class TemplateManager:
         Returns:
             list: Lista de tuplas con la información de las plantillas.
         """
-        with sqlite3.connect(self.db_file) as conn:
-            c = conn.cursor()
-            query = '''
-                SELECT t.*, GROUP_CONCAT(tt2.tag) as tags
-                FROM templates t
-                INNER JOIN template_tags tt ON t.id = tt.template_id
-                LEFT JOIN template_tags tt2 ON t.id = tt2.template_id
-                WHERE tt.tag = ?
-                GROUP BY t.id
-                ORDER BY t.updated_at DESC
-            '''
-            c.execute(query, (tag,))
-            return c.fetchall()
+        conn = self.db.connection()
+        c = conn.cursor()
+        c.execute(TEMPLATES_BY_TAG_SQL, (tag,))
+        return c.fetchall()
 
     def update_template(self, template_id, name=None, code=None, description=None, category=None, tags=None):
-        with sqlite3.connect(self.db_file) as conn:
+        version = self._index_version()
+        with self.db.transaction() as conn:
             c = conn.cursor()
+            # Si la fila no existe no se guarda nada: el blob del código
+            # nuevo quedaría huérfano. El código actual sólo se descomprime
+            # si va a cambiar.
+            columns = f"t.code_hash, {CODE_COLUMN}" if code is not None else "t.code_hash, NULL"
+            current = c.execute(f"SELECT {columns} FROM templates t WHERE t.id = ?", (template_id,)).fetchone()
+            if current is None:
+                return
             updates = []
             params = []
+            old_hash = old_code = new_hash = None
             if name is not None:
                 updates.append("name = ?")
                 params.append(name)
             if code is not None:
-                updates.append("code = ?")
-                params.append(code)
+                old_hash, old_code = current
+                new_hash = self._store_code(c, code)
+                updates.append("code_hash = ?")
+                params.append(new_hash)
             if description is not None:
                 updates.append("description = ?")
                 params.append(description)
@@ -142,7 +268,7 @@ class TemplateManager:
                 updates.append("category = ?")
                 params.append(category)
             
-            if updates:
+            if updates or tags is not None:
                 updates.append("updated_at = CURRENT_TIMESTAMP")
                 query = f"UPDATE templates SET {', '.join(updates)} WHERE id = ?"
                 params.append(template_id)
@@ -154,15 +280,255 @@ class TemplateManager:
                         INSERT INTO template_tags (template_id, tag)
                         VALUES (?, ?)
                     ''', [(template_id, tag) for tag in tags])
-                
-                conn.commit()
+            if old_hash is not None and old_hash != new_hash:
+                self._record_revision(c, template_id, new_hash, old_code, code)
+                c.execute(RELEASE_BLOB_SQL, (old_hash,))
+        self.code_cache.discard(template_id)
+        changes = {}
+        if category is not None:
+            changes['category'] = category
+        if tags is not None:
+            changes['tags'] = tags
+        self._publish(version, lambda index, event: index.update(template_id, event, **changes))
 
     def delete_template(self, template_id):
-        with sqlite3.connect(self.db_file) as conn:
+        version = self._index_version()
+        with self.db.transaction() as conn:
             c = conn.cursor()
+            hashes = c.execute('''
+                SELECT code_hash FROM templates WHERE id = ?
+                UNION
+                SELECT code_hash FROM template_revisions WHERE template_id = ? AND code_hash IS NOT NULL
+            ''', (template_id, template_id)).fetchall()
             c.execute("DELETE FROM template_tags WHERE template_id = ?", (template_id,))
+            c.execute("DELETE FROM template_revisions WHERE template_id = ?", (template_id,))
             c.execute("DELETE FROM templates WHERE id = ?", (template_id,))
-            conn.commit()
+            c.executemany(RELEASE_BLOB_SQL, hashes)
+        self.code_cache.discard(template_id)
+        self._publish(version, lambda index, event: index.remove(template_id, event))
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa todas las modificaciones del bloque en una sola transacción.
+
+        Si el bloque lanza una excepción no se guarda ninguna. El índice de
+        tags y los suscriptores se actualizan una sola vez, al confirmar.
+        Los bloques anidados forman parte del exterior.
+        """
+        pending = getattr(self._batch, 'pending', None)
+        if pending is not None:
+            mark = len(pending)
+            try:
+                with self.db.transaction():
+                    yield self
+            except BaseException:
+                del pending[mark:]
+                raise
+            return
+        version = self._index_version()
+        pending = self._batch.pending = []
+        self._batch.reload = False
+        try:
+            with self.db.transaction():
+                yield self
+        finally:
+            reload = self._batch.reload
+            self._batch.pending = None
+        if reload:
+            self._invalidate_index()
+        elif pending:
+            self._publish(version, lambda index, event: [apply(index, event) for apply in pending])
+
+    def delete_templates(self, ids):
+        """
+        Elimina varias plantillas, con sus tags y su historial.
+
+        Returns:
+            int: Número de plantillas eliminadas.
+        """
+        ids = json.dumps(sorted(set(ids)))
+        with self.batch():
+            conn = self.db.connection()
+            c = conn.cursor()
+            deleted = [row[0] for row in c.execute(f"SELECT id FROM templates WHERE id IN ({IDS_SQL})", (ids,))]
+            hashes = c.execute(f'''
+                SELECT code_hash FROM templates WHERE id IN ({IDS_SQL})
+                UNION
+                SELECT code_hash FROM template_revisions
+                WHERE template_id IN ({IDS_SQL}) AND code_hash IS NOT NULL
+            ''', (ids, ids)).fetchall()
+            c.execute(f"DELETE FROM template_tags WHERE template_id IN ({IDS_SQL})", (ids,))
+            c.execute(f"DELETE FROM template_revisions WHERE template_id IN ({IDS_SQL})", (ids,))
+            c.execute(f"DELETE FROM templates WHERE id IN ({IDS_SQL})", (ids,))
+            c.executemany(RELEASE_BLOB_SQL, hashes)
+            self._publish(None, lambda index, event: [index.remove(template_id, event) for template_id in deleted])
+        for template_id in deleted:
+            self.code_cache.discard(template_id)
+        return len(deleted)
+
+    def retag(self, ids, add=(), remove=()):
+        """
+        Quita y añade tags a varias plantillas. Un tag que esté en add y en
+        remove queda puesto.
+
+        Args:
+            ids (iterable): Ids de las plantillas.
+            add (iterable): Tags que se añaden si no los tienen ya.
+            remove (iterable): Tags que se quitan.
+        """
+        ids = sorted(set(ids))
+        add, remove = list(dict.fromkeys(add)), list(dict.fromkeys(remove))
+        if not ids or not (add or remove):
+            return
+        with self.batch():
+            c = self.db.connection().cursor()
+            c.executemany(
+                "DELETE FROM template_tags WHERE template_id = ? AND tag = ?",
+                [(template_id, tag) for template_id in ids for tag in remove]
+            )
+            c.executemany(ADD_TAG_SQL, [(tag, template_id, tag) for template_id in ids for tag in add])
+            c.execute(f"UPDATE templates SET updated_at = CURRENT_TIMESTAMP WHERE id IN ({IDS_SQL})", (json.dumps(ids),))
+            self._publish(None, lambda index, event: [
+                index.change_tags(template_id, event, add, remove) for template_id in ids
+            ])
+
+    def recategorize(self, ids, category):
+        """Mueve varias plantillas a la categoría indicada"""
+        ids = sorted(set(ids))
+        with self.batch():
+            c = self.db.connection().cursor()
+            c.execute(f'''
+                UPDATE templates SET category = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id IN ({IDS_SQL})
+            ''', (category, json.dumps(ids)))
+            self._publish(None, lambda index, event: [
+                index.update(template_id, event, category=category) for template_id in ids
+                if template_id in index
+            ])
+
+    def _record_revision(self, cursor, template_id, code_hash, old_code=None, new_code=None):
+        """
+        Añade una revisión con el código nuevo de la plantilla. Se guarda como
+        delta respecto a old_code salvo que sea la primera, o que ya haya
+        SNAPSHOT_INTERVAL - 1 deltas desde la última instantánea.
+        """
+        last, last_snapshot = cursor.execute('''
+            SELECT MAX(revision), MAX(CASE WHEN code_hash IS NOT NULL THEN revision END)
+            FROM template_revisions
+            WHERE template_id = ?
+        ''', (template_id,)).fetchone()
+        revision = (last or 0) + 1
+        if old_code is None or last_snapshot is None or revision - last_snapshot >= SNAPSHOT_INTERVAL:
+            cursor.execute(
+                "INSERT INTO template_revisions (template_id, revision, code_hash) VALUES (?, ?, ?)",
+                (template_id, revision, code_hash)
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO template_revisions (template_id, revision, delta) VALUES (?, ?, ?)",
+                (template_id, revision, encode_delta(make_delta(old_code, new_code)))
+            )
+        return revision
+
+    def list_revisions(self, template_id):
+        """
+        Obtiene el historial de revisiones de una plantilla.
+
+        Returns:
+            list: Tuplas (revision, created_at, snapshot, stored_bytes) de la
+                más reciente a la más antigua; snapshot indica si la revisión
+                se guarda completa o como delta.
+        """
+        conn = self.db.connection()
+        return [
+            (revision, created_at, bool(snapshot), stored_bytes)
+            for revision, created_at, snapshot, stored_bytes in conn.execute('''
+                SELECT r.revision, r.created_at, r.code_hash IS NOT NULL,
+                       COALESCE(LENGTH(r.delta), (SELECT LENGTH(b.data) FROM code_blobs b WHERE b.hash = r.code_hash))
+                FROM template_revisions r
+                WHERE r.template_id = ?
+                ORDER BY r.revision DESC
+            ''', (template_id,))
+        ]
+
+    def get_revision_code(self, template_id, revision):
+        """
+        Reconstruye el código de una revisión a partir de la instantánea
+        anterior más cercana, aplicando como mucho SNAPSHOT_INTERVAL - 1 deltas.
+
+        Returns:
+            str: Código de la revisión, o None si no existe.
+        """
+        conn = self.db.connection()
+        rows = conn.execute(f'''
+            SELECT r.revision, {INFLATE_FUNCTION}(b.data, b.compressed), r.delta
+            FROM template_revisions r
+            LEFT JOIN code_blobs b ON b.hash = r.code_hash
+            WHERE r.template_id = ?
+              AND r.revision <= ?
+              AND r.revision >= (
+                  SELECT MAX(s.revision) FROM template_revisions s
+                  WHERE s.template_id = r.template_id AND s.revision <= ? AND s.code_hash IS NOT NULL
+              )
+            ORDER BY r.revision
+        ''', (template_id, revision, revision)).fetchall()
+        if not rows or rows[-1][0] != revision:
+            return None
+        code = rows[0][1]
+        for _, _, delta in rows[1:]:
+            code = apply_delta(code, decode_delta(delta))
+        return code
+
+    def diff_revisions(self, template_id, old_revision, new_revision=None):
+        """
+        Compara dos revisiones de una plantilla.
+
+        Args:
+            old_revision (int): Revisión de partida.
+            new_revision (int, optional): Revisión final; por defecto, el código actual.
+
+        Returns:
+            str: Diferencias en formato unificado.
+
+        Raises:
+            ValueError: Si alguna de las revisiones no existe.
+        """
+        old_code = self.get_revision_code(template_id, old_revision)
+        if new_revision is None:
+            new_code = self.get_template_code(template_id)
+            new_label = 'actual'
+        else:
+            new_code = self.get_revision_code(template_id, new_revision)
+            new_label = f'revisión {new_revision}'
+        if old_code is None or new_code is None:
+            raise ValueError("La revisión no existe")
+        return ''.join(difflib.unified_diff(
+            old_code.splitlines(True),
+            new_code.splitlines(True),
+            f'revisión {old_revision}',
+            new_label
+        ))
+
+    def restore_revision(self, template_id, revision):
+        """
+        Vuelve al código de una revisión anterior. La restauración se
+        registra como una revisión nueva, así que no se pierde historial.
+
+        Raises:
+            ValueError: Si la revisión no existe.
+        """
+        code = self.get_revision_code(template_id, revision)
+        if code is None:
+            raise ValueError("La revisión no existe")
+        self.update_template(template_id, code=code)
+
+    @staticmethod
+    def _store_code(cursor, code):
+        """Guarda el código en code_blobs si no estaba ya y devuelve su hash"""
+        blob = pack_code(code)
+        cursor.execute(STORE_BLOB_SQL, blob)
+        return blob[0]
 
     def get_all_tags(self):
         """
@@ -171,10 +537,8 @@ class TemplateManager:
         Returns:
             list: Lista de strings con todos los tags únicos.
         """
-        with sqlite3.connect(self.db_file) as conn:
-            c = conn.cursor()
-            c.execute('SELECT DISTINCT tag FROM template_tags ORDER BY tag')
-            return [row[0] for row in c.fetchall()]
+        with self._index_lock:
+            return self._current_index().tags()
 
     def get_all_categories(self):
         """
@@ -183,7 +547,485 @@ class TemplateManager:
         Returns:
             list: Lista de strings con todas las categorías únicas.
         """
-        with sqlite3.connect(self.db_file) as conn:
-            c = conn.cursor()
-            c.execute('SELECT DISTINCT category FROM templates ORDER BY category')
-            return [row[0] for row in c.fetchall()]
\ No newline at end of file
+        with self._index_lock:
+            return self._current_index().categories()
+
+    def find_template_ids(self, tags=(), match='all', category=None):
+        """
+        Busca plantillas por tags y categoría en el índice en memoria.
+
+        Args:
+            tags (iterable): Tags buscados.
+            match (str): 'all' para exigir todos los tags (AND) o 'any' para
+                aceptar cualquiera de ellos (OR).
+            category (str, optional): Categoría para filtrar las plantillas.
+
+        Returns:
+            set: Ids de las plantillas que cumplen el filtro.
+        """
+        filters = {} if category is None else {'category': category}
+        with self._index_lock:
+            return self._current_index().query(tags, match, **filters)
+
+    def subscribe(self, callback):
+        """
+        Avisa a callback de cada cambio en las plantillas con un evento de
+        tag_index.new_event(), para refrescar sólo lo que ha cambiado.
+
+        El aviso se hace en el hilo que hizo el cambio, así que las vistas
+        deben pasarlo a su propio hilo. Los cambios hechos por otros
+        procesos se detectan al consultar el índice o con check_for_changes().
+
+        Returns:
+            callable: El mismo callback, para pasarlo a unsubscribe().
+        """
+        with self._index_lock:
+            self._current_index()
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._index_lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def check_for_changes(self):
+        """
+        Reconstruye el índice si otro proceso ha modificado la base de datos.
+
+        Returns:
+            bool: True si había cambios (los suscriptores ya han sido avisados).
+        """
+        with self._index_lock:
+            if not self.tag_index.loaded or self.tag_index.version == self.db.data_version():
+                return False
+        self._current_index()
+        return True
+
+    def _current_index(self):
+        """Devuelve el índice, cargándolo o reconstruyéndolo si está desfasado"""
+        event = None
+        with self._index_lock:
+            index = self.tag_index
+            if not index.loaded:
+                self._load_index()
+            elif index.version != self.db.data_version():
+                self._load_index()
+                event = new_event(reload=True)
+        if event is not None:
+            self._notify(event)
+        return index
+
+    def _load_index(self):
+        conn = self.db.connection()
+        version = self.db.data_version()
+        self.tag_index.load(conn.execute(INDEX_CATEGORIES_SQL), conn.execute(INDEX_TAGS_SQL), version)
+
+    def _index_version(self):
+        """data_version antes de una escritura, o None si el índice no está cargado"""
+        with self._index_lock:
+            return self.db.data_version() if self.tag_index.loaded else None
+
+    def _publish(self, version, apply):
+        """
+        Aplica al índice una escritura ya confirmada y avisa a los suscriptores.
+
+        Si entre version y la escritura ha cambiado la base de datos por otro
+        lado, el índice se reconstruye entero en lugar de actualizarse.
+        Dentro de batch() el cambio se aplaza hasta que se confirma.
+        """
+        pending = getattr(self._batch, 'pending', None)
+        if pending is not None:
+            pending.append(apply)
+            return
+        with self._index_lock:
+            index = self.tag_index
+            if version is None or not index.loaded:
+                return
+            if version != index.version:
+                self._load_index()
+                event = new_event(reload=True)
+            else:
+                event = new_event()
+                apply(index, event)
+                # Dentro de una transacción externa el cambio aún puede
+                # deshacerse: el índice se reconstruirá en la próxima consulta
+                index.version = None if self.db.in_transaction() else self.db.data_version()
+        self._notify(event)
+
+    def _invalidate_index(self):
+        """Reconstruye el índice tras un cambio masivo, si alguien lo usa"""
+        if getattr(self._batch, 'pending', None) is not None:
+            self._batch.reload = True
+            return
+        with self._index_lock:
+            if not self.tag_index.loaded:
+                return
+            if not self._subscribers:
+                self.tag_index.clear()
+                return
+            self._load_index()
+        self._notify(new_event(reload=True))
+
+    def _notify(self, event):
+        with self._index_lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+
+    def list_templates_page(self, after=None, limit=100, category=None, ids=None):
+        """
+        Obtiene una página de plantillas sin el código, paginando por clave.
+
+        Args:
+            after (tuple, optional): (updated_at, id) de la última fila de la
+                página anterior. None para empezar por la más reciente.
+            limit (int): Número máximo de filas.
+            category (str, optional): Categoría para filtrar las plantillas.
+            ids (iterable, optional): Ids permitidos, por ejemplo los de
+                find_template_ids().
+
+        Returns:
+            list: Tuplas (id, name, category, updated_at) ordenadas por
+                updated_at descendente.
+        """
+        query, params = self.build_page_query(after, limit, category, ids)
+        conn = self.db.connection()
+        c = conn.cursor()
+        c.execute(query, params)
+        return c.fetchall()
+
+    @staticmethod
+    def build_page_query(after=None, limit=100, category=None, ids=None):
+        """Construye la consulta de list_templates_page(); devuelve (sql, params)"""
+        conditions = []
+        params = []
+        if category:
+            conditions.append("t.category = ?")
+            params.append(category)
+        if ids is not None:
+            conditions.append(f"t.id IN ({IDS_SQL})")
+            params.append(json.dumps(sorted(ids)))
+        if after is not None:
+            conditions.append("(t.updated_at, t.id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        return f'''
+            SELECT {PAGE_COLUMNS}
+            FROM templates t
+            {where}
+            ORDER BY t.updated_at DESC, t.id DESC
+            LIMIT ?
+        ''', params
+
+    def search(self, query, limit=50, offset=0, highlight=('«', '»'), ids=None):
+        """
+        Busca plantillas por nombre, descripción, código y tags.
+
+        Cada palabra del texto se trata como prefijo y todas deben aparecer,
+        de modo que la búsqueda sirve para filtrar mientras se escribe.
+
+        Args:
+            query (str): Texto introducido por el usuario.
+            limit (int): Número máximo de resultados.
+            offset (int): Resultados a saltar, para paginar.
+            highlight (tuple): Marcadores de apertura y cierre de coincidencias.
+            ids (iterable, optional): Ids permitidos, por ejemplo los de
+                find_template_ids(). Se filtran en la consulta, antes de
+                LIMIT y OFFSET, para que las páginas salgan completas.
+
+        Returns:
+            list: Tuplas (id, name, category, updated_at, snippet, rank)
+                ordenadas por relevancia BM25.
+        """
+        match = self.build_match_query(query)
+        if not match:
+            return []
+        conn = self.db.connection()
+        c = conn.cursor()
+        c.execute(*self.build_search_query(match, limit, offset, highlight, ids))
+        return c.fetchall()
+
+    @staticmethod
+    def build_search_query(match, limit=50, offset=0, highlight=('«', '»'), ids=None):
+        """Construye la consulta de search() para una expresión MATCH; devuelve (sql, params)"""
+        params = [highlight[0], highlight[1], match]
+        ids_filter = ''
+        if ids is not None:
+            ids_filter = f"\n      AND t.id IN ({IDS_SQL})"
+            params.append(json.dumps(sorted(ids)))
+        params.extend((limit, offset))
+        return SEARCH_SQL.format(ids_filter=ids_filter), params
+
+    @staticmethod
+    def build_match_query(text):
+        """Convierte texto libre en una expresión MATCH de FTS5 segura"""
+        terms = re.findall(r'\w+', text or '')
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def explain(self, query, params=()):
+        """
+        Devuelve el plan de ejecución de una consulta.
+
+        Returns:
+            list: Líneas de detalle de EXPLAIN QUERY PLAN.
+        """
+        conn = self.db.connection()
+        return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+
+    def iter_templates(self, batch_size=1000, include_id=False, ids=None):
+        """
+        Recorre las plantillas por id, leyendo batch_size filas cada vez.
+
+        Args:
+            include_id (bool): Añadir el id de la plantilla a cada diccionario.
+            ids (iterable, optional): Ids de las plantillas a recorrer, por
+                ejemplo los de find_template_ids(). Por defecto, todas.
+
+        Yields:
+            dict: Plantilla con name, description, code, category, tags,
+                created_at y updated_at.
+        """
+        conn = self.db.connection()
+        if ids is not None:
+            ids = sorted(ids)
+            for offset in range(0, len(ids), batch_size):
+                chunk = json.dumps(ids[offset:offset + batch_size])
+                for row in conn.execute(EXPORT_IDS_SQL, (chunk,)).fetchall():
+                    yield self._export_record(row, include_id)
+            return
+        last_id = 0
+        while True:
+            rows = conn.execute(EXPORT_SQL, (last_id, batch_size)).fetchall()
+            for row in rows:
+                yield self._export_record(row, include_id)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _export_record(row, include_id):
+        template_id, name, description, code, category, created_at, updated_at, tags = row
+        record = {
+            'name': name,
+            'description': description,
+            'code': code,
+            'category': category,
+            'tags': tags.split(',') if tags else [],
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+        if include_id:
+            record['id'] = template_id
+        return record
+
+    def export_templates(self, path, compression=None):
+        """
+        Exporta todas las plantillas a un archivo JSON Lines.
+
+        Args:
+            path (str): Archivo de destino; .gz o .zst para comprimirlo.
+            compression (str, optional): 'gzip' o 'zstd' si no se deduce de la extensión.
+
+        Returns:
+            int: Número de plantillas exportadas.
+        """
+        return write_records(path, self.iter_templates(), compression)
+
+    def import_templates(self, source, on_conflict='skip', batch_size=500, compression=None):
+        """
+        Importa plantillas en una única transacción, por lotes de executemany.
+
+        Args:
+            source (str | iterable): Ruta de un archivo JSON Lines (comprimido
+                o no) o iterable de diccionarios con el formato de iter_templates().
+            on_conflict (str): Qué hacer si ya existe una plantilla con el mismo
+                nombre: 'skip' la ignora, 'upsert' la sobrescribe y 'rename'
+                la importa como 'nombre (2)', 'nombre (3)'...
+            batch_size (int): Plantillas por lote.
+
+        Returns:
+            dict: Número de plantillas 'added', 'updated', 'renamed' y 'skipped'.
+
+        Raises:
+            ValueError: Si la política no existe o el archivo no es válido;
+                en ese caso no se importa nada.
+        """
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"Política de conflicto desconocida: {on_conflict}")
+        if isinstance(source, str):
+            records = read_records(source, compression)
+        else:
+            records = (check_record(record, number) for number, record in enumerate(source, 1))
+        stats = {'added': 0, 'updated': 0, 'renamed': 0, 'skipped': 0}
+        with self.db.transaction() as conn:
+            next_id = conn.execute('''
+                SELECT MAX(COALESCE((SELECT MAX(id) FROM templates), 0),
+                           COALESCE((SELECT MAX(template_id) FROM template_tags), 0)) + 1
+            ''').fetchone()[0]
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                next_id = self._import_batch(conn, batch, on_conflict, stats, next_id)
+        self.code_cache.clear()
+        self._invalidate_index()
+        return stats
+
+    def _import_batch(self, conn, batch, on_conflict, stats, next_id):
+        existing = self._existing_templates(conn, list({record['name'] for record in batch}))
+        inserts, updates = {}, []
+        new_tags, stale_tags = {}, []
+        blobs, released, revised = {}, set(), set()
+        for record in batch:
+            name = record['name']
+            tags = record.get('tags') or ()
+            tags = {tag.strip() for tag in (tags.split(',') if isinstance(tags, str) else tags) if tag.strip()}
+            blob = pack_code(record['code'])
+            blobs[blob[0]] = blob
+            values = (
+                record.get('description') or '',
+                blob[0],
+                record.get('category') or 'general',
+                record.get('updated_at')
+            )
+            if name in existing:
+                if on_conflict == 'skip':
+                    stats['skipped'] += 1
+                    continue
+                if on_conflict == 'upsert':
+                    template_id, old_tags, old_hash = existing[name]
+                    if template_id in inserts:
+                        created_at = inserts[template_id][5]
+                        inserts[template_id] = (template_id, name) + values[:3] + (created_at, values[3])
+                        new_tags[template_id] = tags
+                    else:
+                        updates.append(values + (template_id,))
+                        if old_hash != blob[0]:
+                            released.add(old_hash)
+                            revised.add(template_id)
+                        if tags != old_tags:
+                            stale_tags.append((template_id,))
+                            new_tags[template_id] = tags
+                    existing[name] = (template_id, tags, blob[0])
+                    stats['updated'] += 1
+                    continue
+                name = self._free_name(conn, name, existing)
+                stats['renamed'] += 1
+            else:
+                stats['added'] += 1
+            template_id = next_id
+            next_id += 1
+            inserts[template_id] = (template_id, name) + values[:3] + (record.get('created_at'), values[3])
+            new_tags[template_id] = tags
+            existing[name] = (template_id, tags, blob[0])
+
+        conn.executemany(STORE_BLOB_SQL, blobs.values())
+        if stale_tags:
+            conn.executemany("DELETE FROM template_tags WHERE template_id = ?", stale_tags)
+        conn.executemany(
+            "INSERT INTO template_tags (template_id, tag) VALUES (?, ?)",
+            [(template_id, tag) for template_id, tags in new_tags.items() for tag in tags]
+        )
+        conn.executemany(IMPORT_INSERT_SQL, inserts.values())
+        conn.executemany(IMPORT_UPDATE_SQL, updates)
+        conn.executemany(
+            "INSERT INTO template_revisions (template_id, revision, code_hash) VALUES (?, 1, ?)",
+            [(row[0], row[3]) for row in inserts.values()]
+        )
+        conn.executemany('''
+            INSERT INTO template_revisions (template_id, revision, code_hash)
+            SELECT ?, COALESCE(MAX(revision), 0) + 1, ? FROM template_revisions WHERE template_id = ?
+        ''', [(row[4], row[1], row[4]) for row in updates if row[4] in revised])
+        conn.executemany(RELEASE_BLOB_SQL, [(code_hash,) for code_hash in released])
+        return next_id
+
+    @staticmethod
+    def _existing_templates(conn, names):
+        """Devuelve {nombre: (id, set de tags, hash del código)} de las plantillas que ya existen"""
+        placeholders = ', '.join('?' * len(names))
+        rows = conn.execute(f'''
+            SELECT t.name, t.id,
+                   (SELECT GROUP_CONCAT(tt.tag) FROM template_tags tt WHERE tt.template_id = t.id),
+                   t.code_hash
+            FROM templates t
+            WHERE t.name IN ({placeholders})
+        ''', names)
+        return {
+            name: (template_id, set(tags.split(',')) if tags else set(), code_hash)
+            for name, template_id, tags, code_hash in rows
+        }
+
+    @staticmethod
+    def _free_name(conn, name, taken):
+        number = 2
+        while True:
+            candidate = f'{name} ({number})'
+            if candidate not in taken and conn.execute(
+                "SELECT 1 FROM templates WHERE name = ?", (candidate,)
+            ).fetchone() is None:
+                return candidate
+            number += 1
+
+    def storage_report(self):
+        """
+        Resume cuánto espacio ahorra el almacenamiento deduplicado del código.
+
+        Returns:
+            dict: 'templates' y 'blobs' (número de plantillas y de códigos
+                distintos en uso), 'compressed_blobs', 'code_bytes' (lo que
+                ocuparía una copia del código por plantilla), 'stored_bytes'
+                (lo que ocupan esos códigos en code_blobs), 'saved_bytes',
+                'revisions' y 'history_bytes' (lo que ocupa el historial
+                además del código actual).
+        """
+        conn = self.db.connection()
+        templates, code_bytes = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(b.size), 0)
+            FROM templates t
+            INNER JOIN code_blobs b ON b.hash = t.code_hash
+        ''').fetchone()
+        blobs, compressed, stored, history = conn.execute('''
+            SELECT COALESCE(SUM(current), 0),
+                   COALESCE(SUM(current * compressed), 0),
+                   COALESCE(SUM(current * LENGTH(data)), 0),
+                   COALESCE(SUM((1 - current) * LENGTH(data)), 0)
+            FROM (
+                SELECT b.compressed, b.data,
+                       EXISTS (SELECT 1 FROM templates t WHERE t.code_hash = b.hash) AS current
+                FROM code_blobs b
+            )
+        ''').fetchone()
+        revisions, deltas = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(delta)), 0) FROM template_revisions"
+        ).fetchone()
+        return {
+            'templates': templates,
+            'blobs': blobs,
+            'compressed_blobs': compressed,
+            'code_bytes': code_bytes,
+            'stored_bytes': stored,
+            'saved_bytes': code_bytes - stored,
+            'revisions': revisions,
+            'history_bytes': history + deltas
+        }
+
+    def compact(self):
+        """
+        Reconstruye el fichero de la base de datos para liberar el espacio
+        que dejan libre la deduplicación y los borrados.
+
+        Returns:
+            tuple: Tamaño del fichero en bytes (antes, después).
+        """
+        conn = self.db.connection()
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        before = conn.execute('PRAGMA page_count').fetchone()[0] * page_size
+        conn.execute('VACUUM')
+        after = conn.execute('PRAGMA page_count').fetchone()[0] * page_size
+        return before, after
+
+    def close(self):
+        """Cierra las conexiones abiertas con la base de datos"""
+        self.db.close_all()
\ No newline at end of file
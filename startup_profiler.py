@@ -0,0 +1,80 @@
+import builtins
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """
+    Mide el tiempo de cada fase del arranque y de los módulos que importa.
+
+    Durante una fase se sustituye builtins.__import__ para cronometrar cada
+    import que carga un módulo nuevo. De cada módulo se guarda el tiempo
+    propio (descontando los imports anidados) y el acumulado.
+
+    Args:
+        enabled (bool): Si es False, phase() y report() no hacen nada.
+        stream (file, optional): Destino del informe (sys.stderr por defecto).
+    """
+
+    def __init__(self, enabled=True, stream=None):
+        self.enabled = enabled
+        self.stream = stream
+        self.phases = []
+        self.started = time.perf_counter()
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        """Cronometra el bloque como una fase del arranque"""
+        if not self.enabled:
+            yield
+            return
+        imports = {}
+        original_import = builtins.__import__
+
+        def timed_import(module, globals=None, locals=None, fromlist=(), level=0):
+            args = (module, globals, locals, fromlist, level)
+            if level and globals:
+                try:
+                    module = importlib.util.resolve_name('.' * level + module, globals.get('__package__'))
+                except (ImportError, ValueError):
+                    pass
+            if module in sys.modules:
+                return original_import(*args)
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original_import(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                own, total = imports.get(module, (0.0, 0.0))
+                imports[module] = (own + elapsed - nested, total + elapsed)
+
+        builtins.__import__ = timed_import
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            builtins.__import__ = original_import
+            self.phases.append((name, elapsed, imports))
+
+    def report(self, top=5):
+        """Escribe la tabla de fases y los imports más lentos de cada una"""
+        if not self.enabled:
+            return
+        stream = self.stream or sys.stderr
+        total = time.perf_counter() - self.started
+        print("Perfil de arranque", file=stream)
+        print(f"{'fase':<16}{'ms':>10}{'imports ms':>12}", file=stream)
+        for name, elapsed, imports in self.phases:
+            import_time = sum(own for own, _ in imports.values())
+            print(f"{name:<16}{elapsed * 1000:>10.1f}{import_time * 1000:>12.1f}", file=stream)
+            slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+            for module, (own, cumulative) in slowest:
+                print(f"    {module:<28}{own * 1000:>8.1f} ms ({cumulative * 1000:.1f} ms acumulado)", file=stream)
+        print(f"{'total':<16}{total * 1000:>10.1f}", file=stream)
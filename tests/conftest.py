@@ -0,0 +1,9 @@
+import pytest
+
+from models.template_manager import TemplateManager
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TemplateManager(str(tmp_path / 'templates.db'))
+    yield manager
+    manager.close()
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from models.autosave import AutosaveJournal, diff_text
+
+@pytest.mark.parametrize('old, new', [
+    ('', 'hola'),
+    ('hola', ''),
+    ('def f():\n    pass\n', 'def f():\n    return 1\n'),
+    ('aaa', 'aa'),
+    ('abab', 'ababab'),
+    ('x = "ñandú"', 'x = "ñandúes"'),
+    ('inicio fin', 'inicio medio fin'),
+])
+def test_diff_text_round_trip(old, new):
+    start, end, replacement = diff_text(old, new)
+    assert old[:start] + replacement + old[end:] == new
+    # El cambio es mínimo: no incluye el prefijo ni el sufijo comunes
+    assert len(replacement) <= len(new)
+    assert len(replacement) == len(new) - (len(old) - (end - start))
+
+def test_diff_text_of_equal_texts_is_none():
+    assert diff_text('igual', 'igual') is None
+
+def journal_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def save_all(journal, texts):
+    journal.start()
+    for text in texts:
+        journal.submit(text)
+        journal.flush()
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'autosave.journal')
+
+def test_restore_replays_edits(path):
+    journal = AutosaveJournal(path)
+    texts = ['a = 1\n', 'a = 12\n', 'a = 12\nb = 2\n', 'b = 2\n']
+    save_all(journal, texts)
+    entries = journal_lines(path)
+    assert entries[0] == {'op': 'snapshot', 'text': texts[0]}
+    assert [entry['op'] for entry in entries[1:]] == ['edit'] * 3
+
+    restored = AutosaveJournal(path)
+    assert restored.restore() == texts[-1]
+    assert restored.edits == 3
+    journal.close()
+
+def test_restore_after_compaction(path):
+    journal = AutosaveJournal(path, compact_every=3)
+    texts = [f'x = {n}\n' * 3 for n in range(10)]
+    save_all(journal, texts)
+    entries = journal_lines(path)
+    assert entries[0]['op'] == 'snapshot'
+    assert len(entries) < 3
+    assert AutosaveJournal(path).restore() == texts[-1]
+
+    journal.close()
+    assert journal_lines(path) == [{'op': 'snapshot', 'text': texts[-1]}]
+    assert AutosaveJournal(path).restore() == texts[-1]
+
+def test_restore_ignores_a_partially_written_last_record(path):
+    # Como si el proceso muriera a mitad de escribir el tercer registro
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'snapshot', 'text': 'uno\n'}) + '\n')
+        f.write(json.dumps({'op': 'edit', 'start': 4, 'end': 4, 'text': 'dos\n'}) + '\n')
+        f.write('{"op": "edit", "start": 0, "end": 3, "te')
+
+    recovered = AutosaveJournal(path)
+    assert recovered.restore() == 'uno\ndos\n'
+    assert recovered.needs_compaction
+    # Lo siguiente que se guarda reescribe el diario sin la línea rota
+    save_all(recovered, ['uno\ndos\ntres\n'])
+    assert journal_lines(path) == [{'op': 'snapshot', 'text': 'uno\ndos\ntres\n'}]
+    recovered.close()
+    assert AutosaveJournal(path).restore() == 'uno\ndos\ntres\n'
+
+def test_restore_without_journal(path):
+    assert AutosaveJournal(path).restore() is None
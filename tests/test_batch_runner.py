@@ -0,0 +1,111 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from controllers.batch_runner import run_batch, select_templates, summarize, to_json, to_junit
+
+@pytest.fixture
+def library(manager):
+    manager.add_template("Login", "a = 1", category="formularios", tags=["auth"])
+    manager.add_template("login avanzado", "b = 1", category="formularios", tags=["auth", "ttk"])
+    manager.add_template("Registro", "c = 1", category="formularios", tags=["ttk"])
+    manager.add_template("Lienzo", "d = 1", category="graficos", tags=["canvas"])
+    return manager
+
+def selected(manager, **filters):
+    return sorted(template['name'] for template in select_templates(manager, **filters))
+
+@pytest.mark.parametrize('filters, names', [
+    ({}, ["Lienzo", "Login", "Registro", "login avanzado"]),
+    ({'category': "formularios"}, ["Login", "Registro", "login avanzado"]),
+    ({'tag': "ttk"}, ["Registro", "login avanzado"]),
+    ({'category': "formularios", 'tag': "auth"}, ["Login", "login avanzado"]),
+    ({'name': "LOGIN*"}, ["Login", "login avanzado"]),
+    ({'name': "l*", 'tag': "canvas"}, ["Lienzo"]),
+    ({'name': "*", 'page_size': 1}, ["Lienzo", "Login", "Registro", "login avanzado"]),
+    ({'category': "ninguna"}, []),
+])
+def test_select_templates_filters(library, filters, names):
+    assert selected(library, **filters) == names
+
+def test_select_templates_reads_code_only_of_matches(library, monkeypatch):
+    requested = []
+    iter_templates = library.iter_templates
+
+    def spy(**kwargs):
+        requested.append(kwargs.get('ids'))
+        return iter_templates(**kwargs)
+    monkeypatch.setattr(library, 'iter_templates', spy)
+    templates = list(select_templates(library, category="graficos"))
+    assert [template['code'] for template in templates] == ["d = 1"]
+    assert requested == [{templates[0]['id']}]
+
+RESULTS = [
+    {'id': 1, 'name': "Login", 'category': "formularios", 'status': 'passed', 'error_type': None,
+     'message': None, 'trace': [], 'elapsed': 0.0123, 'peak_memory_kb': 40, 'widgets': 5, 'output': ''},
+    {'id': 2, 'name': "Registro", 'category': None, 'status': 'failed', 'error_type': 'NameError',
+     'message': "name 'x' is not defined", 'trace': [(3, "x + 1")], 'elapsed': 0.002,
+     'peak_memory_kb': 12, 'widgets': 0, 'output': 'aviso <stdout>\n'},
+    {'id': 3, 'name': "Lienzo", 'category': "graficos", 'status': 'error', 'error_type': 'WorkerCrash',
+     'message': "El proceso trabajador terminó", 'trace': [], 'elapsed': 0.0,
+     'peak_memory_kb': 0, 'widgets': 0, 'output': ''},
+]
+
+def test_summarize_counts_each_status():
+    assert summarize(RESULTS, 1.5) == {'total': 3, 'passed': 1, 'failed': 1, 'errors': 1, 'elapsed': 1.5}
+
+def test_to_json_round_trip():
+    summary = summarize(RESULTS, 1.5)
+    report = json.loads(to_json(RESULTS, summary))
+    assert report['summary'] == summary
+    assert [result['name'] for result in report['results']] == ["Login", "Registro", "Lienzo"]
+    assert report['results'][1]['trace'] == [[3, "x + 1"]]
+
+def test_to_junit_report():
+    suites = ET.fromstring(to_junit(RESULTS, summarize(RESULTS, 1.5)))
+    suite = suites.find('testsuite')
+    assert suite.attrib == {'name': 'templates', 'tests': '3', 'failures': '1', 'errors': '1', 'time': '1.500'}
+    cases = suite.findall('testcase')
+    assert [(case.get('classname'), case.get('name'), case.get('time')) for case in cases] == [
+        ("templates.formularios", "Login", "0.012"),
+        ("templates.general", "Registro", "0.002"),
+        ("templates.graficos", "Lienzo", "0.000"),
+    ]
+    properties = {prop.get('name'): prop.get('value') for prop in cases[0].find('properties')}
+    assert properties == {'id': '1', 'peak_memory_kb': '40', 'widgets': '5'}
+    assert cases[0].find('failure') is None and cases[0].find('system-out') is None
+    failure = cases[1].find('failure')
+    assert failure.get('type') == 'NameError'
+    assert failure.text == "Línea 3: x + 1"
+    assert cases[1].find('system-out').text == 'aviso <stdout>\n'
+    assert cases[2].find('error').get('type') == 'WorkerCrash'
+
+def has_display():
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+needs_display = pytest.mark.skipif(not has_display(), reason="run_batch necesita un display para Tk")
+
+def job(template_id, body):
+    code = f"def create_window(root):\n    {body}\n"
+    return {'id': template_id, 'name': f"t{template_id}", 'category': None, 'code': code}
+
+@needs_display
+def test_run_batch_reruns_suspects_after_a_worker_crash():
+    templates = [job(1, "pass"), job(2, "import os; os._exit(3)"), job(3, "pass"), job(4, "pass")]
+    results = {result['id']: result for result in run_batch(templates, workers=2, timeout=10)}
+    assert sorted(results) == [1, 2, 3, 4]
+    assert results[2]['status'] == 'error'
+    assert results[2]['error_type'] == 'WorkerCrash'
+    assert all(results[i]['status'] == 'passed' for i in (1, 3, 4))
+
+@needs_display
+def test_run_batch_timeout():
+    results = list(run_batch([job(1, "while True: pass"), job(2, "pass")], workers=1, timeout=0.5))
+    status = {result['id']: (result['status'], result['error_type']) for result in results}
+    assert status == {1: ('failed', 'TemplateTimeout'), 2: ('passed', None)}
@@ -0,0 +1,41 @@
+import linecache
+import os
+
+from controllers.code_cache import CodeCache
+
+def source(i):
+    return f"def create_window(root):\n    return {i}\n"
+
+def test_evicted_sources_leave_linecache():
+    cache = CodeCache(maxsize=2)
+    keys = [cache.key(source(i)) for i in range(5)]
+    for i in range(5):
+        cache.compile(source(i))
+    registered = [CodeCache.filename(key) in linecache.cache for key in keys]
+    assert registered == [False, False, False, True, True]
+    cache.clear()
+    assert not any(CodeCache.filename(key) in linecache.cache for key in keys)
+
+def test_syntax_errors_are_not_registered():
+    cache = CodeCache(maxsize=2)
+    broken = "def create_window(root:\n"
+    try:
+        cache.compile(broken)
+    except SyntaxError:
+        pass
+    assert CodeCache.filename(cache.key(broken)) not in linecache.cache
+
+def test_disk_cache_is_pruned(tmp_path):
+    cache = CodeCache(maxsize=2, cache_dir=str(tmp_path), max_disk_entries=3)
+    for i in range(6):
+        cache.compile(source(i))
+    remaining = os.listdir(tmp_path)
+    assert len(remaining) == 3
+
+    kept = next(i for i in range(6) if f'{cache.key(source(i))}.bin' in remaining)
+    reopened = CodeCache(maxsize=2, cache_dir=str(tmp_path))
+    code, origin = reopened.compile(source(kept))
+    assert origin == 'disco'
+    namespace = {}
+    exec(code, namespace)
+    assert namespace['create_window'](None) == kept
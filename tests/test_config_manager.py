@@ -0,0 +1,104 @@
+import gc
+import json
+import os
+import weakref
+
+import pytest
+
+from models import config_manager
+from models.config_manager import ConfigManager
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'config.json')
+
+def test_sets_are_written_together_after_the_delay(path):
+    config = ConfigManager(path, write_delay=0.05)
+    for size in range(10, 20):
+        config.set('font_size', size)
+    assert config.writes == 0
+    assert not os.path.exists(path)
+    config._timer.join()
+    assert config.writes == 1
+    assert read(path)['font_size'] == 19
+    config.close()
+
+def test_write_delay_none_writes_every_set(path):
+    config = ConfigManager(path, write_delay=None)
+    config.set('font_size', 11)
+    config.set('font_size', 12)
+    config.set('font_size', 12)
+    assert config.writes == 2
+    assert read(path)['font_size'] == 12
+    config.close()
+
+def test_transaction_writes_once_on_exit(path):
+    config = ConfigManager(path, write_delay=None)
+    with config.transaction():
+        config.set('theme', 'dark')
+        with config.transaction():
+            config.set('font_size', 14)
+        assert config.writes == 0
+    assert config.writes == 1
+    assert read(path)['theme'] == 'dark'
+    assert read(path)['font_size'] == 14
+    config.close()
+
+def test_mutated_container_passed_back_is_written(path):
+    config = ConfigManager(path, write_delay=None)
+    recent = config.get('recent_files')
+    recent.append('ventana.py')
+    config.set('recent_files', recent)
+    assert read(path)['recent_files'] == ['ventana.py']
+    # Igual que lo ya escrito: no se vuelve a escribir
+    config.set('recent_files', ['ventana.py'])
+    assert config.writes == 1
+    config.close()
+
+def test_failed_write_keeps_the_old_file(path, monkeypatch):
+    config = ConfigManager(path, write_delay=None)
+    config.set('theme', 'dark')
+
+    def fail(src, dst):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(os, 'replace', fail)
+    config.set('theme', 'light')
+    monkeypatch.undo()
+
+    assert read(path)['theme'] == 'dark'
+    assert config.dirty
+    assert os.listdir(os.path.dirname(path)) == ['config.json']
+    config.flush()
+    assert read(path)['theme'] == 'light'
+    config.close()
+
+def test_corrupt_file_is_set_aside(path):
+    with open(path, 'w') as f:
+        f.write('{"theme": "dark",')
+    config = ConfigManager(path, write_delay=None)
+    assert config.get('theme') == 'light'
+    with open(f'{path}.corrupt') as f:
+        assert f.read() == '{"theme": "dark",'
+    config.set('theme', 'dark')
+    assert read(path)['theme'] == 'dark'
+    config.close()
+
+def test_open_managers_are_not_kept_alive(path):
+    config = ConfigManager(path)
+    ref = weakref.ref(config)
+    assert config in config_manager._open_managers
+    del config
+    gc.collect()
+    assert ref() is None
+
+def test_pending_changes_are_flushed_at_exit(path):
+    config = ConfigManager(path, write_delay=60)
+    config.set('theme', 'dark')
+    config_manager._flush_open_managers()
+    assert read(path)['theme'] == 'dark'
+    config.close()
+    assert config not in config_manager._open_managers
@@ -0,0 +1,36 @@
+import threading
+
+from models.database import ConnectionManager
+
+def test_read_then_write_waits_for_other_writers(tmp_path):
+    path = str(tmp_path / 'test.db')
+    first = ConnectionManager(path)
+    second = ConnectionManager(path)
+    first.connection().execute('CREATE TABLE items (value INTEGER)')
+    reading = threading.Event()
+    errors = []
+
+    def read_then_write():
+        try:
+            with first.transaction() as conn:
+                count = conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+                reading.set()
+                threading.Event().wait(0.2)
+                conn.execute('INSERT INTO items VALUES (?)', (count,))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            reading.set()
+
+    worker = threading.Thread(target=read_then_write)
+    worker.start()
+    reading.wait()
+    with second.transaction() as conn:
+        conn.execute('INSERT INTO items VALUES (100)')
+    worker.join()
+
+    assert errors == []
+    rows = second.connection().execute('SELECT value FROM items ORDER BY rowid').fetchall()
+    assert rows == [(0,), (100,)]
+    first.close_all()
+    second.close_all()
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from controllers.diagnostics import DiagnosticsService, split_statements
+
+SOURCE = '''import os
+import sys
+
+def helper():
+    return sys.argv
+
+def create_window(root):
+    label = etiqueta + 1
+    return label
+'''
+
+def messages(diagnostics):
+    return [(d['severity'], d['line'], d['message']) for d in diagnostics]
+
+@pytest.fixture
+def service():
+    service = DiagnosticsService()
+    yield service
+    service.close()
+
+def test_split_statements_by_top_level_lines():
+    assert [line for line, _, _ in split_statements(SOURCE)] == [1, 2, 4, 7]
+
+@pytest.mark.parametrize('source, line', [
+    ('def create_window(root):\n    x = 1 +\n', 2),
+    ('import tkinter as tk\n\ndef create_window(root):\n    tk.Label(root, text="a"\n', 4),
+    ('def create_window(root):\n    pass\n\ndef f(:\n    pass\n', 4),
+])
+def test_syntax_error_location(service, source, line):
+    diagnostics = service.analyze(source)
+    assert len(diagnostics) == 1
+    assert diagnostics[0]['severity'] == 'error'
+    assert diagnostics[0]['line'] == line
+
+def test_undefined_name(service):
+    diagnostics = service.analyze(SOURCE)
+    undefined = [d for d in diagnostics if 'etiqueta' in d['message']]
+    assert messages(undefined) == [('error', 8, "Nombre 'etiqueta' no definido")]
+    assert (undefined[0]['col'], undefined[0]['end_col']) == (12, 20)
+
+def test_names_bound_anywhere_in_the_module_are_defined(service):
+    source = '''def create_window(root):
+    return [valor * n for n in range(3)] + [global_tardio]
+
+valor = 2
+global_tardio = len
+'''
+    assert service.analyze(source) == []
+
+def test_unused_import(service):
+    diagnostics = service.analyze(SOURCE)
+    unused = [d for d in diagnostics if d['severity'] == 'warning']
+    assert messages(unused) == [('warning', 1, "'os' se importa pero no se usa")]
+    # Antes de 3.10 los alias no tienen posición y se subraya desde el import
+    assert unused[0]['end_col'] == 9
+
+def test_create_window_checks(service):
+    assert messages(service.analyze('x = 1\n')) == [
+        ('error', None, "El código debe contener una función llamada 'create_window'")
+    ]
+    diagnostics = service.analyze('def create_window():\n    pass\n')
+    assert [(d['severity'], d['line']) for d in diagnostics] == [('error', 1)]
+
+def test_cache_reuse_after_editing_one_function(service):
+    service.analyze(SOURCE)
+    assert service.last_statements == service.last_analyzed == 4
+
+    edited = SOURCE.replace('etiqueta + 1', 'etiqueta + 2')
+    diagnostics = service.analyze(edited)
+    assert service.last_statements == 4
+    assert service.last_analyzed == 1
+    assert messages(diagnostics) == messages(service.analyze(SOURCE))
+
+    # Una sentencia nueva desplaza los diagnósticos de las siguientes sin
+    # volver a analizarlas
+    shifted = service.analyze(SOURCE.replace('def create_window', 'VALOR = 1\ndef create_window'))
+    assert service.last_analyzed == 1
+    assert [d['line'] for d in shifted] == [1, 9]
+
+def test_submit_and_poll_return_the_latest_source(service):
+    service.submit('x = 1\n', tag=1)
+    service.submit(SOURCE, tag=2)
+    deadline = time.monotonic() + 5
+    result = None
+    while result is None and time.monotonic() < deadline:
+        result = service.poll()
+        time.sleep(0.01)
+    assert result is not None
+    tag, diagnostics = result
+    assert tag == 2
+    assert messages(diagnostics) == messages(service.analyze(SOURCE))
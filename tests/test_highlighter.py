@@ -0,0 +1,136 @@
+import re
+
+import pytest
+
+from views.highlighter import SyntaxHighlighter, tokenize_line, unclosed_triple_quote
+
+@pytest.mark.parametrize('line, opener, start', [
+    ('x = """abc', '"""', 4),
+    ("x = '''abc", "'''", 4),
+    ('x = r"""abc', 'r"""', 4),
+    ("doc = Rb'''abc", "Rb'''", 6),
+    ('"""', '"""', 0),
+    ('a = "x" + """abc', '"""', 10),
+])
+def test_unclosed_triple_quote_carries_opener(line, opener, start):
+    spans, end_state = tokenize_line(line)
+    assert end_state == opener
+    assert ('hl_string', start, len(line)) in spans
+
+@pytest.mark.parametrize('line', [
+    'a = """abc""" + 1',
+    '# """ en un comentario',
+    "s = 'a\\'\"\"\"'",
+    'x = 1',
+])
+def test_closed_strings_leave_no_state(line):
+    assert tokenize_line(line)[1] is None
+    assert unclosed_triple_quote(line) is None
+
+def test_line_inside_string_closes_it():
+    spans, end_state = tokenize_line('    fin""" + 1', 'r"""')
+    assert end_state is None
+    assert spans[0] == ('hl_string', 0, 10)
+    assert ('hl_number', 13, 14) in spans
+
+def test_line_inside_string_stays_open():
+    spans, end_state = tokenize_line('sigue dentro', "f'''")
+    assert end_state == "f'''"
+    assert spans == (('hl_string', 0, len('sigue dentro')),)
+
+class _Highlighter(SyntaxHighlighter):
+    """Sin widget: sólo las cachés por línea"""
+
+    def __init__(self, line_count):
+        self._line_count = line_count
+        self.states = [None] * line_count
+        self.spans = [(('hl_builtin', 0, 5),)] * line_count
+        self.dirty = set()
+
+    def _line_of(self, index):
+        return self._line_count
+
+    def schedule(self):
+        pass
+
+def test_joining_lines_forgets_spans_of_the_first():
+    highlighter = _Highlighter(3)
+    highlighter._line_count = 2
+    highlighter._lines_changed(1, 2, 0)
+    assert highlighter.spans[0] is None
+    assert 1 in highlighter.dirty
+
+def test_editing_one_line_keeps_its_spans():
+    highlighter = _Highlighter(3)
+    highlighter._lines_changed(2, 2, 0)
+    assert highlighter.spans[1] is not None
+
+class _BufferHighlighter(SyntaxHighlighter):
+    """Sin widget: un texto en memoria con índices 'l.c', 'end-1c' y desplazamientos '+1c'/'-1c'"""
+
+    def __init__(self, text):
+        self.buffer = text
+        self.resyncs = 0
+        self.delay = 0
+        SyntaxHighlighter.resync(self)
+        self.resyncs = 0
+        self.dirty = set()
+
+    def _offset(self, index):
+        if index == 'end-1c':
+            return len(self.buffer)
+        position, *shifts = re.split(r'(?=[+-])', index)
+        line, column = (int(part) for part in position.split('.'))
+        offset = sum(len(text) + 1 for text in self.buffer.split('\n')[:line - 1]) + column
+        for shift in shifts:
+            offset = max(0, min(offset + int(shift[:-1]), len(self.buffer)))
+        return offset
+
+    def _call(self, operation, *args):
+        if operation == 'index':
+            offset = self._offset(args[0])
+            line_start = self.buffer.rfind('\n', 0, offset) + 1
+            return f"{self.buffer.count(chr(10), 0, offset) + 1}.{offset - line_start}"
+        if operation == 'delete':
+            start = self._offset(args[0])
+            end = self._offset(args[1]) if len(args) > 1 else start + 1
+            self.buffer = self.buffer[:start] + self.buffer[end:]
+        if operation == 'edit':
+            # Tk 8.7: deshacer devuelve los rangos modificados
+            self.buffer, ranges = self.undo
+            return ranges
+        return ''
+
+    def resync(self):
+        self.resyncs += 1
+        SyntaxHighlighter.resync(self)
+
+    def schedule(self):
+        pass
+
+# Supr al final de la línea 1 y Retroceso al principio de la línea 2
+@pytest.mark.parametrize('index', ['1.5', '2.0-1c'])
+def test_one_index_delete_joins_lines_incrementally(index):
+    highlighter = _BufferHighlighter('x = 1\ny = 2\nz = 3')
+    highlighter._dispatch('delete', index)
+    assert highlighter.buffer == 'x = 1y = 2\nz = 3'
+    assert highlighter.resyncs == 0
+    assert highlighter.dirty == {1}
+    assert len(highlighter.states) == highlighter._line_count == 2
+
+def test_one_index_delete_inside_a_line():
+    highlighter = _BufferHighlighter('x = 1\ny = 2')
+    highlighter._dispatch('delete', '2.0')
+    assert highlighter.buffer == 'x = 1\n = 2'
+    assert highlighter.resyncs == 0
+    assert highlighter.dirty == {2}
+
+@pytest.mark.parametrize('ranges, resyncs', [(('1.5', '2.0'), 0), ('', 1)])
+def test_undo_updates_only_the_returned_range(ranges, resyncs):
+    highlighter = _BufferHighlighter('x = 1y = 2\nz = 3')
+    highlighter.undo = ('x = 1\ny = 2\nz = 3', ranges)
+    highlighter._dispatch('edit', 'undo')
+    assert highlighter.resyncs == resyncs
+    assert len(highlighter.states) == highlighter._line_count == 3
+    if not resyncs:
+        assert highlighter.dirty == {1, 2}
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from controllers.loop_monitor import BUCKET_BOUNDS, LatencyHistogram, LoopMonitor
+
+def bucket_of(histogram, value_ms):
+    histogram.reset()
+    histogram.record(value_ms)
+    return histogram.counts.index(1)
+
+def test_bucket_bounds_grow_by_a_quarter():
+    assert BUCKET_BOUNDS[0] == pytest.approx(0.1)
+    assert all(high / low == pytest.approx(1.25) for low, high in zip(BUCKET_BOUNDS, BUCKET_BOUNDS[1:]))
+    assert 8_000 < BUCKET_BOUNDS[-1] < 12_500
+
+@pytest.mark.parametrize('value, bucket', [
+    (0.0, 0),
+    (1.0, 0),
+    (1.0001, 1),
+    (2.0, 1),
+    (2.5, 2),
+    (5.0, 2),
+    (10.0, 3),
+    (10.5, 4),
+])
+def test_bounds_are_inclusive_upper_limits(value, bucket):
+    assert bucket_of(LatencyHistogram(bounds=(1.0, 2.0, 5.0, 10.0)), value) == bucket
+
+def test_default_bounds_edges():
+    histogram = LatencyHistogram()
+    assert bucket_of(histogram, BUCKET_BOUNDS[0]) == 0
+    assert bucket_of(histogram, BUCKET_BOUNDS[10]) == 10
+    assert bucket_of(histogram, BUCKET_BOUNDS[10] * 1.001) == 11
+    assert bucket_of(histogram, 60_000) == len(BUCKET_BOUNDS)
+
+def test_percentiles_on_known_samples():
+    histogram = LatencyHistogram(bounds=(1.0, 2.0, 5.0, 10.0))
+    for value in [0.5] * 50 + [1.5] * 40 + [4.0] * 9 + [7.0]:
+        histogram.record(value)
+    assert histogram.count == 100
+    assert histogram.counts == [50, 40, 9, 1, 0]
+    assert histogram.percentile(50) == 1.0
+    assert histogram.percentile(51) == 2.0
+    assert histogram.percentile(90) == 2.0
+    assert histogram.percentile(99) == 5.0
+    # El último percentil no supera la mayor muestra vista
+    assert histogram.percentile(100) == 7.0
+    assert histogram.max == 7.0
+
+def test_overflow_percentile_is_the_maximum():
+    histogram = LatencyHistogram(bounds=(1.0, 2.0))
+    for value in (0.5, 30.0, 80.0):
+        histogram.record(value)
+    assert histogram.percentile(99) == 80.0
+
+def test_percentiles_within_a_quarter_of_the_true_value():
+    histogram = LatencyHistogram()
+    samples = [0.37 * 1.07 ** k for k in range(100)]
+    for value in samples:
+        histogram.record(value)
+    for p in (50, 99):
+        exact = sorted(samples)[int(len(samples) * p / 100) - 1]
+        assert exact <= histogram.percentile(p) <= exact * 1.25
+
+def test_empty_and_reset():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+    histogram.record(3.0)
+    histogram.reset()
+    assert (histogram.count, histogram.max, histogram.percentile(99)) == (0, 0.0, 0.0)
+    assert not any(histogram.counts)
+
+class _StubWidget:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+        return f'after#{len(self.scheduled)}'
+
+    def after_cancel(self, after_id):
+        pass
+
+def test_late_beat_counts_as_stall():
+    stalls = []
+    monitor = LoopMonitor(_StubWidget(), interval_ms=10, stall_ms=100, on_stall=stalls.append)
+    monitor.running = True
+    monitor._due = time.perf_counter() - 0.25
+    monitor._beat()
+    monitor._due = time.perf_counter() + 1
+    monitor._beat()
+    stats = monitor.stats()
+    assert (stats['beats'], stats['stalls']) == (2, 1)
+    assert stalls[0]['delay_ms'] >= 250 and stalls[0]['stack'] is None
+    assert stats['max_ms'] == stalls[0]['delay_ms']
+    assert len(monitor.widget.scheduled) == 2
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from models.migrations import MIGRATIONS, get_schema_version, latest_version, migrate
+from models.template_manager import TemplateManager
+
+def create_legacy_db(path):
+    """Base de datos con el esquema original (versión 0), anterior a las migraciones"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE templates (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            code TEXT NOT NULL,
+            category TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE template_tags (
+            template_id INTEGER,
+            tag TEXT,
+            FOREIGN KEY (template_id) REFERENCES templates (id),
+            PRIMARY KEY (template_id, tag)
+        );
+        INSERT INTO templates (id, name, description, code, category) VALUES
+            (1, 'Ventana', 'Una ventana vacía', 'import tkinter as tk', 'general'),
+            (2, 'Copia', 'Mismo código', 'import tkinter as tk', 'general'),
+            (3, 'Botón', 'Un botón', 'button = tk.Button()', 'widgets');
+        INSERT INTO template_tags VALUES (1, 'básico'), (3, 'botones');
+    ''')
+    conn.close()
+
+def test_legacy_database_is_migrated_in_place(tmp_path):
+    path = str(tmp_path / 'templates.db')
+    create_legacy_db(path)
+    manager = TemplateManager(path)
+    try:
+        conn = manager.db.connection()
+        assert get_schema_version(conn) == latest_version()
+        assert manager.get_template_code(2) == 'import tkinter as tk'
+        assert manager.get_template_code(3) == 'button = tk.Button()'
+        # El código repetido se guarda una sola vez
+        assert conn.execute('SELECT COUNT(*) FROM code_blobs').fetchone()[0] == 2
+        assert [row[0] for row in manager.list_revisions(1)] == [1]
+        assert {row[0] for row in manager.search('botones')} == {3}
+        assert manager.find_template_ids(['básico']) == {1}
+    finally:
+        manager.close()
+
+def test_migrate_is_idempotent(manager):
+    assert migrate(manager.db) == []
+    assert get_schema_version(manager.db.connection()) == latest_version()
+
+def test_failed_migration_is_rolled_back(manager):
+    def fail(conn):
+        raise RuntimeError("migración rota")
+    broken = MIGRATIONS + [(latest_version() + 1, 'Rota', [
+        'CREATE TABLE migration_probe (id INTEGER)',
+        fail
+    ])]
+    with pytest.raises(RuntimeError):
+        migrate(manager.db, broken)
+    conn = manager.db.connection()
+    assert get_schema_version(conn) == latest_version()
+    assert conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'migration_probe'"
+    ).fetchone()[0] == 0
@@ -0,0 +1,150 @@
+import threading
+
+from views.output_pipe import OutputPipe
+
+class _StubText:
+    """Text mínimo: contenido en memoria, inserciones registradas y after() manual"""
+
+    def __init__(self, at_end=True):
+        self.content = ''
+        self.inserts = []
+        self.seen = []
+        self.scheduled = {}
+        self.at_end = at_end
+
+    def insert(self, index, data, tags=()):
+        assert index == 'end'
+        self.inserts.append((data, tags))
+        self.content += data
+
+    def index(self, index):
+        assert index == 'end-1c'
+        lines = self.content.split('\n')
+        return f'{len(lines)}.{len(lines[-1])}'
+
+    def delete(self, first, last):
+        if last == 'end':
+            self.content = ''
+            return
+        assert first == '1.0'
+        line = int(last.split('.')[0])
+        self.content = self.content.split('\n', line - 1)[-1]
+
+    def yview(self):
+        return (0.0, 1.0 if self.at_end else 0.5)
+
+    def see(self, index):
+        self.seen.append(index)
+
+    def after(self, ms, callback):
+        after_id = f'after#{len(self.scheduled)}'
+        self.scheduled[after_id] = (ms, callback)
+        return after_id
+
+    def after_cancel(self, after_id):
+        del self.scheduled[after_id]
+
+def numbered(first, last):
+    return ''.join(f'{n}\n' for n in range(first, last + 1))
+
+def test_consecutive_writes_with_the_same_tag_are_one_insert():
+    widget = _StubText()
+    pipe = OutputPipe(widget)
+    out, err = pipe.stream(), pipe.stream('stderr')
+    out.write('a\n')
+    out.write('b\n')
+    err.write('fallo\n')
+    err.write('traza\n')
+    out.write('c\n')
+    pipe.flush()
+    assert widget.inserts == [('a\nb\n', ()), ('fallo\ntraza\n', 'stderr'), ('c\n', ())]
+    assert widget.seen == ['end']
+    pipe.flush()
+    assert len(widget.inserts) == 3
+
+def test_no_autoscroll_when_scrolled_up():
+    widget = _StubText(at_end=False)
+    pipe = OutputPipe(widget)
+    pipe.write('x\n')
+    pipe.flush()
+    assert widget.seen == []
+
+def test_buffer_keeps_only_the_newest_lines():
+    widget = _StubText()
+    pipe = OutputPipe(widget, max_lines=5)
+    pipe.write(numbered(1, 3))
+    pipe.write(numbered(4, 6), 'stderr')
+    pipe.write(numbered(7, 8))
+    assert pipe.buffered_lines == 5
+    assert pipe.dropped_lines == 3
+    pipe.flush()
+    assert widget.inserts == [
+        ('… 3 líneas descartadas\n', 'trimmed'),
+        ('4\n5\n6\n', 'stderr'),
+        ('7\n8\n', ()),
+    ]
+    assert (pipe.buffered_lines, pipe.dropped_lines) == (0, 0)
+
+def test_single_write_longer_than_the_cap_is_cut():
+    widget = _StubText()
+    pipe = OutputPipe(widget, max_lines=4)
+    pipe.write(numbered(1, 10))
+    assert pipe.dropped_lines == 6
+    assert [data for data, _, _ in pipe.chunks] == [numbered(7, 10)]
+
+def test_widget_is_trimmed_from_the_top():
+    widget = _StubText()
+    pipe = OutputPipe(widget, max_lines=5)
+    pipe.write(numbered(1, 4))
+    pipe.flush()
+    pipe.write(numbered(5, 7))
+    pipe.flush()
+    assert widget.content == numbered(4, 7)
+    assert widget.index('end-1c') == '5.0'
+    pipe.write('8\n9\n10\n11\n12\n13\n')
+    pipe.flush()
+    # El aviso de líneas descartadas también ocupa una línea y se recorta
+    assert widget.inserts[-2] == ('… 1 líneas descartadas\n', 'trimmed')
+    assert widget.content == numbered(10, 13)
+
+def test_tick_flushes_and_reschedules():
+    widget = _StubText()
+    pipe = OutputPipe(widget, interval=20)
+    pipe.start()
+    pipe.start()
+    assert len(widget.scheduled) == 1
+    (ms, tick), = widget.scheduled.values()
+    assert ms == 20
+    pipe.write('hola\n')
+    tick()
+    assert widget.content == 'hola\n'
+    assert pipe._after_id in widget.scheduled
+    pipe.stop()
+    assert pipe._after_id is None
+
+def test_writes_from_threads_are_not_lost():
+    widget = _StubText()
+    pipe = OutputPipe(widget, max_lines=100_000)
+
+    def writer(tag):
+        for n in range(500):
+            pipe.write(f'{n}\n', tag)
+    threads = [threading.Thread(target=writer, args=(tag,)) for tag in (None, 'stderr', None, 'stderr')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pipe.flush()
+    assert widget.content.count('\n') == 2000
+
+def test_clear_discards_pending_and_shown_text():
+    widget = _StubText()
+    pipe = OutputPipe(widget, max_lines=2)
+    pipe.write('a\n')
+    pipe.flush()
+    pipe.write('b\nc\nd\n')
+    pipe.clear()
+    assert widget.content == ''
+    assert (pipe.buffered_lines, pipe.dropped_lines, len(pipe.chunks)) == (0, 0, 0)
+    pipe.flush()
+    assert widget.inserts == [('a\n', ())]
@@ -0,0 +1,50 @@
+"""
+Comprueba con EXPLAIN QUERY PLAN que las consultas de TemplateManager usan
+los índices creados por las migraciones, sin recorrer tablas completas.
+"""
+import pytest
+
+from models.template_manager import (
+    ALL_TEMPLATES_SQL, TEMPLATES_BY_CATEGORY_SQL, TEMPLATES_BY_TAG_SQL, TemplateManager
+)
+
+# Consulta -> ((sql, parámetros), texto que debe aparecer en su plan)
+EXPECTED_QUERY_PLANS = {
+    'get_all_templates': ((ALL_TEMPLATES_SQL, ()), 'idx_templates_updated_at'),
+    'get_all_templates(category)': ((TEMPLATES_BY_CATEGORY_SQL, ('general',)), 'idx_templates_category'),
+    'get_templates_by_tag': ((TEMPLATES_BY_TAG_SQL, ('tag',)), 'idx_template_tags_tag'),
+    'list_templates_page': (
+        TemplateManager.build_page_query(), 'idx_templates_updated_at'
+    ),
+    'list_templates_page(after)': (
+        TemplateManager.build_page_query(after=('9999', 0)), 'idx_templates_updated_at (updated_at<?)'
+    ),
+    'list_templates_page(category, after)': (
+        TemplateManager.build_page_query(after=('9999', 0), category='general'),
+        'idx_templates_category (category=? AND updated_at<?)'
+    ),
+    'list_templates_page(ids)': (
+        TemplateManager.build_page_query(ids={1, 2, 3}), 'INTEGER PRIMARY KEY (rowid=?)'
+    ),
+    'search': (
+        TemplateManager.build_search_query(TemplateManager.build_match_query('ventana')),
+        'templates_fts VIRTUAL TABLE INDEX 0:M'
+    ),
+    'search(ids)': (
+        TemplateManager.build_search_query(TemplateManager.build_match_query('ventana'), ids={1, 2}),
+        'templates_fts VIRTUAL TABLE INDEX 0:M'
+    )
+}
+
+@pytest.mark.parametrize('name', sorted(EXPECTED_QUERY_PLANS))
+def test_query_uses_index(manager, name):
+    (query, params), expected = EXPECTED_QUERY_PLANS[name]
+    plan = manager.explain(query, params)
+    assert any(expected in detail for detail in plan), plan
+    # Ningún recorrido completo de templates sin índice
+    assert not any(detail in ('SCAN t', 'SCAN templates') for detail in plan), plan
+
+def test_search_joins_templates_by_rowid(manager):
+    match = TemplateManager.build_match_query('ventana')
+    plan = manager.explain(*TemplateManager.build_search_query(match, ids={1}))
+    assert 'SEARCH t USING INTEGER PRIMARY KEY (rowid=?)' in plan
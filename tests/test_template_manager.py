@@ -0,0 +1,209 @@
+import pytest
+
+from models.revisions import SNAPSHOT_INTERVAL
+from models.template_manager import TemplateManager
+
+def search_ids(manager, text):
+    return {row[0] for row in manager.search(text)}
+
+def fts_integrity_check(manager):
+    # Con contenido externo, compara el índice con la vista template_documents
+    manager.db.connection().execute(
+        "INSERT INTO templates_fts (templates_fts, rank) VALUES ('integrity-check', 1)"
+    )
+
+def test_search_filters_ids_before_paginating(manager):
+    ids = [manager.add_template(f"ventana {i}", "import tkinter as tk\n") for i in range(30)]
+    wanted = set(ids[-5:])
+    # Todas las coincidencias permitidas, aunque sin filtro estén en páginas posteriores
+    first = manager.search("ventana", limit=5, offset=0, ids=wanted)
+    assert {row[0] for row in first} == wanted
+    assert manager.search("ventana", limit=5, offset=5, ids=wanted) == []
+    assert manager.search("ventana", limit=50, ids=set()) == []
+    assert len(manager.search("ventana", limit=50)) == 30
+
+def test_fts_triggers_follow_every_change(manager):
+    template_id = manager.add_template("Ventana", "root.title('hola')", "Descripción", tags=["inicio"])
+    assert search_ids(manager, "ventana") == {template_id}
+    assert search_ids(manager, "inicio") == {template_id}
+
+    manager.update_template(template_id, name="Diálogo", code="messagebox.showinfo()")
+    assert search_ids(manager, "ventana") == set()
+    assert search_ids(manager, "hola") == set()
+    assert search_ids(manager, "dialogo") == {template_id}
+    assert search_ids(manager, "showinfo") == {template_id}
+
+    manager.retag([template_id], add=["avisos"], remove=["inicio"])
+    assert search_ids(manager, "inicio") == set()
+    assert search_ids(manager, "avisos") == {template_id}
+    fts_integrity_check(manager)
+
+    manager.delete_template(template_id)
+    assert search_ids(manager, "dialogo") == set()
+    fts_integrity_check(manager)
+
+def test_revisions_rebuild_every_version(manager):
+    versions = [f"x = {i}\n" + "print(x)\n" * 20 for i in range(SNAPSHOT_INTERVAL + 5)]
+    template_id = manager.add_template("Historial", versions[0])
+    for code in versions[1:]:
+        manager.update_template(template_id, code=code)
+
+    revisions = manager.list_revisions(template_id)
+    assert [row[0] for row in revisions] == list(range(len(versions), 0, -1))
+    snapshots = sorted(row[0] for row in revisions if row[2])
+    assert snapshots == [1, SNAPSHOT_INTERVAL + 1]
+    for revision, code in enumerate(versions, 1):
+        assert manager.get_revision_code(template_id, revision) == code
+    assert manager.get_revision_code(template_id, len(versions) + 1) is None
+
+    assert "-x = 0" in manager.diff_revisions(template_id, 1)
+    manager.restore_revision(template_id, 1)
+    assert manager.get_template_code(template_id) == versions[0]
+    assert manager.list_revisions(template_id)[0][0] == len(versions) + 1
+
+def test_batch_rollback_discards_changes_and_events(manager):
+    kept = manager.add_template("Fuera", "a = 1", tags=["viejo"])
+    events = []
+    manager.subscribe(events.append)
+    report = manager.storage_report()
+
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.add_template("Dentro", "b = 2", tags=["nuevo"])
+            manager.update_template(kept, code="a = 2", tags=["nuevo"])
+            raise RuntimeError("abortar")
+
+    assert events == []
+    assert manager.get_template_code(kept) == "a = 1"
+    assert manager.find_template_ids(["nuevo"]) == set()
+    assert manager.find_template_ids(["viejo"]) == {kept}
+    assert search_ids(manager, "dentro") == set()
+    assert manager.storage_report() == report
+
+def test_nested_batch_rollback_keeps_outer_changes(manager):
+    with manager.batch():
+        outer = manager.add_template("Exterior", "a = 1", tags=["fuera"])
+        with pytest.raises(RuntimeError):
+            with manager.batch():
+                manager.add_template("Interior", "b = 2", tags=["dentro"])
+                raise RuntimeError("abortar")
+
+    assert search_ids(manager, "exterior") == {outer}
+    assert search_ids(manager, "interior") == set()
+    assert manager.find_template_ids(["fuera"]) == {outer}
+    assert manager.find_template_ids(["dentro"]) == set()
+
+def test_update_missing_template_stores_nothing(manager):
+    manager.add_template("Existente", "a = 1")
+    report = manager.storage_report()
+    events = []
+    manager.subscribe(events.append)
+
+    manager.update_template(999, code="codigo = 'huérfano'\n", tags=["fantasma"])
+
+    assert manager.storage_report() == report
+    assert manager.find_template_ids(["fantasma"]) == set()
+    assert events == []
+
+def test_code_cache_sees_writes_from_other_connections(manager):
+    template_id = manager.add_template("Compartida", "a = 1")
+    assert manager.get_template_code(template_id) == "a = 1"
+
+    other = TemplateManager(manager.db_file)
+    try:
+        other.update_template(template_id, code="a = 2")
+    finally:
+        other.close()
+    assert manager.get_template_code(template_id) == "a = 2"
+
+def templates_by_name(manager):
+    return {record['name']: record for record in manager.iter_templates(include_id=True)}
+
+def test_import_skip_keeps_existing_templates(manager):
+    manager.add_template("Ventana", "a = 1", tags=["viejo"])
+    stats = manager.import_templates([
+        {'name': "Ventana", 'code': "a = 2", 'tags': ["nuevo"]},
+        {'name': "Botón", 'code': "b = 1", 'tags': "widgets, botones"},
+    ], on_conflict='skip')
+    assert stats == {'added': 1, 'updated': 0, 'renamed': 0, 'skipped': 1}
+    templates = templates_by_name(manager)
+    assert templates["Ventana"]['code'] == "a = 1"
+    assert sorted(templates["Botón"]['tags']) == ["botones", "widgets"]
+    assert manager.find_template_ids(["widgets"]) == {templates["Botón"]['id']}
+
+def test_import_upsert_overwrites_and_records_a_revision(manager):
+    template_id = manager.add_template("Ventana", "a = 1", tags=["viejo"])
+    stats = manager.import_templates([
+        {'name': "Ventana", 'code': "a = 2", 'category': "ejemplos", 'tags': ["nuevo"]},
+        {'name': "Nueva", 'code': "n = 1"},
+        {'name': "Nueva", 'code': "n = 2", 'tags': ["repetida"]},
+    ], on_conflict='upsert')
+    assert stats == {'added': 1, 'updated': 2, 'renamed': 0, 'skipped': 0}
+    templates = templates_by_name(manager)
+    assert templates["Ventana"]['id'] == template_id
+    assert templates["Ventana"]['code'] == "a = 2"
+    assert templates["Ventana"]['category'] == "ejemplos"
+    assert templates["Ventana"]['tags'] == ["nuevo"]
+    assert templates["Nueva"]['code'] == "n = 2"
+    assert templates["Nueva"]['tags'] == ["repetida"]
+    assert [row[0] for row in manager.list_revisions(template_id)] == [2, 1]
+    assert manager.get_revision_code(template_id, 1) == "a = 1"
+    assert manager.find_template_ids(["viejo"]) == set()
+    assert search_ids(manager, "nuevo") == {template_id}
+    fts_integrity_check(manager)
+
+def test_import_rename_finds_a_free_name(manager):
+    manager.add_template("Ventana", "a = 1")
+    manager.add_template("Ventana (2)", "a = 2")
+    stats = manager.import_templates([
+        {'name': "Ventana", 'code': "a = 3"},
+        {'name': "Ventana", 'code': "a = 4"},
+    ], on_conflict='rename')
+    assert stats == {'added': 0, 'updated': 0, 'renamed': 2, 'skipped': 0}
+    templates = templates_by_name(manager)
+    assert templates["Ventana (3)"]['code'] == "a = 3"
+    assert templates["Ventana (4)"]['code'] == "a = 4"
+
+def test_import_ids_skip_orphan_tags(manager):
+    manager.add_template("Ventana", "a = 1")
+    # Tags huérfanos de una plantilla que ya no existe
+    manager.db.connection().execute("INSERT INTO template_tags (template_id, tag) VALUES (50, 'huérfano')")
+    manager.import_templates([{'name': "Nueva", 'code': "n = 1", 'tags': ["propio"]}])
+    new_id = templates_by_name(manager)["Nueva"]['id']
+    assert new_id == 51
+    assert templates_by_name(manager)["Nueva"]['tags'] == ["propio"]
+
+@pytest.mark.parametrize('record', [
+    {'name': "Mala", 'code': "x = 1", 'tags': [1, 2]},
+    {'name': "Mala", 'code': "x = 1", 'tags': {'a': 1}},
+    {'name': 5, 'code': "x = 1"},
+    {'name': "Mala", 'code': None},
+])
+def test_import_rejects_invalid_records_atomically(manager, record):
+    with pytest.raises(ValueError):
+        manager.import_templates([{'name': "Buena", 'code': "ok = 1"}, record], batch_size=1)
+    assert templates_by_name(manager) == {}
+
+def test_import_rejects_unknown_policy(manager):
+    with pytest.raises(ValueError):
+        manager.import_templates([], on_conflict='merge')
+
+@pytest.mark.parametrize('filename', ['plantillas.jsonl', 'plantillas.jsonl.gz', 'plantillas.jsonl.zst'])
+def test_export_import_round_trip(manager, tmp_path, filename):
+    if filename.endswith('.zst'):
+        pytest.importorskip('zstandard')
+    manager.add_template("Ventana", "import tkinter as tk\n" * 50, "Descripción con ñ", "general", ["básico"])
+    manager.add_template("Botón", "b = tk.Button()\n", category="widgets", tags=["botones", "widgets"])
+    path = str(tmp_path / filename)
+    assert manager.export_templates(path) == 2
+
+    copy = TemplateManager(str(tmp_path / 'copia.db'))
+    try:
+        assert copy.import_templates(path)['added'] == 2
+        exported = list(manager.iter_templates())
+        imported = list(copy.iter_templates())
+        for record in exported + imported:
+            record['tags'] = sorted(record['tags'])
+        assert sorted(imported, key=lambda r: r['name']) == sorted(exported, key=lambda r: r['name'])
+    finally:
+        copy.close()
@@ -1,23 +1,22 @@
 from .main_window import MainWindow
-from .styles import StyleManager
+from .styles import StyleManager, THEMES, DEFAULT_STYLES
+from .output_pipe import OutputPipe
+from .highlighter import SyntaxHighlighter
 
 __version__ = '1.0.0'
 
-DEFAULT_STYLES = {
-    'font_family': 'Consolas',
-    'code_font_size': 10,
-    'output_font_size': 9,
-    'light_theme': {
-        'bg': '#ffffff',
-        'fg': '#000000',
-        'select': '#0078d7'
-    },
-    'dark_theme': {
-        'bg': '#2b2b2b',
-        'fg': '#ffffff',
-        'select': '#004c8c'
-    }
-}
+def __getattr__(name):
+    """Importa los diálogos sólo cuando se abren por primera vez"""
+    if name == 'LazyTreeview':
+        from .template_dialogs import LazyTreeview
+        return LazyTreeview
+    if name == 'InspectorPanel':
+        from .inspector_panel import InspectorPanel
+        return InspectorPanel
+    if name == 'ProfilePanel':
+        from .profile_panel import ProfilePanel
+        return ProfilePanel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_style_config():
     """Retorna la configuración de estilos"""
@@ -26,7 +25,13 @@ def get_style_config():
 __all__ = [
     'MainWindow',
     'StyleManager',
+    'LazyTreeview',
+    'InspectorPanel',
+    'ProfilePanel',
+    'OutputPipe',
+    'SyntaxHighlighter',
     'get_style_config',
+    'THEMES',
     'DEFAULT_STYLES',
     '__version__'
 ]
\ No newline at end of file
@@ -0,0 +1,349 @@
+import builtins
+import io
+import keyword
+import re
+import time
+import tokenize
+import tkinter as tk
+from .styles import THEMES
+
+HIGHLIGHT_COLORS = {name: theme['highlight'] for name, theme in THEMES.items()}
+
+HIGHLIGHT_TAGS = tuple(HIGHLIGHT_COLORS['light'])
+
+BUILTIN_NAMES = frozenset(name for name in dir(builtins) if not name.startswith('_'))
+
+STRING_TOKENS = frozenset(
+    getattr(tokenize, name) for name in ('STRING', 'FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END')
+    if hasattr(tokenize, name)
+)
+
+# Comentarios y aperturas de cadena, con su prefijo si lo tienen
+STRING_OR_COMMENT = re.compile(r"""#[^\n]*|(?:(?<!\w)[rRbBuUfF]{1,2})?(?:'''|\"\"\"|'|")""")
+
+STRING_ENDS = {
+    "'''": re.compile(r"(?:\\.|[^\\])*?'''", re.DOTALL),
+    '"""': re.compile(r'(?:\\.|[^\\])*?"""', re.DOTALL),
+    "'": re.compile(r"(?:\\.|[^\\'\n])*'"),
+    '"': re.compile(r'(?:\\.|[^\\"\n])*"')
+}
+
+def unclosed_triple_quote(source):
+    """
+    Busca una cadena de triple comilla que quede abierta al final de source.
+
+    Returns:
+        tuple: (columna, apertura con su prefijo, por ejemplo r seguida de tres comillas dobles) o None.
+    """
+    position = 0
+    while True:
+        match = STRING_OR_COMMENT.search(source, position)
+        if match is None:
+            return None
+        opener = match.group()
+        if opener.startswith('#'):
+            position = match.end()
+            continue
+        quote = opener.lstrip('rRbBuUfF')
+        end = STRING_ENDS[quote].match(source, match.end())
+        if end is None:
+            return (match.start(), opener) if len(quote) == 3 else None
+        position = end.end()
+
+def tokenize_line(line, state=None):
+    """
+    Tokeniza una sola línea de Python para resaltarla.
+
+    La indentación se elimina antes de tokenizar, de modo que cualquier
+    línea puede analizarse por separado sin errores de indentación. Si la
+    línea empieza dentro de una cadena de triple comilla, state contiene su
+    apertura (por ejemplo '\"\"\"' o 'r\\'\\'\\'') y se antepone al texto.
+
+    Returns:
+        tuple: (spans, end_state) donde spans es una tupla de
+            (tag, columna_inicio, columna_fin) y end_state es la apertura de
+            la cadena que sigue abierta al final de la línea, o None.
+    """
+    stripped = line.lstrip()
+    indent = len(line) - len(stripped)
+    prefix = state or ''
+    source = prefix + stripped
+    offset = indent - len(prefix)
+    spans = []
+    end_state = None
+    previous = None
+
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.start[0] != 1:
+                break
+            kind = token.type
+            tag = None
+            if kind in STRING_TOKENS:
+                tag = 'hl_string'
+            elif kind == tokenize.COMMENT:
+                tag = 'hl_comment'
+            elif kind == tokenize.NUMBER:
+                tag = 'hl_number'
+            elif kind == tokenize.NAME:
+                if previous is not None and previous.string in ('def', 'class'):
+                    tag = 'hl_definition'
+                elif keyword.iskeyword(token.string):
+                    tag = 'hl_keyword'
+                elif token.string in BUILTIN_NAMES:
+                    tag = 'hl_builtin'
+            if tag:
+                end = token.end[1] + offset if token.end[0] == 1 else len(line)
+                spans.append((tag, max(token.start[1] + offset, 0), end))
+            if kind not in (tokenize.NL, tokenize.NEWLINE):
+                previous = token
+    except tokenize.TokenError:
+        # La columna del error no sirve: desde 3.12 apunta al final del texto
+        unclosed = unclosed_triple_quote(source)
+        if unclosed is not None:
+            column, end_state = unclosed
+            start = max(column + offset, 0)
+            # Desde 3.12 las f-strings ya han dado su FSTRING_START antes del error
+            spans = [span for span in spans if span[1] < start]
+            spans.append(('hl_string', start, len(line)))
+    except SyntaxError:
+        pass
+
+    return tuple(spans), end_state
+
+class SyntaxHighlighter:
+    """
+    Resaltado de sintaxis incremental para un widget Text.
+
+    Intercepta las órdenes insert/delete/replace del widget para saber qué
+    líneas han cambiado. Tras una pausa de delay ms se resaltan primero las
+    líneas modificadas de la zona visible y el resto se procesa en bloques
+    durante los ratos libres del bucle de eventos. Por cada línea se guarda
+    el estado de cadena abierta con el que empieza y los tramos resaltados,
+    de modo que sólo se tocan las etiquetas de las líneas cuyo resultado
+    cambia y el recálculo se propaga hacia abajo sólo mientras cambie el
+    estado.
+
+    Args:
+        text (tk.Text): Widget del editor.
+        delay (int): Milisegundos de espera tras la última pulsación.
+        chunk_size (int): Líneas procesadas por bloque en segundo plano.
+        margin (int): Líneas fuera de la zona visible que se tratan como visibles.
+    """
+
+    def __init__(self, text, delay=60, chunk_size=250, margin=20):
+        self.text = text
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.margin = margin
+        self.states = [None]
+        self.spans = [None]
+        self.dirty = set()
+        self.last_duration = 0.0
+        self._after_id = None
+        self._idle_id = None
+        self._line_count = 1
+
+        self._original = f'{text._w}_highlighter_orig'
+        text.tk.call('rename', text._w, self._original)
+        text.tk.createcommand(text._w, self._dispatch)
+        text.bind('<Destroy>', self._on_destroy, add='+')
+
+        self.set_theme('light')
+        self.resync()
+
+    def set_theme(self, theme):
+        for tag, color in HIGHLIGHT_COLORS[theme].items():
+            self.text.tag_configure(tag, foreground=color)
+        self.text.tag_raise('sel')
+
+    def _call(self, *args):
+        return self.text.tk.call((self._original,) + args)
+
+    def _line_of(self, index):
+        return int(str(self._call('index', index)).split('.')[0])
+
+    def _dispatch(self, operation, *args):
+        if operation == 'insert' and args:
+            line = min(self._line_of(args[0]), self._line_count)
+            result = self._call(operation, *args)
+            added = sum(str(chars).count('\n') for chars in args[1::2])
+            self._lines_changed(line, line, added)
+            return result
+        if operation == 'delete' and args:
+            first = min(self._line_of(args[0]), self._line_count)
+            # Con un solo índice se borra un carácter, que puede ser el salto
+            # de línea (Retroceso o Supr al final de una línea)
+            end = args[1] if len(args) > 1 else f'{args[0]}+1c'
+            last = min(self._line_of(end), self._line_count)
+            result = self._call(operation, *args)
+            self._lines_changed(first, last, 0)
+            return result
+        if operation == 'replace' and len(args) >= 3:
+            first = min(self._line_of(args[0]), self._line_count)
+            last = min(self._line_of(args[1]), self._line_count)
+            result = self._call(operation, *args)
+            added = sum(str(chars).count('\n') for chars in args[2::2])
+            self._lines_changed(first, last, added)
+            return result
+        if operation == 'edit' and args and args[0] in ('undo', 'redo'):
+            line_count = self._line_count
+            result = self._call(operation, *args)
+            self._undo_changed(result, line_count)
+            return result
+        return self._call(operation, *args)
+
+    def _undo_changed(self, ranges, line_count):
+        """
+        Actualiza las cachés tras deshacer o rehacer. Desde Tk 8.7, edit undo
+        y edit redo devuelven los rangos modificados; si hay uno solo basta
+        con actualizar sus líneas. Tk 8.6 no los devuelve y se resalta todo.
+        """
+        if not isinstance(ranges, tuple):
+            ranges = self.text.tk.splitlist(ranges) if ranges else ()
+        if len(ranges) != 2:
+            self.resync()
+            return
+        first = self._line_of(ranges[0])
+        added = self._line_of(ranges[1]) - first
+        removed = added - (self._line_of('end-1c') - line_count)
+        if removed < 0 or first + removed > line_count:
+            self.resync()
+            return
+        self._lines_changed(first, first + removed, added)
+
+    def _lines_changed(self, first, last, added):
+        """Actualiza las cachés por línea tras sustituir first..last por added líneas nuevas"""
+        removed = last - first
+        delta = added - removed
+        if delta:
+            index = first
+            if removed:
+                del self.states[index:index + removed]
+                del self.spans[index:index + removed]
+            if added:
+                self.states[index:index] = [None] * added
+                self.spans[index:index] = [None] * added
+            self.dirty = {
+                line + delta if line > last else line
+                for line in self.dirty
+                if line <= first or line > last
+            }
+        if removed:
+            # La línea first ahora contiene parte de otras: sus tramos guardados no valen
+            self.spans[first - 1] = None
+        self._line_count = self._line_of('end-1c')
+        if len(self.states) != self._line_count:
+            self.resync()
+            return
+        self.dirty.update(range(first, first + added + 1))
+        self.schedule()
+
+    def resync(self):
+        """Descarta las cachés y marca todo el texto para volver a resaltarlo"""
+        self._line_count = self._line_of('end-1c')
+        self.states = [None] * self._line_count
+        self.spans = [None] * self._line_count
+        self.dirty = set(range(1, self._line_count + 1))
+        self.schedule()
+
+    def schedule(self):
+        """Programa el resaltado tras la pausa de escritura"""
+        if self._idle_id is not None:
+            self.text.after_cancel(self._idle_id)
+            self._idle_id = None
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+        self._after_id = self.text.after(self.delay, self.flush_visible)
+
+    def visible_lines(self):
+        first = self._line_of('@0,0')
+        last = self._line_of(f'@0,{self.text.winfo_height()}')
+        return max(1, first - self.margin), min(self._line_count, last + self.margin)
+
+    def flush_visible(self):
+        """Resalta las líneas pendientes de la zona visible y deja el resto en segundo plano"""
+        self._after_id = None
+        start = time.perf_counter()
+        first, last = self.visible_lines()
+        self.process(first, last, budget=None)
+        self.last_duration = time.perf_counter() - start
+        self._schedule_background()
+
+    def _schedule_background(self):
+        if self.dirty and self._idle_id is None:
+            self._idle_id = self.text.after(1, self._background_chunk)
+
+    def _background_chunk(self):
+        self._idle_id = None
+        self.process(1, self._line_count, budget=self.chunk_size)
+        self._schedule_background()
+
+    def flush(self):
+        """Resalta inmediatamente todas las líneas pendientes"""
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+        self.process(1, self._line_count, budget=None)
+
+    def process(self, first, last, budget=None):
+        """
+        Resalta las líneas pendientes entre first y last. Los cambios de
+        estado no se propagan más allá de last; esas líneas quedan pendientes.
+
+        Returns:
+            int: Número de líneas procesadas.
+        """
+        todo = sorted(line for line in self.dirty if first <= line <= last)
+        processed = 0
+        for line in todo:
+            while line is not None and line in self.dirty:
+                if budget is not None and processed >= budget:
+                    return processed
+                self.dirty.discard(line)
+                processed += 1
+                if self._highlight_line(line) and line < self._line_count:
+                    self.dirty.add(line + 1)
+                    line = line + 1 if line < last else None
+                else:
+                    line = None
+        return processed
+
+    def _highlight_line(self, line):
+        """Resalta una línea y devuelve si cambió el estado de la siguiente"""
+        if line > self._line_count:
+            return False
+        content = str(self._call('get', f'{line}.0', f'{line}.end'))
+        spans, end_state = tokenize_line(content, self.states[line - 1])
+
+        old_spans = self.spans[line - 1]
+        if spans != old_spans:
+            start, end = f'{line}.0', f'{line}.end'
+            stale = HIGHLIGHT_TAGS if old_spans is None else {tag for tag, _, _ in old_spans}
+            for tag in stale:
+                self._call('tag', 'remove', tag, start, end)
+            ranges = {}
+            for tag, col_start, col_end in spans:
+                ranges.setdefault(tag, []).extend((f'{line}.{col_start}', f'{line}.{col_end}'))
+            for tag, indices in ranges.items():
+                self._call('tag', 'add', tag, *indices)
+            self.spans[line - 1] = spans
+
+        if line < self._line_count and self.states[line] != end_state:
+            self.states[line] = end_state
+            return True
+        return False
+
+    def _on_destroy(self, event):
+        if event.widget is not self.text:
+            return
+        for after_id in (self._after_id, self._idle_id):
+            if after_id is not None:
+                try:
+                    self.text.after_cancel(after_id)
+                except tk.TclError:
+                    pass
+        try:
+            self.text.tk.deletecommand(self.text._w)
+        except tk.TclError:
+            pass
@@ -0,0 +1,91 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+class InspectorPanel(ttk.Frame):
+    """
+    Muestra el informe de inspect_tree(): un resumen por clase, profundidad y
+    gestor de geometría, y el árbol de widgets con el tiempo de creación de
+    cada subárbol. Los hijos se ordenan de más lento a más rápido.
+
+    Args:
+        parent (tk.Widget): Contenedor del panel.
+        top_classes (int): Clases mostradas en el resumen.
+    """
+
+    def __init__(self, parent, top_classes=10, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.top_classes = top_classes
+
+        self.summary = scrolledtext.ScrolledText(self, height=9, font=('Consolas', 9))
+        self.summary.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        columns = ('class', 'manager', 'widgets', 'subtree_ms', 'own_ms')
+        self.tree = ttk.Treeview(tree_frame, columns=columns)
+        self.tree.heading('#0', text='Widget')
+        for column, heading, width in (
+            ('class', 'Clase', 110),
+            ('manager', 'Gestor', 70),
+            ('widgets', 'Widgets', 70),
+            ('subtree_ms', 'Subárbol ms', 90),
+            ('own_ms', 'Propio ms', 80)
+        ):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.E if column.endswith(('ms', 'widgets')) else tk.W)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def show(self, report):
+        self._show_summary(report)
+        self._show_tree(report['nodes'])
+
+    def _show_summary(self, report):
+        lines = [f"Widgets: {report['total']} · profundidad máxima: {report['max_depth']}"]
+        timings = [f"creación {report['creation_ms']:.1f} ms"]
+        if report['layout_ms'] is not None:
+            timings.append(f"layout (update_idletasks) {report['layout_ms']:.1f} ms")
+        lines.append("Tiempos: " + " · ".join(timings))
+        lines.append("Gestores: " + ", ".join(
+            f"{manager} {count}" for manager, count in report['managers'].most_common()
+        ))
+        lines.append("Por profundidad: " + ", ".join(
+            f"{depth}: {count}" for depth, count in sorted(report['by_depth'].items())
+        ))
+        lines.append("Por clase:")
+        lines.extend(
+            f"  {name:<20}{count:>7}" for name, count in report['by_class'].most_common(self.top_classes)
+        )
+        self.summary.configure(state=tk.NORMAL)
+        self.summary.delete('1.0', tk.END)
+        self.summary.insert('1.0', "\n".join(lines))
+        self.summary.configure(state=tk.DISABLED)
+
+    def _show_tree(self, nodes):
+        self.tree.delete(*self.tree.get_children())
+        children = {}
+        for path, node in nodes.items():
+            children.setdefault(node['parent'], []).append(path)
+        roots = [path for path, node in nodes.items() if node['parent'] not in nodes]
+        stack = [('', path) for path in sorted(roots, key=lambda p: nodes[p]['subtree_ms'])]
+        while stack:
+            parent, path = stack.pop()
+            node = nodes[path]
+            self.tree.insert(
+                parent, tk.END, iid=path,
+                text=path.rsplit('.', 1)[-1],
+                values=(
+                    node['class'],
+                    node['manager'],
+                    node['subtree_count'],
+                    f"{node['subtree_ms']:.2f}",
+                    f"{node['own_ms']:.2f}"
+                ),
+                open=node['depth'] == 1
+            )
+            stack.extend(
+                (path, child)
+                for child in sorted(children.get(path, ()), key=lambda p: nodes[p]['subtree_ms'])
+            )
@@ -1,11 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from .styles import StyleManager
+from .styles import StyleManager, FONTS
+from .highlighter import SyntaxHighlighter
 
 class MainWindow:
     def __init__(self, root):
         self.root = root
-        self.style_manager = StyleManager()
+        self.style_manager = StyleManager(root)
         self.setup_ui()
 
     def setup_ui(self):
@@ -15,6 +16,8 @@ class MainWindow:
         
         self.setup_buttons()
 
+        self.setup_status_bar()
+
     def setup_menu(self):
         self.menubar = tk.Menu(self.root)
         self.file_menu = tk.Menu(self.menubar, tearoff=0)
@@ -40,10 +43,14 @@ class MainWindow:
             self.left_frame,
             width=50,
             height=20,
-            font=('Consolas', 10)
+            font=(FONTS['family'], FONTS['code_size'])
         )
         self.code_editor.pack(fill=tk.BOTH, expand=True)
 
+        self.highlighter = SyntaxHighlighter(self.code_editor)
+        for tag in ('diag_error', 'diag_warning'):
+            self.code_editor.tag_configure(tag, underline=True)
+
     def setup_output_panel(self):
         self.right_frame = ttk.Frame(self.main_panel)
         self.main_panel.add(self.right_frame, weight=3)
@@ -55,7 +62,7 @@ class MainWindow:
             self.right_frame,
             width=50,
             height=8,
-            font=('Consolas', 9)
+            font=(FONTS['family'], FONTS['output_size'])
         )
         self.output_area.pack(fill=tk.BOTH, expand=True)
 
@@ -65,10 +72,29 @@ class MainWindow:
 
         self.run_button = ttk.Button(
             self.button_frame,
-            text="▶ Ejecutar Código"
+            text="▶ Ejecutar Código (F5)"
         )
         self.run_button.pack(side=tk.LEFT, padx=5)
 
+        self.profile_button = ttk.Button(
+            self.button_frame,
+            text="⏱ Ejecutar con Perfil"
+        )
+        self.profile_button.pack(side=tk.LEFT, padx=5)
+
+        self.run_in_process_button = ttk.Button(
+            self.button_frame,
+            text="⧉ Ejecutar en el IDE"
+        )
+        self.run_in_process_button.pack(side=tk.LEFT, padx=5)
+
+        self.stop_button = ttk.Button(
+            self.button_frame,
+            text="⛔ Detener",
+            state=tk.DISABLED
+        )
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+
         self.clear_output_button = ttk.Button(
             self.button_frame,
             text="🗑 Limpiar Salida"
@@ -81,21 +107,61 @@ class MainWindow:
         )
         self.clear_code_button.pack(side=tk.LEFT, padx=5)
 
+        self.hot_reload_var = tk.BooleanVar(value=False)
+        self.hot_reload_check = ttk.Checkbutton(
+            self.button_frame,
+            text="🔁 Recarga en vivo",
+            variable=self.hot_reload_var
+        )
+        self.hot_reload_check.pack(side=tk.LEFT, padx=5)
+
+        self.inspect_button = ttk.Button(
+            self.button_frame,
+            text="🔍 Inspeccionar"
+        )
+        self.inspect_button.pack(side=tk.LEFT, padx=5)
+
         self.theme_button = ttk.Button(
             self.button_frame,
             text="🌓 Cambiar Tema"
         )
         self.theme_button.pack(side=tk.RIGHT, padx=5)
 
-    def apply_theme(self, is_dark_mode):
-        theme_config = self.style_manager.apply_theme(is_dark_mode)
-        
-        for frame in [self.left_frame, self.right_frame, self.button_frame]:
-            frame.configure(style=f'{theme_config["theme"]}.TFrame')
+    def setup_status_bar(self):
+        self.status_frame = ttk.Frame(self.root)
+        self.status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 3))
+
+        self.diagnostics_status = ttk.Label(self.status_frame, text="", anchor=tk.W)
+        self.diagnostics_status.pack(side=tk.LEFT, padx=(0, 15))
+
+        self.loop_status = ttk.Label(self.status_frame, text="", anchor=tk.W)
+        self.loop_status.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        self.stack_sample_var = tk.BooleanVar(value=False)
+        self.stack_sample_check = ttk.Checkbutton(
+            self.status_frame,
+            text="Capturar pila en bloqueos",
+            variable=self.stack_sample_var
+        )
+        self.stack_sample_check.pack(side=tk.RIGHT)
+
+    def apply_theme(self, is_dark_mode):
+        """
+        Cambia de tema. Los widgets ttk lo siguen solos; aquí sólo se
+        recolorean los widgets clásicos de Tk de la ventana principal.
+        """
+        theme = self.style_manager.apply_theme(is_dark_mode)
+
+        for widget in [self.root, self.menubar, self.file_menu]:
+            self.style_manager.style_widget(widget)
         for editor in [self.code_editor, self.output_area]:
-            editor.configure(
-                bg=theme_config['bg_color'],
-                fg=theme_config['fg_color'],
-                insertbackground=theme_config['fg_color']
-            )
\ No newline at end of file
+            for widget in [editor, editor.frame, editor.vbar]:
+                self.style_manager.style_widget(widget)
+
+        self.highlighter.set_theme(theme['name'])
+        for tag, color in theme['diagnostics'].items():
+            try:
+                self.code_editor.tag_configure(tag, underlinefg=color)
+            except tk.TclError:
+                # underlinefg necesita Tk 8.6.6; sin él, subrayado del color del texto
+                pass
\ No newline at end of file
@@ -0,0 +1,125 @@
+import threading
+import tkinter as tk
+from collections import deque
+
+class OutputStream:
+    """Objeto tipo fichero que escribe en un OutputPipe con una etiqueta fija"""
+
+    def __init__(self, pipe, tag=None):
+        self.pipe = pipe
+        self.tag = tag
+
+    def write(self, data):
+        self.pipe.write(data, self.tag)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+class OutputPipe:
+    """
+    Canaliza texto hacia un widget Text por lotes.
+
+    write() sólo encola el texto y puede llamarse desde cualquier hilo. Un
+    tick periódico de after() en el hilo de Tk vuelca lo acumulado con una
+    inserción por bloque de texto con la misma etiqueta. Tanto la cola como
+    el widget se limitan a max_lines líneas, descartando las más antiguas.
+
+    Args:
+        text_widget (tk.Text): Widget de destino.
+        interval (int): Milisegundos entre volcados.
+        max_lines (int): Líneas máximas conservadas.
+    """
+
+    def __init__(self, text_widget, interval=50, max_lines=5000):
+        self.widget = text_widget
+        self.interval = interval
+        self.max_lines = max_lines
+        self.chunks = deque()
+        self.buffered_lines = 0
+        self.dropped_lines = 0
+        self._lock = threading.Lock()
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def stream(self, tag=None):
+        """Devuelve un objeto escribible para redirigir sys.stdout/sys.stderr"""
+        return OutputStream(self, tag)
+
+    def write(self, data, tag=None):
+        if not data:
+            return
+        lines = data.count('\n')
+        if lines > self.max_lines:
+            data = data.split('\n', lines - self.max_lines)[-1]
+            with self._lock:
+                self.dropped_lines += lines - self.max_lines
+            lines = self.max_lines
+        with self._lock:
+            self.chunks.append((data, tag, lines))
+            self.buffered_lines += lines
+            while self.buffered_lines > self.max_lines:
+                excess = self.buffered_lines - self.max_lines
+                old_data, old_tag, old_lines = self.chunks[0]
+                if old_lines <= excess:
+                    self.chunks.popleft()
+                    removed = old_lines
+                else:
+                    self.chunks[0] = (old_data.split('\n', excess)[-1], old_tag, old_lines - excess)
+                    removed = excess
+                self.buffered_lines -= removed
+                self.dropped_lines += removed
+
+    def _tick(self):
+        self._after_id = None
+        self.flush()
+        self.start()
+
+    def flush(self):
+        """Vuelca al widget el texto pendiente. Debe llamarse desde el hilo de Tk"""
+        with self._lock:
+            if not self.chunks:
+                return
+            chunks, self.chunks = self.chunks, deque()
+            dropped, self.dropped_lines = self.dropped_lines, 0
+            self.buffered_lines = 0
+
+        batches = []
+        if dropped:
+            batches.append([f"… {dropped} líneas descartadas\n", 'trimmed'])
+        for data, tag, _ in chunks:
+            if batches and batches[-1][1] == tag:
+                batches[-1][0] += data
+            else:
+                batches.append([data, tag])
+
+        at_end = self.widget.yview()[1] >= 1.0
+        for data, tag in batches:
+            self.widget.insert(tk.END, data, tag or ())
+        self._trim()
+        if at_end:
+            self.widget.see(tk.END)
+
+    def _trim(self):
+        line_count = int(self.widget.index('end-1c').split('.')[0])
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f'{excess + 1}.0')
+
+    def clear(self):
+        with self._lock:
+            self.chunks.clear()
+            self.buffered_lines = 0
+            self.dropped_lines = 0
+        self.widget.delete('1.0', tk.END)
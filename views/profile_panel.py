@@ -0,0 +1,91 @@
+import tkinter as tk
+from tkinter import ttk
+
+class ProfilePanel(ttk.Frame):
+    """
+    Muestra el informe de RunProfiler.report(): las funciones por tiempo
+    acumulado y las líneas que más memoria reservan, en tablas que se
+    ordenan pulsando la cabecera de cada columna.
+
+    Args:
+        parent (tk.Widget): Contenedor del panel.
+        on_export_stats (callable, optional): Exporta el perfil (.pstats).
+        on_export_snapshot (callable, optional): Exporta la instantánea de memoria.
+    """
+
+    FUNCTION_COLUMNS = (
+        ('function', 'Función', 170, tk.W),
+        ('location', 'Ubicación', 110, tk.W),
+        ('calls', 'Llamadas', 70, tk.E),
+        ('own_ms', 'Propio ms', 80, tk.E),
+        ('cumulative_ms', 'Acumulado ms', 95, tk.E),
+        ('source', 'Código', 220, tk.W)
+    )
+
+    ALLOCATION_COLUMNS = (
+        ('line', 'Línea', 60, tk.E),
+        ('size_kb', 'KB', 80, tk.E),
+        ('blocks', 'Bloques', 70, tk.E),
+        ('source', 'Código', 420, tk.W)
+    )
+
+    def __init__(self, parent, on_export_stats=None, on_export_snapshot=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.summary = ttk.Label(self, anchor=tk.W)
+        self.summary.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5)
+        self.functions = self._table(notebook, "Tiempo", self.FUNCTION_COLUMNS)
+        self.allocations = self._table(notebook, "Memoria", self.ALLOCATION_COLUMNS)
+        self.functions.tag_configure('user', font=('Consolas', 9, 'bold'))
+
+        buttons = ttk.Frame(self)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        if on_export_stats is not None:
+            ttk.Button(buttons, text="Exportar .pstats...", command=on_export_stats).pack(side=tk.LEFT, padx=5)
+        if on_export_snapshot is not None:
+            ttk.Button(buttons, text="Exportar memoria...", command=on_export_snapshot).pack(side=tk.LEFT, padx=5)
+
+    def _table(self, notebook, title, columns):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=[column[0] for column in columns], show='headings')
+        tree.rows = []
+        tree.sort_state = (None, True)
+        for column, heading, width, anchor in columns:
+            tree.heading(column, text=heading, command=lambda c=column: self._sort(tree, c))
+            tree.column(column, width=width, anchor=anchor)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        return tree
+
+    def show(self, report):
+        self.summary.configure(text=(
+            f"Tiempo perfilado: {report['total_ms']:.1f} ms · "
+            f"pico de memoria: {report['peak_kb']:.0f} KB · "
+            f"memoria reservada desde tu código: {report['user_kb']:.0f} KB"
+        ))
+        self._fill(self.functions, report['functions'])
+        self._fill(self.allocations, report['allocations'])
+
+    def _fill(self, tree, rows):
+        tree.rows = rows
+        tree.delete(*tree.get_children())
+        columns = tree['columns']
+        for row in rows:
+            tree.insert('', tk.END, values=[self._format(row[column]) for column in columns],
+                        tags=('user',) if row.get('user') else ())
+
+    @staticmethod
+    def _format(value):
+        return f"{value:.2f}" if isinstance(value, float) else value
+
+    def _sort(self, tree, column):
+        """Ordena por column; los números de mayor a menor la primera vez"""
+        last, descending = tree.sort_state
+        descending = not descending if last == column else isinstance(tree.rows[0][column], (int, float)) if tree.rows else True
+        tree.sort_state = (column, descending)
+        self._fill(tree, sorted(tree.rows, key=lambda row: row[column], reverse=descending))
@@ -1,32 +1,228 @@
 import tkinter as tk
 from tkinter import ttk
 
+FONTS = {
+    'family': 'Consolas',
+    'code_size': 10,
+    'output_size': 9
+}
+
+# Definición única de los temas: colores de la interfaz, del resaltado de
+# sintaxis y de los subrayados de los diagnósticos
+THEMES = {
+    'light': {
+        'parent': 'clam',
+        'colors': {
+            'bg': '#ffffff',
+            'fg': '#000000',
+            'select': '#0078d7',
+            'select_fg': '#ffffff',
+            'field': '#ffffff',
+            'hover': '#e5f1fb',
+            'border': '#c8c8c8',
+            'trough': '#e6e6e6',
+            'disabled': '#a0a0a0'
+        },
+        'highlight': {
+            'hl_keyword': '#0000ff',
+            'hl_builtin': '#900090',
+            'hl_string': '#008000',
+            'hl_comment': '#808080',
+            'hl_number': '#098658',
+            'hl_definition': '#795e26'
+        },
+        'diagnostics': {
+            'diag_error': '#e51400',
+            'diag_warning': '#d7a000'
+        }
+    },
+    'dark': {
+        'parent': 'clam',
+        'colors': {
+            'bg': '#2b2b2b',
+            'fg': '#ffffff',
+            'select': '#004c8c',
+            'select_fg': '#ffffff',
+            'field': '#1e1e1e',
+            'hover': '#3c3f41',
+            'border': '#3c3c3c',
+            'trough': '#3a3a3a',
+            'disabled': '#7a7a7a'
+        },
+        'highlight': {
+            'hl_keyword': '#569cd6',
+            'hl_builtin': '#c586c0',
+            'hl_string': '#ce9178',
+            'hl_comment': '#6a9955',
+            'hl_number': '#b5cea8',
+            'hl_definition': '#dcdcaa'
+        },
+        'diagnostics': {
+            'diag_error': '#f14c4c',
+            'diag_warning': '#cca700'
+        }
+    }
+}
+
+# Estilos ttk de cada tema; los valores son claves de 'colors'
+TTK_STYLES = {
+    '.': {
+        'configure': {
+            'background': 'bg',
+            'foreground': 'fg',
+            'fieldbackground': 'field',
+            'selectbackground': 'select',
+            'selectforeground': 'select_fg',
+            'insertcolor': 'fg',
+            'troughcolor': 'trough',
+            'bordercolor': 'border',
+            'lightcolor': 'bg',
+            'darkcolor': 'bg'
+        },
+        'map': {
+            'background': [('active', 'hover')],
+            'foreground': [('disabled', 'disabled')]
+        }
+    },
+    'TButton': {
+        'map': {
+            'background': [('pressed', 'select'), ('active', 'select')],
+            'foreground': [('disabled', 'disabled'), ('active', 'select_fg')]
+        }
+    },
+    'TCheckbutton': {
+        'configure': {'indicatorbackground': 'field', 'indicatorforeground': 'fg'}
+    },
+    'TRadiobutton': {
+        'configure': {'indicatorbackground': 'field', 'indicatorforeground': 'fg'}
+    },
+    'TCombobox': {
+        'map': {'fieldbackground': [('readonly', 'field')], 'foreground': [('readonly', 'fg')]}
+    },
+    'Treeview': {
+        'configure': {'background': 'field', 'fieldbackground': 'field'},
+        'map': {'background': [('selected', 'select')], 'foreground': [('selected', 'select_fg')]}
+    },
+    'Treeview.Heading': {
+        'map': {'background': [('active', 'hover')]}
+    },
+    'TNotebook.Tab': {
+        'configure': {'background': 'trough'},
+        'map': {'background': [('selected', 'bg')]}
+    },
+    'TScrollbar': {
+        'configure': {'arrowcolor': 'fg'}
+    }
+}
+
+# Clases de los widgets clásicos de Tk, que no usan estilos ttk. Las opciones
+# se limitan a ellas porque ttk.Label y otros también leen -background de la
+# base de datos de opciones, y con él fijado ya no seguirían el tema
+TK_CLASSES = (
+    'Toplevel', 'Frame', 'Label', 'Button', 'Checkbutton', 'Radiobutton',
+    'Entry', 'Text', 'Listbox', 'Canvas', 'Menu', 'Menubutton', 'Scale',
+    'Scrollbar', 'Spinbox', 'Labelframe', 'Message', 'Panedwindow'
+)
+
+# Opciones de los widgets clásicos; los valores son claves de 'colors'
+TK_OPTIONS = {
+    'background': 'bg',
+    'foreground': 'fg',
+    'activeBackground': 'select',
+    'activeForeground': 'select_fg',
+    'selectBackground': 'select',
+    'selectForeground': 'select_fg',
+    'insertBackground': 'fg',
+    'highlightBackground': 'bg',
+    'highlightColor': 'select',
+    'troughColor': 'trough',
+    'disabledForeground': 'disabled',
+    'selectColor': 'field'
+}
+
+DEFAULT_STYLES = {
+    'font_family': FONTS['family'],
+    'code_font_size': FONTS['code_size'],
+    'output_font_size': FONTS['output_size'],
+    'light_theme': THEMES['light']['colors'],
+    'dark_theme': THEMES['dark']['colors']
+}
+
+def ttk_settings(colors):
+    """Traduce TTK_STYLES con los colores de un tema al formato de theme_create"""
+    settings = {}
+    for style, spec in TTK_STYLES.items():
+        settings[style] = {}
+        if 'configure' in spec:
+            settings[style]['configure'] = {option: colors[key] for option, key in spec['configure'].items()}
+        if 'map' in spec:
+            settings[style]['map'] = {
+                option: [(state, colors[key]) for state, key in states]
+                for option, states in spec['map'].items()
+            }
+    return settings
+
 class StyleManager:
-    def __init__(self):
-        self.style = ttk.Style()
-        self.light_bg = '#ffffff'
-        self.light_fg = '#000000'
-        self.light_select = '#0078d7'
-        self.dark_bg = '#2b2b2b'
-        self.dark_fg = '#ffffff'
-        self.dark_select = '#004c8c'
+    """
+    Registra cada tema de THEMES como un tema ttk completo, una sola vez, y
+    cambia entre ellos con un único theme_use.
+
+    Los widgets clásicos de Tk no siguen los temas ttk: al cambiar de tema
+    se actualiza la base de datos de opciones (con un script precalculado
+    por tema), que usarán los que se creen después, y style_widget()
+    recolorea los ya creados que le interesan a la aplicación. Cambiar de
+    tema cuesta lo mismo tenga la ventana de prueba los widgets que tenga.
+
+    Args:
+        master (tk.Misc, optional): Widget de la aplicación a tematizar.
+    """
+
+    PREFIX = 'tkinterlab-'
+
+    def __init__(self, master=None):
+        self.style = ttk.Style(master)
+        self.theme_name = None
+        self._options = {}
+        self._widget_options = {}
+        names = self.style.theme_names()
+        for name, theme in THEMES.items():
+            if self.PREFIX + name not in names:
+                self.style.theme_create(self.PREFIX + name, theme['parent'], ttk_settings(theme['colors']))
+            self._options[name] = '\n'.join(
+                f"option add *{widget_class}.{resource} {theme['colors'][key]}"
+                for widget_class in TK_CLASSES
+                for resource, key in TK_OPTIONS.items()
+            )
 
     def apply_theme(self, is_dark_mode):
-        theme = 'Dark' if is_dark_mode else 'Light'
-        bg_color = self.dark_bg if is_dark_mode else self.light_bg
-        fg_color = self.dark_fg if is_dark_mode else self.light_fg
-        select_color = self.dark_select if is_dark_mode else self.light_select
-
-        self.style.configure(f'{theme}.TFrame', background=bg_color)
-        self.style.configure(f'{theme}.TLabel', background=bg_color, foreground=fg_color)
-        self.style.configure(f'{theme}.TButton', background=bg_color, foreground=fg_color)
-        self.style.map(f'{theme}.TButton',
-            background=[('active', select_color)],
-            foreground=[('active', 'white')])
-
-        return {
-            'theme': theme,
-            'bg_color': bg_color,
-            'fg_color': fg_color,
-            'select_color': select_color
-        }
\ No newline at end of file
+        """
+        Activa el tema claro u oscuro.
+
+        Returns:
+            dict: Definición del tema activo (ver THEMES) con su 'name'.
+        """
+        name = 'dark' if is_dark_mode else 'light'
+        if name != self.theme_name:
+            self.style.theme_use(self.PREFIX + name)
+            self.style.tk.eval(self._options[name])
+            self.theme_name = name
+        return dict(THEMES[name], name=name)
+
+    def style_widget(self, widget):
+        """Aplica el tema activo a un widget clásico de Tk ya creado"""
+        key = (self.theme_name, widget.winfo_class())
+        options = self._widget_options.get(key)
+        if options is None:
+            supported = set(widget.keys())
+            colors = THEMES[self.theme_name]['colors']
+            options = {
+                resource.lower(): colors[color]
+                for resource, color in TK_OPTIONS.items()
+                if resource.lower() in supported
+            }
+            self._widget_options[key] = options
+        if options:
+            try:
+                widget.configure(**options)
+            except tk.TclError:
+                pass
@@ -0,0 +1,58 @@
+import tkinter as tk
+from tkinter import ttk
+
+class LazyTreeview(ttk.Frame):
+    """
+    Treeview que se rellena por páginas a medida que el usuario hace scroll.
+
+    La fuente de datos es una función fetch_page(cursor, limit) que devuelve
+    (items, next_cursor), donde items es una lista de (iid, values) y
+    next_cursor es None cuando no quedan más páginas.
+    """
+
+    def __init__(self, parent, columns, headings, page_size=100, prefetch=0.8, **tree_options):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.fetch_page = None
+        self.cursor = None
+        self.exhausted = True
+        self._pending = None
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', **tree_options)
+        for column, text in zip(columns, headings):
+            self.tree.heading(column, text=text)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def load(self, fetch_page):
+        """Vacía la lista y empieza a cargar desde la primera página"""
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        self.tree.delete(*self.tree.get_children())
+        self.fetch_page = fetch_page
+        self.cursor = None
+        self.exhausted = False
+        self.load_more()
+
+    def load_more(self):
+        """Carga la siguiente página si quedan filas por traer"""
+        self._pending = None
+        if self.exhausted or self.fetch_page is None:
+            return
+        items, self.cursor = self.fetch_page(self.cursor, self.page_size)
+        for iid, values in items:
+            self.tree.insert('', tk.END, iid=str(iid), values=values)
+        self.exhausted = self.cursor is None
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.exhausted or self._pending is not None or not self.tree.winfo_ismapped():
+            return
+        if float(last) >= self.prefetch:
+            self._pending = self.after_idle(self.load_more)